@@ -0,0 +1,4 @@
+"""
+性能基准测试包
+用法: python -m benchmarks.run_benchmarks --sizes 1000 10000
+"""
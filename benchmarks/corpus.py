@@ -0,0 +1,132 @@
+"""
+合成 RVMAT 语料生成模块
+以 default.rvmat 为基础生成可配置规模、目录深度和 Stage 数量的材质目录树
+"""
+
+import os
+import random
+
+from src.modules.rvmat_parser import RvmatClass, parse_rvmat
+from src.modules.rvmat_template import load_default_template
+
+
+# 目录树中放置的损坏材质诱饵文件后缀
+DECOY_SUFFIXES = ('_worn', '_damage', '_destruct')
+
+
+class CorpusSpec:
+    """语料规格"""
+
+    def __init__(self, file_count=1000, depth=3, fanout=8, min_stages=3, max_stages=7,
+                 decoy_ratio=0.1, seed=1234):
+        """
+        Args:
+            file_count: 源 RVMAT 文件数量（不含诱饵文件）
+            depth: 目录嵌套深度
+            fanout: 每层目录的子目录数量
+            min_stages: 每个材质的最少 Stage 数量
+            max_stages: 每个材质的最多 Stage 数量（至少为 3，保证存在 Stage3）
+            decoy_ratio: 额外生成的 _worn/_damage/_destruct 诱饵文件比例
+            seed: 随机种子，相同规格生成相同语料
+        """
+        self.file_count = file_count
+        self.depth = depth
+        self.fanout = fanout
+        self.min_stages = max(3, min_stages)
+        self.max_stages = max(self.min_stages, max_stages)
+        self.decoy_ratio = decoy_ratio
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class CorpusTemplate:
+    """从 default.rvmat 拆分出的材质头部与 Stage 模板"""
+
+    def __init__(self, template_text=None):
+        text = template_text if template_text is not None else load_default_template()
+        root = parse_rvmat(text)
+        stages = [entry for entry in root.entries if isinstance(entry, RvmatClass)]
+        first = stages[0].start if stages else len(text)
+        self.header = text[:first]
+        # 使用带 uvTransform 的 Stage 作为模板，名称与 texture 值留作占位
+        stage = root.get_class('Stage1') or stages[0]
+        texture = stage.get_property('texture')
+        body = text[stage.start:stage.end]
+        name_offset = body.index(stage.name)
+        value_start = texture.value_start - stage.start
+        value_end = texture.value_end - stage.start
+        self.stage_parts = (
+            body[:name_offset],
+            body[name_offset + len(stage.name):value_start],
+            body[value_end:]
+        )
+
+    def render(self, rng, stage_count, texture_root):
+        """生成一个材质的文本"""
+        lines = [self.header]
+        before_name, before_value, after_value = self.stage_parts
+        for index in range(1, stage_count + 1):
+            if index == 3:
+                texture = "#(argb,8,8,3)color(0,0,0,0,MC)"
+            else:
+                texture = f"{texture_root}\\tex_{rng.randrange(10 ** 6):06d}_co.paa"
+            lines.append(f'{before_name}Stage{index}{before_value}"{texture}"{after_value}\n')
+        return "".join(lines)
+
+
+def _directory_for(index, spec):
+    """按序号把文件分配到嵌套目录中"""
+    parts = []
+    value = index
+    for level in range(spec.depth):
+        value, slot = divmod(value, spec.fanout)
+        parts.append(f"d{level}_{slot}")
+    return os.path.join(*parts) if parts else ""
+
+
+def generate_corpus(root_dir, spec, template_text=None):
+    """
+    在目录中生成合成语料
+
+    Args:
+        root_dir: 输出根目录
+        spec: CorpusSpec 实例
+        template_text: 模板文本，默认使用 default.rvmat
+
+    Returns:
+        dict: {"sources": 源文件路径列表, "decoys": 诱饵文件数量, "bytes": 写入字节数}
+    """
+    rng = random.Random(spec.seed)
+    template = CorpusTemplate(template_text)
+    sources = []
+    decoys = 0
+    total_bytes = 0
+    created_dirs = set()
+
+    for index in range(spec.file_count):
+        relative_dir = _directory_for(index, spec)
+        directory = os.path.join(root_dir, relative_dir)
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
+
+        stage_count = rng.randint(spec.min_stages, spec.max_stages)
+        content = template.render(rng, stage_count, relative_dir.replace(os.sep, "\\") or "data")
+        data = content.encode("utf-8")
+        file_path = os.path.join(directory, f"material_{index:07d}.rvmat")
+        with open(file_path, "wb") as f:
+            f.write(data)
+        sources.append(file_path)
+        total_bytes += len(data)
+
+        if rng.random() < spec.decoy_ratio:
+            suffix = rng.choice(DECOY_SUFFIXES)
+            decoy_path = os.path.join(directory, f"material_{index:07d}{suffix}.rvmat")
+            with open(decoy_path, "wb") as f:
+                f.write(data)
+            decoys += 1
+            total_bytes += len(data)
+
+    return {"sources": sources, "decoys": decoys, "bytes": total_bytes}
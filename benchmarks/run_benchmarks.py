@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试运行器
+在合成语料上测量核心处理路径的耗时，结果保存为 JSON，可与之前的结果对比
+
+用法:
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run_benchmarks --sizes 1000 --compare results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+# 添加项目路径到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from src.modules.rvmat_processor import RvmatProcessor
+from src.modules.batch_processor import BatchProcessor, ENGINES
+from src.modules.file_selector import FileSelector
+from src.modules.rvmat_template import load_default_template
+
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def _measure(func, items):
+    """执行一次并返回 (耗时秒数, 返回值)"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 6),
+        "items": items,
+        "items_per_second": round(items / elapsed, 2) if elapsed > 0 else None
+    }, result
+
+
+def _template_renderer():
+    """获取 MainAppUI.process_template_content，无法导入 tkinter 时使用核心实现"""
+    try:
+        from src.ui.main_app_ui import MainAppUI
+    except ImportError:
+        from src.modules.rvmat_template import process_template_content
+        return "rvmat_template.process_template_content", process_template_content
+
+    # 该方法不依赖界面状态，无需创建 Tk 窗口
+    ui = MainAppUI.__new__(MainAppUI)
+    return "MainAppUI.process_template_content", ui.process_template_content
+
+
+def bench_size(size, work_dir, engines, workers):
+    """在指定规模的语料上运行全部基准"""
+    spec = CorpusSpec(file_count=size)
+    corpus_dir = os.path.join(work_dir, f"corpus_{size}")
+    results = {"size": size, "corpus": spec.to_dict()}
+
+    timing, corpus = _measure(lambda: generate_corpus(corpus_dir, spec), size)
+    results["generate_corpus"] = dict(timing, decoys=corpus["decoys"], bytes=corpus["bytes"])
+    sources = corpus["sources"]
+
+    selector = FileSelector()
+    timing, found = _measure(lambda: selector.get_rvmat_files_from_directory(corpus_dir), size)
+    results["FileSelector.get_rvmat_files_from_directory"] = dict(timing, found=len(found))
+
+    processor = RvmatProcessor()
+    timing, _ = _measure(lambda: [processor.process_rvmat_file(path) for path in sources], size)
+    results["RvmatProcessor.process_rvmat_file"] = timing
+
+    for engine in engines:
+        batch_processor = BatchProcessor(RvmatProcessor(), engine=engine, max_workers=workers)
+        timing, counts = _measure(lambda: batch_processor.process_files(sources), size)
+        results[f"BatchProcessor.process_files[{engine}]"] = dict(timing, processed=counts[0], failed=counts[1])
+
+    name, render = _template_renderer()
+    template = load_default_template()
+    timing, _ = _measure(
+        lambda: [render(template, f"P:\\mods\\set_{i % 97}", f"material_{i}.rvmat") for i in range(size)], size)
+    results[name] = timing
+
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    return results
+
+
+def compare_results(previous, current):
+    """对比两次结果，返回每项的耗时比值（当前/之前），大于 1 表示变慢"""
+    lines = []
+    previous_runs = {run["size"]: run for run in previous.get("runs", [])}
+    for run in current["runs"]:
+        old_run = previous_runs.get(run["size"])
+        if old_run is None:
+            continue
+        for key, value in run.items():
+            old_value = old_run.get(key)
+            if not isinstance(value, dict) or not isinstance(old_value, dict) or "seconds" not in value:
+                continue
+            if old_value.get("seconds"):
+                ratio = value["seconds"] / old_value["seconds"]
+                marker = "  ← 变慢" if ratio > 1.1 else ""
+                lines.append(f"{run['size']:>7} {key:<48} {old_value['seconds']:>10.3f}s → "
+                             f"{value['seconds']:>10.3f}s  x{ratio:.2f}{marker}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rvmat-Creator 基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="语料文件数量")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES,
+                        help="要测量的批处理引擎")
+    parser.add_argument("--workers", type=int, default=None, help="进程池大小，io 引擎中为 I/O 线程数")
+    parser.add_argument("--work-dir", help="语料生成目录，默认使用临时目录")
+    parser.add_argument("--output", default="bench_results.json", help="结果 JSON 文件")
+    parser.add_argument("--compare", help="要对比的历史结果 JSON 文件")
+    args = parser.parse_args(argv)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="rvmat_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "runs": []
+    }
+
+    try:
+        for size in args.sizes:
+            print(f"正在测量 {size} 个文件...", flush=True)
+            run = bench_size(size, work_dir, args.engines, args.workers)
+            results["runs"].append(run)
+            for key, value in run.items():
+                if isinstance(value, dict) and "seconds" in value:
+                    print(f"  {key:<48} {value['seconds']:>10.3f}s  {value['items_per_second'] or 0:>12.1f}/s")
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(compare_results(previous, results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
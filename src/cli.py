@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rvmat-Creator 命令行入口
+用法: python -m src.cli <命令> [参数]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+# 添加项目路径到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.modules.rvmat_processor import RvmatProcessor
+from src.modules.log_sink import LOG_DEBUG, LOG_INFO
+
+
+# 退出码
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+
+
+class ConsoleLogger:
+    """输出到标准错误的日志对象，标准输出留给 JSON 摘要"""
+
+    def __init__(self, quiet=False, verbose=False):
+        self.quiet = quiet
+        # 逐文件的详细日志只在 --verbose 时输出
+        self.min_level = LOG_DEBUG if verbose else LOG_INFO
+
+    def log(self, message, level=LOG_INFO):
+        if not self.quiet and level >= self.min_level:
+            print(message, file=sys.stderr, flush=True)
+
+
+def write_summary(summary, target):
+    """将 JSON 摘要写入文件，target 为 "-" 时写入标准输出"""
+    if not target:
+        return
+    data = json.dumps(summary, ensure_ascii=False, indent=2)
+    if target == "-":
+        print(data)
+    else:
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+
+
+def collect_inputs(paths, logger, variant_keywords=None):
+    """
+    展开命令行中的文件与目录参数，目录中的损坏材质变体会被排除
+
+    Args:
+        variant_keywords: 变体文件名中的关键词，None 表示内置的 _worn/_damage/_destruct
+
+    Returns:
+        tuple: (去重后的 FileSelection, 不存在的路径列表)
+    """
+    from src.modules.file_selection import FileSelection
+    from src.modules.rvmat_scanner import RvmatScanner, VARIANT_KEYWORDS
+
+    files = FileSelection()
+    missing = []
+    skipped = 0
+    for path in paths:
+        if os.path.isdir(path):
+            scanner = RvmatScanner(exclude_variants=True, variant_keywords=variant_keywords or VARIANT_KEYWORDS)
+            found = list(scanner.scan(path))
+            logger.log(f"从目录 {path} 中找到 {len(found)} 个RVMAT文件，排除了 {scanner.excluded_count} 个损坏材质文件")
+            skipped += files.add(found)[1]
+        elif os.path.isfile(path):
+            skipped += files.add([path])[1]
+        else:
+            missing.append(path)
+    if skipped:
+        logger.log(f"跳过了 {skipped} 个重复的文件")
+    return files, missing
+
+
+def make_processor(args):
+    """
+    按 --rules / --write-if-changed / --binarize 创建处理器
+
+    Raises:
+        OSError: 无法读取规则文件
+        ValueError: 规则文件格式无效
+    """
+    rules = None
+    if args.rules:
+        from src.modules.variant_rules import load_variant_rules
+        rules = load_variant_rules(args.rules)
+    return RvmatProcessor(write_if_changed=args.write_if_changed, rules=rules, binarize=args.binarize)
+
+
+def io_options(args):
+    """把 --io-limit / --io-mount-limit 转换为 BatchProcessor 的参数，格式无效时抛出 ValueError"""
+    from src.modules.io_pool import parse_mount_limits
+
+    return {"io_limits": parse_mount_limits(args.io_limit), "io_mount_limit": args.io_mount_limit}
+
+
+def add_io_arguments(parser):
+    """添加 io 引擎的并发参数"""
+    from src.modules.io_pool import DEFAULT_MOUNT_LIMIT
+
+    parser.add_argument("--io-limit", action="append", metavar="PATH=N",
+                        help="io 引擎中 PATH 所在挂载点的最大并发读写数，可重复指定")
+    parser.add_argument("--io-mount-limit", type=int, default=DEFAULT_MOUNT_LIMIT, metavar="N",
+                        help=f"io 引擎中其他挂载点的最大并发读写数，默认 {DEFAULT_MOUNT_LIMIT}")
+
+
+def cmd_batch(args):
+    """批量生成损坏材质变体"""
+    from src.modules.batch_processor import BatchProcessor
+    from src.modules.build_manifest import BuildManifest
+
+    try:
+        options = io_options(args)
+        processor = make_processor(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    logger = ConsoleLogger(args.quiet, args.verbose)
+    files, missing = collect_inputs(args.paths, logger, processor.variant_suffixes())
+    for path in missing:
+        print(f"错误: 路径不存在: {path}", file=sys.stderr)
+    if missing:
+        return EXIT_USAGE
+    if args.pbo and args.manifest:
+        print("错误: --pbo 不能与 --manifest 同时使用", file=sys.stderr)
+        return EXIT_USAGE
+
+    pbo_writer = None
+    if args.pbo:
+        from src.modules.pbo import PboWriter
+        pbo_writer = PboWriter(args.pbo, root_dir=args.pbo_root, prefix=args.pbo_prefix)
+
+    manifest = BuildManifest(args.manifest) if args.manifest else None
+    batch_processor = BatchProcessor(processor, logger, engine=args.engine, max_workers=args.workers,
+                                     chunk_size=args.chunk_size, manifest=manifest, output_sink=pbo_writer,
+                                     **options)
+
+    start = time.perf_counter()
+    success_count, fail_count = batch_processor.process_files(files)
+    pbo_summary = None
+    if pbo_writer is not None:
+        try:
+            pbo_bytes = pbo_writer.close()
+        except (OSError, ValueError) as e:
+            print(f"错误: 写入 PBO 失败: {e}", file=sys.stderr)
+            return EXIT_FAILURES
+        pbo_summary = {"file": args.pbo, "entries": len(pbo_writer), "bytes": pbo_bytes}
+        logger.log(f"已写入 PBO: {args.pbo}（{len(pbo_writer)} 个文件，{pbo_bytes} 字节）")
+    summary = {
+        "command": "batch",
+        "total": len(files),
+        "processed": success_count,
+        "failed": fail_count,
+        "skipped": len(batch_processor.skipped_files),
+        "writes": processor.stats["writes"],
+        "writes_skipped": processor.stats["writes_skipped"],
+        "elapsed_seconds": round(time.perf_counter() - start, 6),
+        "metrics": batch_processor.metrics.to_dict(),
+        "pbo": pbo_summary,
+        "failed_files": batch_processor.failed_files
+    }
+    write_summary(summary, args.json)
+    if args.metrics:
+        batch_processor.metrics.write_openmetrics(args.metrics, labels={"engine": args.engine})
+    return EXIT_FAILURES if fail_count else EXIT_OK
+
+
+def cmd_quick(args):
+    """根据模板一键生成 RVMAT 及其损坏材质变体"""
+    from src.modules.rvmat_template import load_default_template, generate_quick_rvmat
+
+    if not os.path.isdir(args.folder):
+        print(f"错误: 目录不存在: {args.folder}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        processor = make_processor(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.template:
+        with open(args.template, "r", encoding="utf-8") as f:
+            template = f.read()
+    else:
+        template = load_default_template()
+
+    start = time.perf_counter()
+    output_path = generate_quick_rvmat(template, args.folder, args.name or "")
+    success = processor.process_rvmat_file(output_path)
+    processor.sync_written_directories()
+    logger = ConsoleLogger(args.quiet)
+    logger.log(f"成功生成RVMAT文件: {output_path}")
+    
+    textures = []
+    if args.texture_root:
+        from src.modules.texture_index import open_texture_index
+        
+        index = open_texture_index(args.texture_root)
+        with open(output_path, "rb") as f:
+            for path, texture, description in processor.describe_textures(f.read(), index):
+                logger.log(f"  {path}: {texture} -> {description or '未找到'}")
+                textures.append({"property": path, "texture": texture, "description": description})
+
+    summary = {
+        "command": "quick",
+        "output": output_path,
+        "variants": processor.variant_paths(output_path) if success else [],
+        "textures": textures,
+        "success": success,
+        "elapsed_seconds": round(time.perf_counter() - start, 6)
+    }
+    write_summary(summary, args.json)
+    return EXIT_OK if success else EXIT_FAILURES
+
+
+def cmd_bulk(args):
+    """扫描目录树中的纹理组，批量生成 RVMAT 及其损坏材质变体"""
+    from src.modules.batch_processor import BatchProcessor
+    from src.modules.bulk_generator import BulkQuickGenerator
+
+    if not os.path.isdir(args.directory):
+        print(f"错误: 目录不存在: {args.directory}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        options = io_options(args)
+        processor = make_processor(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    template = None
+    if args.template:
+        with open(args.template, "r", encoding="utf-8") as f:
+            template = f.read()
+
+    logger = ConsoleLogger(args.quiet, args.verbose)
+    start = time.perf_counter()
+    batch_processor = BatchProcessor(processor, logger, engine=args.engine, max_workers=args.workers, **options)
+    generator = BulkQuickGenerator(batch_processor, template, overwrite=args.overwrite,
+                                   require_complete=not args.allow_incomplete, logger=logger)
+    success_count, fail_count = generator.generate_directories([args.directory])
+
+    summary = {
+        "command": "bulk",
+        "directory": args.directory,
+        "texture_sets": len(generator.texture_sets),
+        "incomplete_sets": len(generator.incomplete_sets),
+        "generated": generator.generated_files,
+        "existing": generator.existing_files,
+        "processed": success_count,
+        "failed": fail_count,
+        "elapsed_seconds": round(time.perf_counter() - start, 6),
+        "failed_files": generator.failed_files
+    }
+    write_summary(summary, args.json)
+    return EXIT_FAILURES if fail_count else EXIT_OK
+
+
+def cmd_index(args):
+    """建立或增量刷新 PAA 纹理索引，并可查询纹理信息"""
+    from src.modules.texture_index import TextureIndex
+
+    if not os.path.isdir(args.root):
+        print(f"错误: 目录不存在: {args.root}", file=sys.stderr)
+        return EXIT_USAGE
+
+    logger = ConsoleLogger(args.quiet)
+    index = TextureIndex(args.root, args.index_file)
+    start = time.perf_counter()
+    loaded = False if args.rebuild else index.load()
+    counts = index.refresh()
+    index.save()
+    logger.log(f"纹理索引: {len(index)} 个 PAA 文件，新增 {counts['added']}，更新 {counts['updated']}，"
+               f"删除 {counts['removed']}，未变化 {counts['unchanged']}")
+    logger.log(f"索引文件: {index.index_file}")
+
+    lookups = {}
+    for reference in args.lookup or []:
+        description = index.describe(reference)
+        lookups[reference] = {"path": index.relative_path(reference), "description": description}
+        if not args.json:
+            print(f"{reference}: {description or '未找到'}")
+
+    summary = {
+        "command": "index",
+        "root": index.root_dir,
+        "index_file": str(index.index_file),
+        "loaded": loaded,
+        "files": len(index),
+        "directories": len(index.directories),
+        "elapsed_seconds": round(time.perf_counter() - start, 6),
+        "lookups": lookups
+    }
+    summary.update(counts)
+    write_summary(summary, args.json)
+    return EXIT_FAILURES if lookups and not all(item["path"] for item in lookups.values()) else EXIT_OK
+
+
+def cmd_validate(args):
+    """校验目录中所有 RVMAT 的 texture 引用"""
+    from src.modules.texture_index import TextureIndex
+    from src.modules.texture_validator import TextureValidator
+
+    project_root = args.project_root or args.directories[0]
+    for directory in [project_root] + args.directories:
+        if not os.path.isdir(directory):
+            print(f"错误: 目录不存在: {directory}", file=sys.stderr)
+            return EXIT_USAGE
+
+    logger = ConsoleLogger(args.quiet)
+    index = TextureIndex(project_root, args.index_file)
+    counts = index.update()
+    logger.log(f"纹理索引: {len(index)} 个 PAA 文件（新增 {counts['added']}，更新 {counts['updated']}，删除 {counts['removed']}）")
+
+    validator = TextureValidator(project_root, index, engine=args.engine, max_workers=args.workers,
+                                 include_procedural=not args.hide_procedural)
+    report = validator.validate(args.directories)
+    if args.report:
+        report.write(args.report)
+        logger.log(f"报告已写入: {args.report}")
+    elif not args.json:
+        print(report.format_text(), end="")
+
+    write_summary(report.to_dict(), args.json)
+    return EXIT_FAILURES if report.has_problems else EXIT_OK
+
+
+def cmd_pbo(args):
+    """列出并校验 PBO 归档，可选解出文件"""
+    from src.modules.pbo import PboReader, PboError
+
+    try:
+        reader = PboReader(args.archive)
+    except (OSError, PboError) as e:
+        print(f"错误: 无法读取 PBO: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    checksum_ok = reader.verify()
+    if not args.json:
+        for key, value in reader.extensions.items():
+            print(f"{key} = {value}")
+        for entry in reader.entries:
+            print(f"{entry.data_size:>10}  {entry.name}")
+        status = {True: "正确", False: "不匹配", None: "无"}[checksum_ok]
+        print(f"{len(reader.entries)} 个文件，SHA1 校验和: {status}")
+
+    extracted = 0
+    if args.extract:
+        for entry in reader.entries:
+            parts = [part for part in entry.name.split('\\') if part not in ("", ".")]
+            if not parts or ".." in parts or ":" in parts[0]:
+                print(f"警告: 跳过不安全的条目名称: {entry.name}", file=sys.stderr)
+                continue
+            target = os.path.join(args.extract, *parts)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(reader.read(entry.name))
+            extracted += 1
+
+    summary = {
+        "command": "pbo",
+        "archive": args.archive,
+        "extensions": reader.extensions,
+        "checksum_ok": checksum_ok,
+        "extracted": extracted,
+        "entries": [{"name": entry.name, "size": entry.data_size, "timestamp": entry.timestamp}
+                    for entry in reader.entries]
+    }
+    write_summary(summary, args.json)
+    return EXIT_FAILURES if checksum_ok is False else EXIT_OK
+
+
+def cmd_scan(args):
+    """列出目录中的 RVMAT 文件"""
+    from src.modules.rvmat_scanner import RvmatScanner
+
+    if not os.path.isdir(args.directory):
+        print(f"错误: 目录不存在: {args.directory}", file=sys.stderr)
+        return EXIT_USAGE
+
+    scanner = RvmatScanner(exclude_variants=not args.include_variants)
+    start = time.perf_counter()
+    files = []
+    for file_path in scanner.scan(args.directory):
+        files.append(file_path)
+        if not args.json:
+            print(file_path)
+
+    summary = {
+        "command": "scan",
+        "directory": args.directory,
+        "found": scanner.found_count,
+        "excluded": scanner.excluded_count,
+        "elapsed_seconds": round(time.perf_counter() - start, 6),
+        "files": files
+    }
+    write_summary(summary, args.json)
+    return EXIT_OK
+
+
+def cmd_watch(args):
+    """监视目录，源文件保存后自动重新生成变体"""
+    from src.modules.rvmat_watcher import RvmatWatcher
+
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            print(f"错误: 目录不存在: {directory}", file=sys.stderr)
+            return EXIT_USAGE
+    try:
+        processor = make_processor(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def on_event(path, success):
+        status = "✓" if success else "✗"
+        print(f"{status} {path}", flush=True)
+
+    watcher = RvmatWatcher(processor, args.directories, on_event=on_event, debounce=args.debounce,
+                           poll_interval=args.interval, use_inotify=not args.poll)
+    print(f"正在监视 {len(args.directories)} 个目录，按 Ctrl+C 退出", flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="rvmat-creator", description="DayZ 材质 RVMAT 文件处理工具")
+    subparsers = parser.add_subparsers(dest="command", metavar="<命令>")
+    subparsers.required = True
+
+    batch = subparsers.add_parser("batch", help="批量生成损坏材质变体")
+    batch.add_argument("paths", nargs="+", help="RVMAT 文件或包含 RVMAT 文件的目录")
+    batch.add_argument("--engine", choices=("serial", "process", "io"), default="serial",
+                       help="处理引擎，io 适合网络存储：读写在线程池中并发进行")
+    batch.add_argument("--workers", type=int, default=None,
+                       help="进程池大小，默认使用 CPU 核心数；io 引擎中为 I/O 线程数，默认 32")
+    add_io_arguments(batch)
+    batch.add_argument("--chunk-size", type=int, default=64, help="每个进程池任务包含的文件数")
+    batch.add_argument("--manifest", help="增量构建清单文件路径，指定后跳过未变化的文件")
+    batch.add_argument("--write-if-changed", action="store_true", help="内容未变化时不重写变体文件")
+    batch.add_argument("--rules", metavar="PATH", help="变体规则文件（.json 或 .toml），默认生成 _worn/_damage/_destruct")
+    batch.add_argument("--binarize", action="store_true", help="以 rapified 二进制格式输出变体")
+    batch.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    batch.add_argument("--metrics", metavar="PATH", help="写入 OpenMetrics 文本格式的运行指标")
+    batch.add_argument("--pbo", metavar="PATH", help="把生成的变体直接写入该 PBO 归档，而不是写成单独的文件")
+    batch.add_argument("--pbo-prefix", metavar="PREFIX", help="PBO 头部的 prefix，例如 mymod\\data")
+    batch.add_argument("--pbo-root", metavar="DIR", help="PBO 条目名称相对的目录，默认为所有变体的公共父目录")
+    batch.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    batch.add_argument("-v", "--verbose", action="store_true", help="输出每个文件的处理日志")
+    batch.set_defaults(func=cmd_batch)
+
+    quick = subparsers.add_parser("quick", help="根据模板一键生成 RVMAT 及其损坏材质变体")
+    quick.add_argument("folder", help="纹理所在文件夹，RVMAT 也生成在这里")
+    quick.add_argument("--name", help="RVMAT 文件名，默认使用文件夹名称")
+    quick.add_argument("--template", help="模板文件，默认使用 default.rvmat")
+    quick.add_argument("--write-if-changed", action="store_true", help="内容未变化时不重写变体文件")
+    quick.add_argument("--rules", metavar="PATH", help="变体规则文件（.json 或 .toml），默认生成 _worn/_damage/_destruct")
+    quick.add_argument("--binarize", action="store_true", help="以 rapified 二进制格式输出变体")
+    quick.add_argument("--texture-root", help="项目根目录（例如 P: 盘），指定后通过纹理索引检查引用的纹理")
+    quick.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    quick.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    quick.set_defaults(func=cmd_quick)
+
+    bulk = subparsers.add_parser("bulk", help="为目录树中的每个纹理组批量生成 RVMAT 及其损坏材质变体")
+    bulk.add_argument("directory", help="包含 *_nohq.paa / *_as.paa / *_smdi.paa 纹理的根目录")
+    bulk.add_argument("--template", help="模板文件，默认使用 default.rvmat")
+    bulk.add_argument("--overwrite", action="store_true", help="覆盖已存在的 RVMAT 文件")
+    bulk.add_argument("--allow-incomplete", action="store_true", help="纹理不齐全的组也生成 RVMAT")
+    bulk.add_argument("--engine", choices=("serial", "process", "io"), default="process", help="变体生成引擎")
+    bulk.add_argument("--workers", type=int, default=None,
+                      help="进程池大小，默认使用 CPU 核心数；io 引擎中为 I/O 线程数，默认 32")
+    add_io_arguments(bulk)
+    bulk.add_argument("--write-if-changed", action="store_true", help="内容未变化时不重写变体文件")
+    bulk.add_argument("--rules", metavar="PATH", help="变体规则文件（.json 或 .toml），默认生成 _worn/_damage/_destruct")
+    bulk.add_argument("--binarize", action="store_true", help="以 rapified 二进制格式输出变体")
+    bulk.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    bulk.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    bulk.add_argument("-v", "--verbose", action="store_true", help="输出每个文件的处理日志")
+    bulk.set_defaults(func=cmd_bulk)
+
+    index = subparsers.add_parser("index", help="建立或增量刷新 PAA 纹理索引")
+    index.add_argument("root", help="项目根目录，texture 引用相对于该目录")
+    index.add_argument("--index-file", help="索引文件路径，默认保存在 ~/.rvmat_creator/texture_index")
+    index.add_argument("--rebuild", action="store_true", help="忽略已保存的索引，重新读取所有文件头")
+    index.add_argument("--lookup", nargs="+", metavar="TEXTURE", help="查询纹理引用")
+    index.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    index.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    index.set_defaults(func=cmd_index)
+
+    validate = subparsers.add_parser("validate", help="校验 RVMAT 中的 texture 引用是否存在")
+    validate.add_argument("directories", nargs="+", help="包含 RVMAT 文件的目录")
+    validate.add_argument("--project-root", help="项目根目录（例如 P: 盘），默认使用第一个目录")
+    validate.add_argument("--index-file", help="纹理索引文件路径，默认保存在 ~/.rvmat_creator/texture_index")
+    validate.add_argument("--engine", choices=("serial", "process"), default="process", help="提取引用的引擎")
+    validate.add_argument("--workers", type=int, default=None, help="进程池大小，默认使用 CPU 核心数")
+    validate.add_argument("--hide-procedural", action="store_true", help="报告中不列出每个程序纹理引用")
+    validate.add_argument("--report", metavar="PATH", help="写入报告文件，.json 扩展名写 JSON，否则写文本")
+    validate.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    validate.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    validate.set_defaults(func=cmd_validate)
+
+    pbo = subparsers.add_parser("pbo", help="列出并校验 PBO 归档")
+    pbo.add_argument("archive", help="PBO 文件")
+    pbo.add_argument("--extract", metavar="DIR", help="把所有文件解出到该目录")
+    pbo.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    pbo.set_defaults(func=cmd_pbo)
+
+    scan = subparsers.add_parser("scan", help="列出目录中的 RVMAT 文件")
+    scan.add_argument("directory", help="要扫描的目录")
+    scan.add_argument("--include-variants", action="store_true", help="包含 _worn/_damage/_destruct 文件")
+    scan.add_argument("--json", metavar="PATH", help="写入 JSON 摘要，\"-\" 表示标准输出")
+    scan.set_defaults(func=cmd_scan)
+
+    watch = subparsers.add_parser("watch", help="监视目录并自动生成损坏材质变体")
+    watch.add_argument("directories", nargs="+", help="要监视的目录")
+    watch.add_argument("--debounce", type=float, default=0.1, help="同一文件事件的合并窗口（秒）")
+    watch.add_argument("--poll", action="store_true", help="强制使用修改时间轮询而不是 inotify")
+    watch.add_argument("--interval", type=float, default=1.0, help="轮询间隔（秒）")
+    watch.add_argument("--write-if-changed", action="store_true", help="内容未变化时不重写变体文件")
+    watch.add_argument("--rules", metavar="PATH", help="变体规则文件（.json 或 .toml），默认生成 _worn/_damage/_destruct")
+    watch.add_argument("--binarize", action="store_true", help="以 rapified 二进制格式输出变体")
+    watch.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行主函数，返回退出码"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_FAILURES
+
+
+if __name__ == "__main__":
+    sys.exit(main())
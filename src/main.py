@@ -4,93 +4,109 @@
 Rvmat-Creator 主程序
 用于快速处理 DayZ 材质 Rvmat 文件
 """
-import sys
+import time
+
+# 尽早记录启动时间，用于启动计时报告
+_START_TIME = time.perf_counter()
+
 import os
+import sys
+import multiprocessing
 
 # 设置默认编码为UTF-8
 if hasattr(sys, 'setdefaultencoding'):
     sys.setdefaultencoding('utf-8')
 
-import os
-import sys
-
 # 添加项目路径到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-# 初始化tkinterdnd2可用性标志
-USE_DND = False
-
-try:
-    # 先尝试导入tkinterdnd2
-    import tkinterdnd2
-    print("tkinterdnd2模块可用")
-    
-    # 在PyInstaller打包环境中运行时，设置tkdnd路径
-    if getattr(sys, 'frozen', False):
-        # 在打包环境中，设置tkdnd路径
-        base_path = sys._MEIPASS  # PyInstaller提取文件到_MEIPASS
-        tkdnd_path = os.path.join(base_path, "tkinterdnd2", "tkdnd")
-        # 只包含64位库路径，避免32/64位不匹配错误
-        tkdnd_paths = [
-            tkdnd_path,
-            os.path.join(base_path, "tkinterdnd2", "tkdnd", "win-x64")
-        ]
-        
-        # 尝试加载tkdnd库
-        try:
-            import tkinter as tk
-            root = tk.Tk()
-            root.withdraw()  # 隐藏窗口避免多余窗口显示
-            for path in tkdnd_paths:
-                if os.path.exists(path):
-                    root.tk.call("lappend", "auto_path", path)
-            root.tk.call("package", "require", "tkdnd")
-            root.destroy()
-            print("成功加载tkdnd库")
-        except Exception as e:
-            print(f"加载tkdnd库时出错: {e}")
-    
-    # 尝试使用 tkinterdnd2 创建支持拖拽的窗口
-    from tkinterdnd2 import TkinterDnD
-    USE_DND = True
-    print("tkinterdnd2导入成功")
-except ImportError as e:
-    # 如果没有安装 tkinterdnd2，使用普通的 tkinter
-    print(f"导入tkinterdnd2失败: {e}")
-    import tkinter as tk
-
-from src.ui.main_app_ui import MainAppUI
+from src.modules.startup_timer import StartupTimer, startup_timing_requested
 
 
-def main():
-    """主函数"""
-    print(f"USE_DND状态: {USE_DND}")
-    if USE_DND:
+def _tkdnd_search_paths():
+    """打包环境中 tkdnd 库的搜索路径"""
+    if not getattr(sys, 'frozen', False):
+        return []
+    base_path = sys._MEIPASS  # PyInstaller提取文件到_MEIPASS
+    # 只包含64位库路径，避免32/64位不匹配错误
+    paths = [
+        os.path.join(base_path, "tkinterdnd2", "tkdnd"),
+        os.path.join(base_path, "tkinterdnd2", "tkdnd", "win-x64")
+    ]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def create_root():
+    """
+    创建主窗口，可用时直接在主窗口中加载 tkdnd
+
+    Returns:
+        tuple: (根窗口, 是否支持拖拽)
+    """
+    try:
+        from tkinterdnd2 import TkinterDnD
+    except ImportError as e:
+        # 如果没有安装 tkinterdnd2，使用普通的 tkinter
+        print(f"导入tkinterdnd2失败: {e}")
+        import tkinter as tk
+        return tk.Tk(), False
+
+    # 在PyInstaller打包环境中，通过 TCLLIBPATH 让主窗口的解释器找到 tkdnd，
+    # 不再为探测 tkdnd 额外创建并销毁一个 Tk 窗口
+    search_paths = _tkdnd_search_paths()
+    if search_paths:
+        tcl_paths = " ".join("{" + path.replace("\\", "/") + "}" for path in search_paths)
+        existing = os.environ.get("TCLLIBPATH")
+        os.environ["TCLLIBPATH"] = f"{existing} {tcl_paths}" if existing else tcl_paths
+
+    try:
         # 使用支持拖拽的 Tk 窗口
-        try:
-            root = TkinterDnD.Tk()
-            print("成功创建TkinterDnD.Tk()窗口")
-        except Exception as e:
-            print(f"创建TkinterDnD.Tk()窗口失败: {e}")
-            import tkinter as tk
-            root = tk.Tk()
-    else:
-        # 使用普通的 Tk 窗口
+        root = TkinterDnD.Tk()
+        print("成功创建TkinterDnD.Tk()窗口")
+        return root, True
+    except Exception as e:
+        print(f"创建TkinterDnD.Tk()窗口失败: {e}")
         import tkinter as tk
-        root = tk.Tk()
-    
+        return tk.Tk(), False
+
+
+def main():
+    """主函数"""
+    timer = StartupTimer(startup_timing_requested(), start=_START_TIME)
+    timer.mark("python_imports")
+
+    root, use_dnd = create_root()
+    print(f"USE_DND状态: {use_dnd}")
+    timer.mark("tk_root")
+
+    from src.ui.main_app_ui import MainAppUI
+    timer.mark("ui_imports")
+
     # 设置窗口关闭协议，确保程序完全退出
     def on_closing():
+        # 写入尚未保存的配置修改
+        app.config_manager.flush()
         root.destroy()
         sys.exit(0)
-    
+
     root.protocol("WM_DELETE_WINDOW", on_closing)
-    
+
     app = MainAppUI(root)
+    timer.mark("app_init")
     app.setup_ui()
+    timer.mark("setup_ui")
+
+    def on_first_idle():
+        timer.mark("first_window")
+        timer.report()
+
+    if timer.enabled:
+        root.after_idle(on_first_idle)
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # 打包环境中进程池的子进程需要
+    multiprocessing.freeze_support()
+    main()
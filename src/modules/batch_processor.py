@@ -4,20 +4,118 @@
 """
 
 import os
-from tkinter import filedialog
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .build_manifest import hash_config
+from .file_selection import FileSelection
+from .run_metrics import STAGE_MANIFEST, STAGE_LOG, STAGE_READ, STAGE_TRANSFORM, STAGE_WRITE, COUNTER_ERRORS
+from .io_pool import IoPool, IoCancelled, DEFAULT_IO_WORKERS, DEFAULT_MOUNT_LIMIT
+from .rvmat_processor import read_source, write_chunks
+from .log_sink import LOG_DEBUG, LOG_INFO, LOG_WARNING
+from .rvmat_scanner import RvmatScanner
+
+
+# 处理引擎：在调用线程中逐个处理，分块分发到进程池，
+# 或读写在 I/O 线程池中并发进行、转换在调用线程中进行（适合网络存储）
+ENGINE_SERIAL = "serial"
+ENGINE_PROCESS = "process"
+ENGINE_IO = "io"
+ENGINES = (ENGINE_SERIAL, ENGINE_PROCESS, ENGINE_IO)
+
+# io 引擎等待读取或写入完成时检查取消标志的间隔（秒）
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+def _process_one(processor, file_path):
+    """处理单个文件，非 RVMAT 文件返回 None"""
+    if not processor.is_rvmat_file(file_path):
+        return None
+    return processor.process_rvmat_file(file_path)
+
+
+class _CollectingSink:
+    """工作进程中的输出对象，收集变体数据交回主进程写入真正的输出对象"""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, file_path, chunks):
+        self.entries.append((file_path, chunks))
+
+
+def _process_chunk(processor, chunk, collect_outputs=False):
+    """
+    在工作进程中处理一组文件，按输入顺序返回每个文件的处理结果及写入统计
+
+    collect_outputs 为 True 时变体不写入磁盘，而是以 (路径, 字节块) 列表返回
+    """
+    processor.reset_stats()
+    collector = None
+    if collect_outputs:
+        collector = processor.output_sink = _CollectingSink()
+    results = [_process_one(processor, file_path) for file_path in chunk]
+    # 每个分块结束时同步一次写入过的目录
+    processor.sync_written_directories()
+    return results, processor.stats, processor.metrics.to_dict(), collector.entries if collector else None
 
 
 class BatchProcessor:
     """批量处理器"""
     
-    def __init__(self, processor, logger=None):
+    def __init__(self, processor, logger=None, engine=ENGINE_SERIAL, max_workers=None, chunk_size=64,
+                 manifest=None, io_limits=None, io_mount_limit=DEFAULT_MOUNT_LIMIT, io_in_flight=128,
+                 output_sink=None):
+        """
+        初始化批量处理器
+        
+        Args:
+            processor: RvmatProcessor 实例
+            logger: 日志对象，需提供 log(消息, 级别) 方法，逐文件的日志使用 LOG_DEBUG 级别
+            engine: 处理引擎，"serial"、"process" 或 "io"
+            max_workers: 进程池大小，None 表示使用 CPU 核心数；io 引擎中为 I/O 线程数
+            chunk_size: 每个进程池任务包含的文件数
+            manifest: BuildManifest 实例，提供时启用增量构建
+            io_limits: io 引擎中 路径 -> 该路径所在挂载点的最大并发读写数
+            io_mount_limit: io 引擎中未单独配置的挂载点的最大并发读写数
+            io_in_flight: io 引擎中同时处于读取或写入中的最大文件数，限制内存占用
+            output_sink: 提供 add(路径, 字节块) 方法的输出对象（例如 PboWriter），
+                提供时变体写入其中而不是磁盘；由调用方负责关闭
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"未知的处理引擎: {engine}")
+        
         self.processor = processor
         self.logger = logger
+        self.engine = engine
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+        self.manifest = manifest
+        self.io_limits = io_limits
+        self.io_mount_limit = io_mount_limit
+        self.io_in_flight = max(1, io_in_flight)
+        self.output_sink = output_sink
         self.processed_files = []
         self.failed_files = []
+        self.skipped_files = []
+        self.cancelled = False
+    
+    @property
+    def metrics(self):
+        """最近一次运行的指标（RunMetrics），工作进程中的指标已合并"""
+        return self.processor.metrics
+    
+    def _log(self, message, level=LOG_INFO):
+        """写入日志，耗时计入 log 阶段"""
+        if self.logger:
+            with self.processor.metrics.stage(STAGE_LOG):
+                self.logger.log(message, level)
     
     def select_files(self, parent=None):
         """选择多个文件"""
+        # 延迟导入，命令行和工作进程无需加载 tkinter
+        from tkinter import filedialog
+        
         files = filedialog.askopenfilenames(
             parent=parent,
             title="选择 RVMAT 文件",
@@ -28,6 +126,8 @@ class BatchProcessor:
     
     def select_directory(self, parent=None):
         """选择目录"""
+        from tkinter import filedialog
+        
         directory = filedialog.askdirectory(
             parent=parent,
             title="选择包含 RVMAT 文件的目录"
@@ -37,59 +137,311 @@ class BatchProcessor:
             return []
         
         # 获取目录中所有 .rvmat 文件
-        rvmat_files = []
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if file.lower().endswith('.rvmat'):
-                    rvmat_files.append(os.path.join(root, file))
-        
-        return rvmat_files
+        return list(RvmatScanner(exclude_variants=False).scan(directory))
     
-    def process_files(self, file_list):
-        """处理文件列表"""
+    def process_files(self, file_list, progress_callback=None, cancel_event=None):
+        """
+        处理文件列表
+        
+        Args:
+            file_list: 文件路径列表或 FileSelection，重复的文件只处理一次
+            progress_callback: 进度回调 callback(已完成数, 总数, 文件路径, 是否成功)
+            cancel_event: threading.Event，置位后在文件之间停止处理
+            
+        Returns:
+            tuple: (成功数, 失败数)
+        """
         self.processed_files = []
         self.failed_files = []
+        self.skipped_files = []
+        self.cancelled = False
+        self.processor.reset_stats()
+        metrics = self.processor.metrics
+        metrics.begin()
         
+        selection = file_list if isinstance(file_list, FileSelection) else FileSelection(file_list)
+        if selection.skipped:
+            self._log(f"跳过了 {selection.skipped} 个重复的文件")
+        file_list = selection.to_list()
         total_files = len(file_list)
-        if self.logger:
-            self.logger.log(f"开始处理 {total_files} 个文件...")
+        self._log(f"开始处理 {total_files} 个文件...")
         
-        for i, file_path in enumerate(file_list):
-            if self.processor.is_rvmat_file(file_path):
-                if self.logger:
-                    self.logger.log(f"正在处理 ({i+1}/{total_files}): {os.path.basename(file_path)}")
-                
-                success = self.processor.process_rvmat_file(file_path)
+        done = 0
+        pending = file_list
+        content_hashes = {}
+        if self.manifest is not None:
+            # 增量模式：先跳过变体已是最新的源文件
+            pending = []
+            self.manifest.begin(hash_config(self.processor.config_fingerprint()))
+            for file_path in file_list:
+                if self.processor.is_rvmat_file(file_path):
+                    with metrics.stage(STAGE_MANIFEST):
+                        up_to_date, content_hash = self.manifest.check(
+                            file_path, self.processor.variant_paths(file_path))
+                    if up_to_date:
+                        self.skipped_files.append(file_path)
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, total_files, file_path, True)
+                        continue
+                    content_hashes[file_path] = content_hash
+                pending.append(file_path)
+            
+            if self.skipped_files:
+                self._log(f"跳过 {len(self.skipped_files)} 个未变化的文件")
+        
+        for _, file_path, success in self._iter_results(pending, cancel_event):
+            done += 1
+            if self.manifest is not None and success is not None:
+                with metrics.stage(STAGE_MANIFEST):
+                    if success:
+                        self.manifest.record(file_path, content_hashes.get(file_path))
+                    else:
+                        self.manifest.forget(file_path)
+            
+            if success is None:
+                metrics.count(COUNTER_ERRORS)
+                self.failed_files.append(file_path)
+                self._log(f"  ✗ 无效的 RVMAT 文件: {os.path.basename(file_path)}", LOG_WARNING)
+            else:
+                self._log(f"正在处理 ({done}/{total_files}): {os.path.basename(file_path)}", LOG_DEBUG)
                 if success:
                     self.processed_files.append(file_path)
-                    if self.logger:
-                        self.logger.log(f"  ✓ 处理成功")
+                    self._log(f"  ✓ 处理成功", LOG_DEBUG)
                 else:
                     self.failed_files.append(file_path)
-                    if self.logger:
-                        self.logger.log(f"  ✗ 处理失败")
-            else:
-                self.failed_files.append(file_path)
-                if self.logger:
-                    self.logger.log(f"  ✗ 无效的 RVMAT 文件: {os.path.basename(file_path)}")
+                    self._log(f"  ✗ 处理失败: {os.path.basename(file_path)}", LOG_WARNING)
+            
+            if progress_callback:
+                progress_callback(done, total_files, file_path, bool(success))
+        
+        # 串行与 io 引擎在本次运行结束时同步一次写入过的目录（进程池已在每个分块结束时同步），
+        # 先于保存构建清单，清单记录的变体都已持久化
+        self.processor.sync_written_directories()
+        
+        if self.manifest is not None:
+            try:
+                with metrics.stage(STAGE_MANIFEST):
+                    self.manifest.save()
+            except OSError as e:
+                self._log(f"保存构建清单失败: {e}", LOG_WARNING)
         
         # 输出处理结果
         if self.logger:
-            self.logger.log(f"\n处理完成!")
-            self.logger.log(f"成功处理: {len(self.processed_files)} 个文件")
-            self.logger.log(f"处理失败: {len(self.failed_files)} 个文件")
+            if self.cancelled:
+                self._log(f"\n处理已取消!")
+            else:
+                self._log(f"\n处理完成!")
+            self._log(f"成功处理: {len(self.processed_files)} 个文件")
+            self._log(f"处理失败: {len(self.failed_files)} 个文件")
+            if self.processor.write_if_changed:
+                self._log(f"内容未变化而跳过写入: {self.processor.stats['writes_skipped']} 个文件")
+            if self.manifest is not None:
+                self._log(f"重新生成: {len(self.processed_files)} 个文件，跳过: {len(self.skipped_files)} 个文件")
             
             if self.failed_files:
-                self.logger.log(f"\n失败的文件:")
+                self._log(f"\n失败的文件:")
                 for file in self.failed_files:
-                    self.logger.log(f"  - {file}")
+                    self._log(f"  - {file}")
         
+        metrics.end()
         return len(self.processed_files), len(self.failed_files)
     
+    def _iter_results(self, file_list, cancel_event=None):
+        """按输入顺序逐个产出 (索引, 文件路径, 处理结果)，非 RVMAT 文件的结果为 None"""
+        processor = self.processor
+        previous_sink = processor.output_sink
+        if self.output_sink is not None:
+            processor.output_sink = self.output_sink
+        try:
+            yield from self._iter_engine(file_list, cancel_event)
+        finally:
+            processor.output_sink = previous_sink
+    
+    def _iter_engine(self, file_list, cancel_event=None):
+        """按处理引擎分发"""
+        if self.engine == ENGINE_PROCESS:
+            yield from self._iter_process_pool(file_list, cancel_event)
+            return
+        if self.engine == ENGINE_IO:
+            yield from self._iter_io_pool(file_list, cancel_event)
+            return
+        
+        for i, file_path in enumerate(file_list):
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancelled = True
+                return
+            yield i, file_path, _process_one(self.processor, file_path)
+    
+    def _iter_process_pool(self, file_list, cancel_event=None):
+        """
+        将文件分块提交到进程池处理
+        
+        结果按提交顺序合并，保证顺序与输入一致。取消时丢弃尚未开始的分块，
+        已在运行的分块会先完成再返回。
+        """
+        chunk_size = self.chunk_size
+        chunks = [(start, file_list[start:start + chunk_size]) for start in range(0, len(file_list), chunk_size)]
+        if not chunks:
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            collect_outputs = self.output_sink is not None
+            futures = [executor.submit(_process_chunk, self.processor, chunk, collect_outputs) for _, chunk in chunks]
+            for (start, chunk), future in zip(chunks, futures):
+                results, stats, metrics, outputs = future.result()
+                self.processor.merge_stats(stats, metrics)
+                for file_path, output_chunks in outputs or ():
+                    self.output_sink.add(file_path, output_chunks)
+                for offset, (file_path, success) in enumerate(zip(chunk, results)):
+                    if cancel_event is not None and cancel_event.is_set():
+                        self.cancelled = True
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        return
+                    yield start + offset, file_path, success
+    
+    def _iter_io_pool(self, file_list, cancel_event=None):
+        """
+        读取与写入提交到 I/O 线程池，转换在调用线程中进行
+        
+        同时最多有 io_in_flight 个文件处于读取或写入中：调用线程按顺序取出已读完的文件做转换，
+        再提交它的变体写入，结果在该文件的所有变体写完后按输入顺序产出。
+        取消时丢弃尚未开始的读取与写入，只等待已经开始的写入；变体只写入一部分的文件按失败产出，
+        写入全部被取消的文件不产出。
+        """
+        processor = self.processor
+        metrics = processor.metrics
+        write_if_changed = processor.write_if_changed
+        total = len(file_list)
+        reads = deque()
+        writes = deque()
+        next_index = 0
+        
+        pool = IoPool(self.max_workers or DEFAULT_IO_WORKERS, self.io_mount_limit, self.io_limits)
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    self.cancelled = True
+                    pool.cancel()
+                    for _, _, future in reads:
+                        if future is not None:
+                            future.cancel()
+                    # 先取消所有尚未开始的写入，再等待已开始的写入
+                    cancelled = [self._cancel_io_writes(entry) for entry in writes]
+                    for entry, started in zip(writes, cancelled):
+                        result = self._finish_cancelled_io_writes(entry, started)
+                        if result is not None:
+                            yield result
+                    return
+                
+                # 补充读取，保持在途文件数不超过上限
+                while next_index < total and len(reads) + len(writes) < self.io_in_flight:
+                    file_path = file_list[next_index]
+                    future = pool.submit(file_path, read_source, file_path) if processor.is_rvmat_file(file_path) else None
+                    reads.append((next_index, file_path, future))
+                    next_index += 1
+                
+                # 最早的文件已写完时先产出
+                head_writes = [future for future, _, _ in writes[0][2] or ()] if writes else []
+                if writes and all(future.done() for future in head_writes):
+                    yield self._finish_io_writes(writes.popleft())
+                    continue
+                if not reads and not writes:
+                    return
+                
+                # 下一个文件尚未读完（或已没有可转换的文件）时等待，期间定期检查取消标志
+                if not reads or (reads[0][2] is not None and not reads[0][2].done()):
+                    waiting = head_writes + ([reads[0][2]] if reads and reads[0][2] is not None else [])
+                    wait(waiting, timeout=_CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    continue
+                
+                index, file_path, future = reads.popleft()
+                if future is None:
+                    writes.append((index, file_path, None))
+                    continue
+                try:
+                    (content, size), seconds = future.result()
+                    metrics.add_time(STAGE_READ, seconds)
+                    processor.record_read(size)
+                    with metrics.stage(STAGE_TRANSFORM):
+                        variants = processor.emit_variants(content)
+                except Exception as e:
+                    processor.record_error(e)
+                    writes.append((index, file_path, False))
+                    continue
+                
+                if processor.output_sink is not None:
+                    # 输出对象在内存中，直接在调用线程中写入
+                    for suffix, chunks in variants:
+                        processor._write_variant(processor.variant_path(file_path, suffix), chunks)
+                    writes.append((index, file_path, []))
+                    continue
+                
+                pending_writes = []
+                for suffix, chunks in variants:
+                    output_file = processor.variant_path(file_path, suffix)
+                    future = pool.submit(output_file, write_chunks, output_file, chunks, write_if_changed)
+                    pending_writes.append((future, output_file, chunks))
+                writes.append((index, file_path, pending_writes))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _finish_io_writes(self, entry):
+        """等待一个文件的变体写入完成并记录，返回 (索引, 文件路径, 处理结果)"""
+        index, file_path, pending_writes = entry
+        if pending_writes is None or pending_writes is False:
+            # None：非 RVMAT 文件；False：读取或转换失败
+            return index, file_path, pending_writes
+        
+        processor = self.processor
+        success = True
+        for future, output_file, chunks in pending_writes:
+            try:
+                written, seconds = future.result()
+            except Exception as e:
+                processor.record_error(e)
+                success = False
+                continue
+            processor.metrics.add_time(STAGE_WRITE, seconds)
+            processor.record_write(output_file, written, chunks)
+        return index, file_path, success
+    
+    def _cancel_io_writes(self, entry):
+        """取消一个文件尚未开始的变体写入，返回已开始（无法取消）的写入列表"""
+        pending_writes = entry[2]
+        if not pending_writes:
+            return pending_writes
+        return [write for write in pending_writes if not write[0].cancel()]
+    
+    def _finish_cancelled_io_writes(self, entry, started):
+        """
+        等待取消后仍在进行的写入
+        
+        Returns:
+            tuple: (索引, 文件路径, 处理结果)，写入全部被取消时返回 None；只写入了部分变体时结果为 False
+        """
+        index, file_path, pending_writes = entry
+        if not pending_writes:
+            # 非 RVMAT 文件、读取或转换失败，或已写入输出对象
+            return self._finish_io_writes(entry)
+        # 在挂载点信号量上等待的写入也没有执行
+        wait([future for future, _, _ in started])
+        started = [write for write in started if not isinstance(write[0].exception(), IoCancelled)]
+        if not started:
+            return None
+        _, _, success = self._finish_io_writes((index, file_path, started))
+        if len(started) < len(pending_writes):
+            success = False
+        return index, file_path, success
+    
     def get_processed_files(self):
         """获取已处理的文件列表"""
         return self.processed_files
     
     def get_failed_files(self):
         """获取处理失败的文件列表"""
-        return self.failed_files
\ No newline at end of file
+        return self.failed_files
+    
+    def get_skipped_files(self):
+        """获取增量模式下跳过的文件列表"""
+        return self.skipped_files
\ No newline at end of file
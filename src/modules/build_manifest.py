@@ -0,0 +1,134 @@
+"""
+增量构建清单模块
+记录源文件内容哈希与纹理映射配置哈希，用于跳过变体已是最新的源文件
+"""
+
+import os
+import json
+import hashlib
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(file_path):
+    """计算文件内容的 SHA-1 哈希"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_config(config):
+    """计算可 JSON 序列化配置的稳定哈希"""
+    data = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    """增量构建清单"""
+
+    def __init__(self, manifest_file):
+        """
+        初始化构建清单
+
+        Args:
+            manifest_file: 清单文件路径（JSON）
+        """
+        self.manifest_file = str(manifest_file)
+        self.config_hash = None
+        self.sources = {}
+        self.load()
+
+    @staticmethod
+    def key(file_path):
+        """源文件在清单中的键（绝对路径，Windows 下不区分大小写）"""
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def load(self):
+        """加载清单文件，文件损坏或版本不符时视为空清单"""
+        self.config_hash = None
+        self.sources = {}
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        self.config_hash = data.get("config_hash")
+        self.sources = data.get("sources", {})
+
+    def save(self):
+        """保存清单文件"""
+        directory = os.path.dirname(self.manifest_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "version": MANIFEST_VERSION,
+            "config_hash": self.config_hash,
+            "sources": self.sources
+        }
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_file)
+
+    def begin(self, config_hash):
+        """开始一次构建，配置哈希变化时所有记录失效"""
+        if config_hash != self.config_hash:
+            self.sources = {}
+            self.config_hash = config_hash
+
+    def check(self, file_path, outputs):
+        """
+        检查源文件的变体是否为最新
+
+        文件大小与修改时间未变时直接信任记录，否则重新计算内容哈希。
+
+        Args:
+            file_path: 源文件路径
+            outputs: 该源文件对应的变体文件路径列表
+
+        Returns:
+            tuple: (是否为最新, 内容哈希或 None)
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False, None
+
+        key = self.key(file_path)
+        entry = self.sources.get(key)
+        if entry is None or not all(os.path.isfile(output) for output in outputs):
+            return False, None
+
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True, entry.get("hash")
+
+        content_hash = hash_file(file_path)
+        if content_hash != entry.get("hash"):
+            return False, content_hash
+
+        # 内容未变（例如只是被 touch），刷新文件状态
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True, content_hash
+
+    def record(self, file_path, content_hash=None):
+        """记录已成功生成变体的源文件"""
+        stat = os.stat(file_path)
+        if content_hash is None:
+            content_hash = hash_file(file_path)
+        self.sources[self.key(file_path)] = {
+            "hash": content_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    def forget(self, file_path):
+        """移除源文件的记录"""
+        self.sources.pop(self.key(file_path), None)
@@ -0,0 +1,204 @@
+"""
+批量一键生成模块
+扫描目录树中的纹理组（共享基础名称的 *_nohq.paa、*_as.paa、*_smdi.paa），
+为每组按模板生成 RVMAT，再一次性并行生成所有损坏材质变体
+"""
+
+import os
+
+from .log_sink import LOG_INFO, LOG_WARNING
+from .rvmat_processor import atomic_write, encode_text
+from .rvmat_scanner import RvmatScanner
+from .rvmat_template import TEXTURE_SLOTS, compile_template, load_default_template, texture_paths
+
+
+class TextureSet:
+    """同一目录中共享基础名称的一组纹理"""
+
+    __slots__ = ('directory', 'basename', 'textures')
+
+    def __init__(self, directory, basename):
+        self.directory = directory
+        self.basename = basename
+        # 插槽名 -> 纹理文件路径
+        self.textures = {}
+
+    @property
+    def is_complete(self):
+        """是否包含模板需要的全部纹理"""
+        return all(slot in self.textures for _, slot, _ in TEXTURE_SLOTS)
+
+    @property
+    def missing_slots(self):
+        """缺少的纹理插槽"""
+        return [slot for _, slot, _ in TEXTURE_SLOTS if slot not in self.textures]
+
+    @property
+    def rvmat_filename(self):
+        return f"{self.basename}.rvmat"
+
+    @property
+    def rvmat_path(self):
+        return os.path.join(self.directory, self.rvmat_filename)
+
+    def __repr__(self):
+        return f"TextureSet({self.directory!r}, {self.basename!r}, {sorted(self.textures)})"
+
+
+def find_texture_sets(root_dir, require_complete=True, max_workers=8):
+    """
+    扫描目录树中的纹理组
+
+    Args:
+        root_dir: 根目录
+        require_complete: 为 True 时只返回三种纹理齐全的组
+        max_workers: 遍历子目录的线程数
+
+    Returns:
+        tuple: (纹理组列表, 不完整而被跳过的纹理组列表)，按路径排序
+    """
+    suffixes = [(suffix.lower(), slot) for _, slot, suffix in TEXTURE_SLOTS]
+    scanner = RvmatScanner(exclude_variants=False, max_workers=max_workers, extension='.paa')
+
+    sets = {}
+    for texture_path in scanner.scan(root_dir):
+        directory, name = os.path.split(texture_path)
+        lower_name = name.lower()
+        for suffix, slot in suffixes:
+            if lower_name.endswith(suffix):
+                basename = name[:-len(suffix)]
+                if not basename:
+                    break
+                key = (directory, basename.lower())
+                texture_set = sets.get(key)
+                if texture_set is None:
+                    texture_set = sets[key] = TextureSet(directory, basename)
+                texture_set.textures[slot] = texture_path
+                break
+
+    found = []
+    incomplete = []
+    for key in sorted(sets):
+        texture_set = sets[key]
+        if require_complete and not texture_set.is_complete:
+            incomplete.append(texture_set)
+        else:
+            found.append(texture_set)
+    return found, incomplete
+
+
+class BulkQuickGenerator:
+    """批量一键生成器"""
+
+    def __init__(self, batch_processor, template=None, overwrite=False, require_complete=True, logger=None):
+        """
+        初始化批量生成器
+
+        Args:
+            batch_processor: BatchProcessor 实例，用于并行生成损坏材质变体
+            template: 模板内容，None 表示使用默认模板
+            overwrite: 为 True 时覆盖已存在的 RVMAT，否则保留已有文件只重新生成变体
+            require_complete: 扫描目录时是否只接受三种纹理齐全的组
+            logger: 日志对象，需提供 log 方法
+        """
+        self.batch_processor = batch_processor
+        self.template = template
+        self.overwrite = overwrite
+        self.require_complete = require_complete
+        self.logger = logger
+        self.texture_sets = []
+        self.incomplete_sets = []
+        self.generated_files = []
+        self.existing_files = []
+        # 写入失败的 RVMAT 文件
+        self.write_failures = []
+        self.cancelled = False
+
+    @property
+    def failed_files(self):
+        """写入 RVMAT 失败的文件与生成变体失败的文件"""
+        return self.write_failures + self.batch_processor.failed_files
+
+    def _log(self, message, level=LOG_INFO):
+        if self.logger:
+            self.logger.log(message, level)
+
+    def write_rvmat_files(self, texture_sets, cancel_event=None):
+        """
+        按模板为每个纹理组写入 RVMAT 文件
+
+        文件先写入临时文件再替换，取消或崩溃不会留下只写了一半的 RVMAT；
+        单个纹理组写入失败时记录到 write_failures 并继续处理其他组
+
+        Returns:
+            list: 需要生成变体的 RVMAT 文件路径（新生成的与保留的已有文件）
+        """
+        template = self.template if self.template is not None else load_default_template()
+        compiled = compile_template(template)
+
+        self.generated_files = []
+        self.existing_files = []
+        self.write_failures = []
+        rvmat_files = []
+        for texture_set in texture_sets:
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancelled = True
+                break
+            output_path = texture_set.rvmat_path
+            if not self.overwrite and os.path.exists(output_path):
+                self.existing_files.append(output_path)
+            else:
+                content = compiled.render(texture_paths(texture_set.directory, texture_set.rvmat_filename))
+                try:
+                    atomic_write(output_path, (encode_text(content),))
+                except OSError as e:
+                    self.write_failures.append(output_path)
+                    self._log(f"  ✗ 写入 RVMAT 失败: {output_path}: {e}", LOG_WARNING)
+                    continue
+                self.generated_files.append(output_path)
+            rvmat_files.append(output_path)
+        return rvmat_files
+
+    def generate(self, texture_sets, progress_callback=None, cancel_event=None):
+        """
+        为纹理组生成 RVMAT 及其损坏材质变体
+
+        Args:
+            texture_sets: TextureSet 列表
+            progress_callback: 进度回调 callback(已完成数, 总数, 文件路径, 是否成功)
+            cancel_event: threading.Event，置位后停止处理
+
+        Returns:
+            tuple: (成功数, 失败数)
+        """
+        self.cancelled = False
+        rvmat_files = self.write_rvmat_files(texture_sets, cancel_event)
+        self._log(f"生成了 {len(self.generated_files)} 个RVMAT文件，保留了 {len(self.existing_files)} 个已有文件")
+        if self.write_failures:
+            self._log(f"写入失败: {len(self.write_failures)} 个RVMAT文件", LOG_WARNING)
+        if self.cancelled:
+            return 0, len(self.write_failures)
+
+        success_count, fail_count = self.batch_processor.process_files(rvmat_files, progress_callback, cancel_event)
+        self.cancelled = self.batch_processor.cancelled
+        return success_count, fail_count + len(self.write_failures)
+
+    def generate_directories(self, directories, progress_callback=None, cancel_event=None):
+        """
+        扫描目录中的纹理组并生成，参数与返回值与 generate 相同，适合放在后台线程中整体运行
+
+        Args:
+            directories: 要扫描的根目录列表
+        """
+        self.texture_sets = []
+        self.incomplete_sets = []
+        for directory in directories:
+            found, incomplete = find_texture_sets(directory, self.require_complete)
+            self.texture_sets.extend(found)
+            self.incomplete_sets.extend(incomplete)
+
+        self._log(f"找到 {len(self.texture_sets)} 个纹理组，跳过 {len(self.incomplete_sets)} 个不完整的纹理组")
+        for texture_set in self.incomplete_sets:
+            missing = ", ".join(texture_set.missing_slots)
+            self._log(f"  - {os.path.join(texture_set.directory, texture_set.basename)} 缺少: {missing}")
+        return self.generate(self.texture_sets, progress_callback, cancel_event)
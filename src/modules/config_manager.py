@@ -4,15 +4,24 @@
 """
 
 import os
+import sys
 import json
+import atexit
+import threading
 from pathlib import Path
 
 
 class ConfigManager:
     """配置管理器"""
     
-    def __init__(self, config_file="app_config.json"):
-        """初始化配置管理器"""
+    def __init__(self, config_file="app_config.json", save_delay=0.5):
+        """
+        初始化配置管理器
+        
+        Args:
+            config_file: 配置文件名
+            save_delay: 修改后延迟保存的秒数，界面事件中的连续修改合并为一次写入
+        """
         # 获取用户配置目录
         self.config_dir = Path.home() / ".rvmat_creator"
         # 确保配置目录存在
@@ -26,10 +35,18 @@ class ConfigManager:
         }
         # 当前配置
         self.config = self.default_config.copy()
-        # 加载现有配置
+        self.save_delay = save_delay
+        # 保护 config、save_timer 与 dirty
+        self.lock = threading.RLock()
+        # 串行化文件写入，先取快照的保存先写完，旧快照不会覆盖新快照
+        self.save_lock = threading.Lock()
+        self.save_timer = None
+        self.dirty = False
+        # 目录是否可写，None 表示尚未检查
+        self.writable = None
+        # 加载现有配置（构造时不写文件，配置首次修改时才创建）
         self.load_config()
-        print(f"配置文件路径: {self.config_file}")
-        print(f"初始配置: {self.config}")
+        atexit.register(self.flush)
     
     def load_config(self):
         """加载配置文件"""
@@ -39,44 +56,72 @@ class ConfigManager:
                     loaded_config = json.load(f)
                     # 合并默认配置和加载的配置
                     self.config.update(loaded_config)
-            else:
-                # 如果配置文件不存在，创建默认配置文件
-                self.save_config()
         except Exception as e:
-            print(f"加载配置文件时出错: {e}")
+            print(f"加载配置文件时出错: {e}", file=sys.stderr)
             # 使用默认配置
             self.config = self.default_config.copy()
     
-    def save_config(self):
-        """保存配置到文件"""
-        print(f"尝试保存配置到: {self.config_file}")
-        print(f"配置目录是否存在: {self.config_dir.exists()}")
-        print(f"配置文件是否存在: {self.config_file.exists()}")
-        try:
-            # 检查目录权限
+    def _check_writable(self):
+        """检查配置目录是否可写，只在首次保存时检查一次"""
+        if self.writable is None:
             test_file = self.config_dir / "test_permission.txt"
-            with open(test_file, "w") as f:
-                f.write("test")
-            test_file.unlink()
-            print("目录写入权限正常")
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-            print("配置文件保存成功")
-        except Exception as e:
-            print(f"保存配置文件时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            try:
+                with open(test_file, "w") as f:
+                    f.write("test")
+                test_file.unlink()
+                self.writable = True
+            except OSError as e:
+                print(f"配置目录不可写，配置将不会保存: {e}", file=sys.stderr)
+                self.writable = False
+        return self.writable
+    
+    def save_config(self):
+        """立即保存配置到文件（先写临时文件再替换，不会留下写了一半的配置文件）"""
+        with self.save_lock:
+            with self.lock:
+                if self.save_timer is not None:
+                    self.save_timer.cancel()
+                    self.save_timer = None
+                self.dirty = False
+                # 在锁内复制快照，序列化与写文件时其他线程仍可修改配置
+                snapshot = dict(self.config)
+            data = json.dumps(snapshot, ensure_ascii=False, indent=2)
+            if not self._check_writable():
+                return
+            temp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_file, self.config_file)
+            except OSError as e:
+                print(f"保存配置文件时出错: {e}", file=sys.stderr)
+    
+    def schedule_save(self):
+        """在 save_delay 秒后保存，期间的多次修改只写一次文件"""
+        with self.lock:
+            self.dirty = True
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+            self.save_timer = threading.Timer(self.save_delay, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+    
+    def flush(self):
+        """保存尚未写入的修改，程序退出时也会自动调用"""
+        if self.dirty:
+            self.save_config()
     
     def get(self, key, default=None):
         """获取配置项"""
-        return self.config.get(key, default)
+        with self.lock:
+            return self.config.get(key, default)
     
     def set(self, key, value):
         """设置配置项"""
-        self.config[key] = value
-        # 自动保存配置
-        self.save_config()
+        with self.lock:
+            self.config[key] = value
+            # 延迟自动保存配置
+            self.schedule_save()
     
     def get_language(self):
         """获取语言设置"""
@@ -84,18 +129,7 @@ class ConfigManager:
     
     def set_language(self, language):
         """设置语言"""
-        print(f"设置语言: {language}")
-        self.config["language"] = language
-        print(f"更新后配置: {self.config}")
-        self.save_config()
-        print(f"配置已保存到: {self.config_file}")
-        # 验证配置是否保存成功
-        try:
-            with open(self.config_file, "r", encoding="utf-8") as f:
-                saved_config = json.load(f)
-            print(f"验证保存的配置: {saved_config}")
-        except Exception as e:
-            print(f"验证配置时出错: {e}")
+        self.set("language", language)
     
     def get_last_directory(self):
         """获取上次使用的目录"""
@@ -103,5 +137,4 @@ class ConfigManager:
     
     def set_last_directory(self, directory):
         """设置上次使用的目录"""
-        self.config["last_directory"] = directory
-        self.save_config()
\ No newline at end of file
+        self.set("last_directory", directory)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+文件选择模型模块
+按规范化路径键去重的有序文件集合，拖拽、对话框选择与批量处理共用，
+同一文件（大小写或分隔符不同）只会排队一次
+"""
+
+import os
+
+
+def normalize_path_key(file_path):
+    """
+    返回文件路径的规范化键
+
+    转为绝对路径并统一分隔符与大小写，例如 "C:\\Mods\\A.rvmat" 与 "c:/mods/a.RVMAT" 的键相同
+    """
+    return os.path.normcase(os.path.abspath(file_path)).casefold()
+
+
+class FileSelection:
+    """
+    去重的有序文件集合
+
+    每个文件有稳定的行 ID（供列表控件使用）和规范化路径键（用于去重与按键移除），
+    成员检查、添加与移除均为 O(1)，按添加顺序迭代文件路径
+    """
+
+    def __init__(self, file_paths=()):
+        # 行 ID -> 文件路径，字典保持插入顺序，即显示顺序
+        self.paths = {}
+        # 路径键 -> 行 ID
+        self.keys = {}
+        self.next_id = 0
+        # 按显示顺序排列的行 ID 列表，供 window 按下标切片，集合变化后置空并在下次使用时重建
+        self.order = None
+        # 最近一次 add 跳过的重复文件数
+        self.skipped = 0
+        if file_paths:
+            self.add(file_paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        """按添加顺序产出文件路径"""
+        return iter(self.paths.values())
+
+    def __contains__(self, file_path):
+        return normalize_path_key(file_path) in self.keys
+
+    def add(self, file_paths):
+        """
+        添加文件，已存在的文件（包括本次输入中重复的文件）会被跳过
+
+        Returns:
+            tuple: (新文件的行 ID 列表, 跳过的重复文件数)
+        """
+        keys = self.keys
+        paths = self.paths
+        new_ids = []
+        skipped = 0
+        for file_path in file_paths:
+            key = normalize_path_key(file_path)
+            if key in keys:
+                skipped += 1
+                continue
+            row_id = f"f{self.next_id}"
+            self.next_id += 1
+            keys[key] = row_id
+            paths[row_id] = file_path
+            new_ids.append(row_id)
+        if new_ids:
+            self.order = None
+        self.skipped = skipped
+        return new_ids, skipped
+
+    def remove(self, row_id):
+        """
+        按行 ID 移除文件
+
+        Returns:
+            str: 被移除的文件路径，行 ID 不存在时返回 None
+        """
+        file_path = self.paths.pop(row_id, None)
+        if file_path is not None:
+            del self.keys[normalize_path_key(file_path)]
+            self.order = None
+        return file_path
+
+    def remove_key(self, key):
+        """按规范化路径键移除文件，返回被移除的文件路径或 None"""
+        row_id = self.keys.get(key)
+        return self.remove(row_id) if row_id is not None else None
+
+    def discard(self, file_path):
+        """按文件路径移除文件，返回被移除的文件路径或 None"""
+        return self.remove_key(normalize_path_key(file_path))
+
+    def clear(self):
+        """清空集合，行 ID 不会复用"""
+        self.paths = {}
+        self.keys = {}
+        self.order = None
+        self.skipped = 0
+
+    def copy(self):
+        """返回包含相同文件与行 ID 的副本"""
+        other = FileSelection()
+        other.paths = dict(self.paths)
+        other.keys = dict(self.keys)
+        other.next_id = self.next_id
+        return other
+
+    def to_list(self):
+        """按添加顺序返回文件路径列表"""
+        return list(self.paths.values())
+
+    def path_of(self, row_id):
+        return self.paths.get(row_id)
+
+    def window(self, first, count):
+        """
+        返回从 first 开始的最多 count 个行 ID
+
+        滚动时集合不变，重复调用只需 O(count) 切片；添加或移除文件后的首次调用重建一次行 ID 列表
+        """
+        if self.order is None:
+            self.order = list(self.paths)
+        return self.order[first:first + count]
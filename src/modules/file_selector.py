@@ -3,22 +3,27 @@
 提供文件选择功能作为拖拽的替代方案
 """
 
-import tkinter as tk
-from tkinter import filedialog
 import os
 
+from .rvmat_scanner import RvmatScanner, VARIANT_KEYWORDS
+from .run_metrics import RunMetrics, STAGE_SCAN, COUNTER_FILES_FOUND
+
 
 class FileSelector:
     """文件选择器类"""
     
-    def __init__(self, log_callback=None):
+    def __init__(self, log_callback=None, metrics=None, variant_keywords=VARIANT_KEYWORDS):
         """
         初始化文件选择器
         
         Args:
             log_callback: 日志回调函数
+            metrics: RunMetrics 实例，记录目录扫描耗时与找到的文件数
+            variant_keywords: 扫描目录时要排除的变体文件名关键词
         """
         self.log_callback = log_callback
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.variant_keywords = variant_keywords
     
     def select_files_dialog(self, parent=None):
         """
@@ -30,6 +35,9 @@ class FileSelector:
         Returns:
             list: 选择的文件路径列表
         """
+        # 延迟导入，命令行和工作进程无需加载 tkinter
+        from tkinter import filedialog
+        
         files = filedialog.askopenfilenames(
             parent=parent,
             title="选择RVMAT文件",
@@ -53,6 +61,8 @@ class FileSelector:
         Returns:
             str: 选择的目录路径
         """
+        from tkinter import filedialog
+        
         directory = filedialog.askdirectory(
             parent=parent,
             title="选择包含RVMAT文件的目录"
@@ -76,27 +86,15 @@ class FileSelector:
         if not os.path.isdir(directory):
             return []
         
-        rvmat_files = []
-        excluded_files = []
-        
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.lower().endswith('.rvmat'):
-                    file_path = os.path.join(root, file)
-                    filename_lower = file.lower()
-                    
-                    # 检查文件名是否包含排除的关键词
-                    if any(keyword in filename_lower for keyword in ['_worn', '_damage', '_destruct']):
-                        excluded_files.append(file_path)
-                        if self.log_callback:
-                            self.log_callback(f"排除损坏材质文件: {file}")
-                    else:
-                        rvmat_files.append(file_path)
+        scanner = RvmatScanner(exclude_variants=True, variant_keywords=self.variant_keywords)
+        with self.metrics.stage(STAGE_SCAN):
+            rvmat_files = list(scanner.scan(directory))
+        self.metrics.count(COUNTER_FILES_FOUND, len(rvmat_files))
         
         if self.log_callback:
             if rvmat_files:
                 self.log_callback(f"从目录中找到 {len(rvmat_files)} 个RVMAT文件")
-            if excluded_files:
-                self.log_callback(f"排除了 {len(excluded_files)} 个损坏材质文件")
+            if scanner.excluded_count:
+                self.log_callback(f"排除了 {scanner.excluded_count} 个损坏材质文件")
         
-        return rvmat_files
\ No newline at end of file
+        return rvmat_files
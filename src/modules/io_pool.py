@@ -0,0 +1,147 @@
+"""
+并发 I/O 模块
+在有界线程池中执行文件读写，并按挂载点限制同时进行的操作数。
+SMB 等高延迟存储上可以同时保持多个请求在途，批处理受带宽而不是往返延迟限制
+"""
+
+import os
+import time
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 默认 I/O 线程数
+DEFAULT_IO_WORKERS = 32
+# 未单独配置的挂载点上同时进行的最大操作数
+DEFAULT_MOUNT_LIMIT = 8
+
+
+@lru_cache(maxsize=4096)
+def _mount_of_directory(directory):
+    """返回目录所在的挂载点，Windows 上为盘符或 \\\\server\\share"""
+    drive, _ = os.path.splitdrive(directory)
+    if drive:
+        return os.path.normcase(drive)
+    path = directory
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def mount_point(file_path):
+    """返回文件所在的挂载点"""
+    return _mount_of_directory(os.path.dirname(os.path.abspath(file_path)))
+
+
+def parse_mount_limits(specs):
+    """
+    解析 "路径=数量" 形式的并发限制
+
+    Returns:
+        dict: 路径 -> 数量
+
+    Raises:
+        ValueError: 格式无效或数量小于 1
+    """
+    limits = {}
+    for spec in specs or ():
+        path, separator, value = spec.rpartition('=')
+        if not separator or not path or not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"无效的并发限制: {spec}，格式应为 路径=数量")
+        limits[path] = int(value)
+    return limits
+
+
+class MountLimiter:
+    """按挂载点分配的信号量"""
+
+    def __init__(self, default_limit=DEFAULT_MOUNT_LIMIT, limits=None):
+        """
+        Args:
+            default_limit: 未单独配置的挂载点的并发数
+            limits: 路径 -> 并发数，路径会被换算为其所在的挂载点
+        """
+        self.default_limit = max(1, default_limit)
+        self.limits = {}
+        for path, limit in (limits or {}).items():
+            self.limits[_mount_of_directory(os.path.abspath(path))] = max(1, limit)
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def limit_for(self, mount):
+        return self.limits.get(mount, self.default_limit)
+
+    def semaphore(self, mount):
+        """返回挂载点的信号量，首次使用时创建"""
+        with self.lock:
+            semaphore = self.semaphores.get(mount)
+            if semaphore is None:
+                semaphore = self.semaphores[mount] = threading.BoundedSemaphore(self.limit_for(mount))
+            return semaphore
+
+
+class IoCancelled(Exception):
+    """线程池已取消，操作在取得挂载点信号量后没有执行"""
+
+
+def _run_limited(semaphore, stopped, function, args):
+    """在挂载点信号量内执行，返回 (结果, 耗时)"""
+    with semaphore:
+        if stopped.is_set():
+            raise IoCancelled()
+        start = time.perf_counter()
+        result = function(*args)
+        return result, time.perf_counter() - start
+
+
+class IoPool:
+    """
+    有界 I/O 线程池
+
+    用法:
+        with IoPool(limits={"//server/share": 4}) as pool:
+            future = pool.submit(file_path, read_function, file_path)
+            result, seconds = future.result()
+    """
+
+    def __init__(self, max_workers=DEFAULT_IO_WORKERS, default_limit=DEFAULT_MOUNT_LIMIT, limits=None):
+        """
+        Args:
+            max_workers: 线程数
+            default_limit: 每个挂载点的默认并发数
+            limits: 路径 -> 并发数
+        """
+        self.limiter = MountLimiter(default_limit, limits)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="rvmat-io")
+        self.stopped = threading.Event()
+
+    def submit(self, file_path, function, *args):
+        """
+        提交一个针对 file_path 的 I/O 操作，受其挂载点的并发限制
+
+        Returns:
+            Future: 结果为 (function 的返回值, 耗时秒数)
+        """
+        semaphore = self.limiter.semaphore(mount_point(file_path))
+        return self.executor.submit(_run_limited, semaphore, self.stopped, function, args)
+
+    def cancel(self):
+        """
+        取消尚未执行的操作：之后才开始执行的操作（排队中或正在等待挂载点信号量）以 IoCancelled 结束，
+        正在执行的操作照常完成
+        """
+        self.stopped.set()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
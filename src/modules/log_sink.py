@@ -0,0 +1,123 @@
+"""
+日志缓冲模块
+线程安全、容量有限的日志环形缓冲区：任意线程写入，Tk 主线程定时把新消息合并后一次性写入文本控件。
+逐文件的详细日志使用 DEBUG 级别，默认不逐条显示，只在每次刷新时汇总为一行
+"""
+
+import threading
+from collections import deque
+
+
+# 日志级别
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_WARNING = 30
+LOG_ERROR = 40
+
+
+class LogSink:
+    """有界日志缓冲区"""
+
+    def __init__(self, capacity=5000, flush_interval=100, min_level=LOG_INFO):
+        """
+        初始化日志缓冲区
+
+        Args:
+            capacity: 环形缓冲区、等待队列及每个文本控件保留的最大条数/行数
+            flush_interval: 刷新到文本控件的间隔（毫秒）
+            min_level: 逐条显示的最低级别，低于该级别的消息只计数并汇总
+        """
+        self.capacity = max(1, capacity)
+        self.flush_interval = flush_interval
+        self.min_level = min_level
+        self.lock = threading.Lock()
+        # 已显示的消息，新附加的控件从这里回放
+        self.lines = deque(maxlen=self.capacity)
+        # 等待写入控件的消息，主线程停顿时最旧的消息被丢弃
+        self.pending = deque(maxlen=self.capacity)
+        self.suppressed = 0
+        # 等待队列已满时丢弃的消息数
+        self.dropped = 0
+        self.widgets = []
+        self.root = None
+
+    def log(self, message, level=LOG_INFO):
+        """写入一条日志，可在任意线程中调用"""
+        with self.lock:
+            if level < self.min_level:
+                self.suppressed += 1
+                return
+            if len(self.pending) == self.capacity:
+                self.dropped += 1
+            self.pending.append(message)
+
+    def start(self, root):
+        """在 Tk 主线程中开始定时刷新"""
+        self.root = root
+        root.after(self.flush_interval, self._tick)
+
+    def attach(self, widget):
+        """附加文本控件，并写入缓冲区中已有的日志"""
+        self.flush()
+        if widget in self.widgets:
+            return
+        self.widgets.append(widget)
+        if self.lines:
+            widget.insert("end", "\n".join(self.lines) + "\n")
+            widget.see("end")
+
+    def detach(self, widget):
+        """移除文本控件"""
+        if widget in self.widgets:
+            self.widgets.remove(widget)
+
+    def clear(self):
+        """清空缓冲区与所有控件"""
+        with self.lock:
+            self.lines.clear()
+            self.pending.clear()
+            self.suppressed = 0
+            self.dropped = 0
+        for widget in self.widgets:
+            widget.delete("1.0", "end")
+
+    def _take_pending(self):
+        with self.lock:
+            messages = list(self.pending)
+            self.pending.clear()
+            if self.dropped:
+                messages.insert(0, f"（日志过多，已丢弃 {self.dropped} 条较早的消息）")
+                self.dropped = 0
+            if self.suppressed:
+                messages.append(f"（已省略 {self.suppressed} 条详细日志）")
+                self.suppressed = 0
+        return messages
+
+    def flush(self):
+        """把等待中的消息写入缓冲区和控件，必须在 Tk 主线程中调用"""
+        messages = self._take_pending()
+        if not messages:
+            return
+        # 单条消息可能包含换行，按行计算容量
+        new_lines = "\n".join(messages).split("\n")
+        self.lines.extend(new_lines)
+
+        if len(new_lines) > self.capacity:
+            new_lines = new_lines[-self.capacity:]
+        text = "\n".join(new_lines) + "\n"
+        for widget in list(self.widgets):
+            try:
+                widget.insert("end", text)
+                # 文本末尾总有一个空行，行数 = 最后索引的行号 - 1
+                line_count = int(widget.index("end-1c").split(".")[0]) - 1
+                if line_count > self.capacity:
+                    widget.delete("1.0", f"{line_count - self.capacity + 1}.0")
+                widget.see("end")
+            except Exception:
+                # 控件已被销毁
+                self.widgets.remove(widget)
+
+    def _tick(self):
+        self.flush()
+        if self.root is not None:
+            self.root.after(self.flush_interval, self._tick)
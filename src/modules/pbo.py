@@ -0,0 +1,251 @@
+"""
+PBO 归档模块
+把生成的材质直接写入未压缩的 PBO 归档（不再逐个写小文件再由打包工具重新读取），
+并提供读取与校验 PBO 的读取器
+
+PBO 结构:
+    头表：每个条目为 文件名\\0 + 5 个 u32（打包方式、原始大小、保留、时间戳、数据大小）
+        第一个条目名称为空、打包方式为 "Vers"，其后是以空字符串结束的 键\\0值\\0 扩展字段（例如 prefix）
+        最后一个条目名称为空、所有字段为 0，表示头表结束
+    数据：按头表顺序依次存放每个文件的内容
+    校验：一个 0x00 字节，加上之前所有字节的 SHA1（20 字节）
+"""
+
+import os
+import time
+import struct
+import hashlib
+
+
+# "Vers" 条目的打包方式（小端读取的 b"sreV"）
+PBO_METHOD_VERSION = 0x56657273
+# 压缩条目的打包方式 "Cprs"
+PBO_METHOD_COMPRESSED = 0x43707273
+PBO_METHOD_STORED = 0
+
+_ENTRY_FIELDS = struct.Struct('<5I')
+
+
+class PboError(ValueError):
+    """PBO 格式错误"""
+
+
+def _asciiz(text):
+    return text.encode('utf-8') + b'\0'
+
+
+class PboWriter:
+    """
+    在内存中收集文件，关闭时一次写出 PBO 归档
+
+    用法:
+        with PboWriter("materials.pbo", root_dir="P:/mymod", prefix="mymod") as pbo:
+            pbo.add("P:/mymod/data/a_worn.rvmat", chunks)
+    """
+
+    def __init__(self, pbo_file, root_dir=None, prefix=None, extensions=None, timestamp=None):
+        """
+        Args:
+            pbo_file: 输出的 PBO 文件路径
+            root_dir: 条目名称相对于该目录，None 表示使用所有文件的公共父目录
+            prefix: 写入头部扩展字段 prefix 的值，例如 "mymod\\data"
+            extensions: 其他头部扩展字段（键 -> 值）
+            timestamp: 所有条目使用的时间戳，None 表示添加时的当前时间
+        """
+        self.pbo_file = os.fspath(pbo_file)
+        self.root_dir = os.path.abspath(root_dir) if root_dir else None
+        self.extensions = {}
+        if prefix:
+            self.extensions["prefix"] = prefix
+        self.extensions.update(extensions or {})
+        self.timestamp = timestamp
+        # 小写条目名称 -> [绝对路径或名称, 字节块元组, 时间戳]，同名文件后添加的覆盖先添加的
+        self.entries = {}
+        self.closed = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, file_path, chunks):
+        """添加一个文件，file_path 为其在磁盘上对应的路径，chunks 为内容字节块"""
+        file_path = os.path.abspath(file_path)
+        timestamp = self.timestamp if self.timestamp is not None else int(time.time())
+        self.entries[os.path.normcase(file_path).casefold()] = [file_path, tuple(chunks), timestamp]
+
+    def _entry_names(self):
+        """按条目计算归档中的名称（反斜杠分隔的相对路径）"""
+        paths = [entry[0] for entry in self.entries.values()]
+        root = self.root_dir
+        if root is None:
+            root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ""
+        return [os.path.relpath(path, root).replace(os.sep, '\\').replace('/', '\\') for path in paths]
+
+    def build_header(self, names):
+        """生成头表字节"""
+        entries = list(self.entries.values())
+        parts = [b'\0', _ENTRY_FIELDS.pack(PBO_METHOD_VERSION, 0, 0, 0, 0)]
+        for key, value in self.extensions.items():
+            parts.append(_asciiz(key))
+            parts.append(_asciiz(value))
+        parts.append(b'\0')
+        for name, (_, chunks, timestamp) in zip(names, entries):
+            size = sum(len(chunk) for chunk in chunks)
+            if name.startswith('..'):
+                raise PboError(f"文件不在归档根目录中: {name}")
+            parts.append(_asciiz(name))
+            parts.append(_ENTRY_FIELDS.pack(PBO_METHOD_STORED, size, 0, timestamp, size))
+        parts.append(b'\0')
+        parts.append(_ENTRY_FIELDS.pack(0, 0, 0, 0, 0))
+        return b''.join(parts)
+
+    def close(self):
+        """
+        写出归档（先写临时文件再替换），返回写入的字节数
+
+        头表与数据边写边计算 SHA1，不需要重新读取
+        """
+        if self.closed:
+            return 0
+        names = self._entry_names()
+        header = self.build_header(names)
+        digest = hashlib.sha1()
+        written = 0
+        temp_file = f"{self.pbo_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                digest.update(header)
+                f.write(header)
+                written += len(header)
+                for _, chunks, _ in self.entries.values():
+                    for chunk in chunks:
+                        digest.update(chunk)
+                        f.write(chunk)
+                        written += len(chunk)
+                f.write(b'\0')
+                f.write(digest.digest())
+                written += 1 + digest.digest_size
+            os.replace(temp_file, self.pbo_file)
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        self.closed = True
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 出错时不写出不完整的归档
+        if exc_type is None:
+            self.close()
+        return False
+
+
+class PboEntry:
+    """PBO 头表中的一个文件条目"""
+
+    __slots__ = ('name', 'method', 'original_size', 'reserved', 'timestamp', 'data_size', 'offset')
+
+    def __init__(self, name, method, original_size, reserved, timestamp, data_size, offset=0):
+        self.name = name
+        self.method = method
+        self.original_size = original_size
+        self.reserved = reserved
+        self.timestamp = timestamp
+        self.data_size = data_size
+        # 数据在文件中的偏移量
+        self.offset = offset
+
+    @property
+    def is_compressed(self):
+        return self.method == PBO_METHOD_COMPRESSED
+
+    def __repr__(self):
+        return f"PboEntry({self.name!r}, {self.data_size} 字节)"
+
+
+class PboReader:
+    """读取 PBO 归档的头表与文件内容"""
+
+    def __init__(self, pbo_file):
+        """
+        读取并解析头表
+
+        Raises:
+            OSError: 无法读取文件
+            PboError: 格式无效
+        """
+        self.pbo_file = os.fspath(pbo_file)
+        with open(self.pbo_file, 'rb') as f:
+            self.data = f.read()
+        self.extensions = {}
+        self.entries = []
+        self.data_end = 0
+        self._parse()
+        self.by_name = {entry.name.lower(): entry for entry in self.entries}
+
+    def _read_asciiz(self, offset):
+        end = self.data.find(b'\0', offset)
+        if end < 0:
+            raise PboError(f"头表在偏移量 {offset} 处被截断")
+        return self.data[offset:end].decode('utf-8', errors='replace'), end + 1
+
+    def _read_fields(self, offset):
+        if offset + _ENTRY_FIELDS.size > len(self.data):
+            raise PboError(f"头表在偏移量 {offset} 处被截断")
+        return _ENTRY_FIELDS.unpack_from(self.data, offset), offset + _ENTRY_FIELDS.size
+
+    def _parse(self):
+        offset = 0
+        first = True
+        entries = []
+        while True:
+            name, offset = self._read_asciiz(offset)
+            fields, offset = self._read_fields(offset)
+            method = fields[0]
+            if not name:
+                if method == PBO_METHOD_VERSION and first:
+                    # 扩展字段：键\0值\0 ...，以空字符串结束
+                    while True:
+                        key, offset = self._read_asciiz(offset)
+                        if not key:
+                            break
+                        value, offset = self._read_asciiz(offset)
+                        self.extensions[key] = value
+                    first = False
+                    continue
+                break
+            first = False
+            entries.append(PboEntry(name, *fields))
+
+        for entry in entries:
+            entry.offset = offset
+            offset += entry.data_size
+        if offset > len(self.data):
+            raise PboError("文件数据被截断")
+        self.entries = entries
+        self.data_end = offset
+
+    @property
+    def prefix(self):
+        return self.extensions.get("prefix", "")
+
+    def names(self):
+        return [entry.name for entry in self.entries]
+
+    def read(self, name):
+        """返回条目的原始数据（不区分大小写），不存在时抛出 KeyError"""
+        entry = self.by_name[name.replace('/', '\\').lower()]
+        if entry.is_compressed:
+            raise PboError(f"不支持压缩的条目: {entry.name}")
+        return self.data[entry.offset:entry.offset + entry.data_size]
+
+    def verify(self):
+        """校验结尾的 SHA1，没有校验和时返回 None"""
+        tail = self.data[self.data_end:]
+        if len(tail) < 21 or tail[0] != 0:
+            return None
+        return hashlib.sha1(self.data[:self.data_end]).digest() == tail[1:21]
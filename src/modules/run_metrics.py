@@ -0,0 +1,193 @@
+"""
+运行指标模块
+记录处理流程各阶段耗时与计数（读取/转换/写入字节数、文件数、错误数），
+可合并工作进程中的结果，并导出为 OpenMetrics 文本文件
+"""
+
+import os
+import time
+
+
+# 阶段名称
+STAGE_SCAN = "scan"
+STAGE_MANIFEST = "manifest"
+STAGE_READ = "read"
+STAGE_TRANSFORM = "transform"
+STAGE_WRITE = "write"
+STAGE_SYNC = "sync"
+STAGE_LOG = "log"
+
+# 计数器名称
+COUNTER_FILES_READ = "files_read"
+COUNTER_FILES_WRITTEN = "files_written"
+COUNTER_FILES_FOUND = "files_found"
+COUNTER_BYTES_READ = "bytes_read"
+COUNTER_BYTES_WRITTEN = "bytes_written"
+COUNTER_ERRORS = "errors"
+
+
+class _StageTimer:
+    """阶段计时上下文管理器"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RunMetrics:
+    """一次运行的阶段耗时与计数"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清空所有指标"""
+        # 阶段名称 -> [累计秒数, 调用次数]
+        self.stages = {}
+        self.counters = {}
+        self.started = None
+        self.elapsed = 0.0
+
+    def begin(self):
+        """开始计算总耗时"""
+        self.started = time.perf_counter()
+
+    def end(self):
+        """结束计算总耗时"""
+        if self.started is not None:
+            self.elapsed += time.perf_counter() - self.started
+            self.started = None
+
+    def stage(self, name):
+        """
+        返回阶段计时器
+
+        用法:
+            with metrics.stage("read"):
+                ...
+        """
+        return _StageTimer(self, name)
+
+    def add_time(self, name, seconds, calls=1):
+        """累加阶段耗时"""
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, name, value=1):
+        """累加计数器"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def stage_seconds(self, name):
+        """阶段累计耗时（秒）"""
+        entry = self.stages.get(name)
+        return entry[0] if entry else 0.0
+
+    def files_per_second(self, counter=COUNTER_FILES_READ):
+        """按总耗时计算的吞吐量"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.counters.get(counter, 0) / self.elapsed
+
+    def to_dict(self):
+        """转换为可序列化（可在进程间传递）的字典"""
+        return {
+            "elapsed_seconds": self.elapsed,
+            "stages": {name: {"seconds": seconds, "calls": calls}
+                       for name, (seconds, calls) in self.stages.items()},
+            "counters": dict(self.counters)
+        }
+
+    def merge(self, data):
+        """合并 to_dict() 的结果，例如工作进程返回的指标；总耗时不合并"""
+        for name, stage in data.get("stages", {}).items():
+            self.add_time(name, stage["seconds"], stage["calls"])
+        for name, value in data.get("counters", {}).items():
+            self.count(name, value)
+
+    def format_summary(self):
+        """生成用于日志显示的多行文本"""
+        lines = [f"总耗时: {self.elapsed:.3f} 秒，{self.files_per_second():.1f} 个文件/秒"]
+        for name, (seconds, calls) in self.stages.items():
+            lines.append(f"  {name:<10} {seconds * 1000:10.1f} ms  ({calls} 次)")
+        counters = self.counters
+        lines.append(f"  读取: {counters.get(COUNTER_FILES_READ, 0)} 个文件，{counters.get(COUNTER_BYTES_READ, 0)} 字节")
+        lines.append(f"  写入: {counters.get(COUNTER_FILES_WRITTEN, 0)} 个文件，{counters.get(COUNTER_BYTES_WRITTEN, 0)} 字节")
+        lines.append(f"  错误: {counters.get(COUNTER_ERRORS, 0)}")
+        return "\n".join(lines)
+
+    def to_openmetrics(self, prefix="rvmat_creator", labels=None):
+        """
+        生成 OpenMetrics 文本格式
+
+        Args:
+            prefix: 指标名前缀
+            labels: 附加到每个样本的标签字典
+        """
+        label_text = _format_labels(labels or {})
+        lines = [
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"# UNIT {prefix}_run_duration_seconds seconds",
+            f"# HELP {prefix}_run_duration_seconds Wall clock duration of the last run.",
+            f"{prefix}_run_duration_seconds{label_text} {_format_value(self.elapsed)}",
+            f"# TYPE {prefix}_files_per_second gauge",
+            f"# HELP {prefix}_files_per_second Files read per second in the last run.",
+            f"{prefix}_files_per_second{label_text} {_format_value(self.files_per_second())}"
+        ]
+
+        if self.stages:
+            name = f"{prefix}_stage_duration_seconds"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"# UNIT {name} seconds")
+            lines.append(f"# HELP {name} Time spent in each processing stage, summed over workers.")
+            for stage, (seconds, _) in self.stages.items():
+                stage_labels = _format_labels(dict(labels or {}, stage=stage))
+                lines.append(f"{name}_total{stage_labels} {_format_value(seconds)}")
+            name = f"{prefix}_stage_calls"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"# HELP {name} Number of times each processing stage ran.")
+            for stage, (_, calls) in self.stages.items():
+                stage_labels = _format_labels(dict(labels or {}, stage=stage))
+                lines.append(f"{name}_total{stage_labels} {calls}")
+
+        for counter, value in self.counters.items():
+            name = f"{prefix}_{counter}"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}_total{label_text} {value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, file_path, prefix="rvmat_creator", labels=None):
+        """写入 OpenMetrics 文本文件，先写临时文件再替换，抓取方不会读到半个文件"""
+        temp_file = f"{file_path}.tmp"
+        with open(temp_file, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self.to_openmetrics(prefix, labels))
+        os.replace(temp_file, file_path)
+
+
+def _format_value(value):
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
@@ -0,0 +1,375 @@
+"""
+RVMAT 解析器模块
+提供 RVMAT / config.cpp 语法的词法分析与解析，生成带偏移量的轻量类树
+"""
+
+import re
+from collections import namedtuple
+
+
+class RvmatParseError(ValueError):
+    """RVMAT 语法错误"""
+
+    def __init__(self, message, offset=None):
+        if offset is not None:
+            message = f"{message} (偏移量 {offset})"
+        super().__init__(message)
+        self.offset = offset
+
+
+# 词法规则：先跳过空白，再按顺序匹配一个词法单元
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<punct>\+=|[{}\[\];:=,])
+      | (?P<string>"(?:[^"]|"")*")
+      | (?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?(?![\w.\\/]))
+      | (?P<comment>//[^\n]*|/\*.*?\*/)
+      | (?P<other>\S)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+# 词法单元元组的字段下标
+KIND, VALUE, START, END = range(4)
+
+Token = namedtuple('Token', 'kind value start end')
+
+
+def _scan(text):
+    """将文本切分为 (类型, 值, 起始, 结束) 元组列表，末尾附加 eof 单元"""
+    tokens = []
+    append = tokens.append
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        value = match.group(kind)
+        end = match.end()
+        append((kind, value, end - len(value), end))
+    append(('eof', '', len(text), len(text)))
+    return tokens
+
+
+def tokenize(text):
+    """将文本切分为词法单元（跳过空白与注释，预处理指令以 '#' 单元出现）"""
+    for token in _scan(text)[:-1]:
+        yield Token(*token)
+
+
+def quote_string(value):
+    """将字符串转换为 RVMAT 字符串字面量（双引号通过重复转义）"""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def unquote_string(literal):
+    """将 RVMAT 字符串字面量还原为字符串"""
+    return literal[1:-1].replace('""', '"')
+
+
+class RvmatProperty:
+    """属性节点，记录整条语句与值的偏移量"""
+
+    __slots__ = ('name', 'value', 'is_array', 'append',
+                 'start', 'end', 'value_start', 'value_end')
+
+    def __init__(self, name, value, is_array, append, start, end, value_start, value_end):
+        self.name = name
+        self.value = value
+        self.is_array = is_array
+        self.append = append
+        self.start = start
+        self.end = end
+        self.value_start = value_start
+        self.value_end = value_end
+
+    @property
+    def span(self):
+        """值在原文中的 (起始, 结束) 偏移量"""
+        return self.value_start, self.value_end
+
+    def __repr__(self):
+        return f"RvmatProperty({self.name!r}, {self.value!r}, {self.value_start}, {self.value_end})"
+
+
+class RvmatClass:
+    """类节点，根节点的名称为空字符串"""
+
+    __slots__ = ('name', 'base', 'start', 'end', 'body_start', 'body_end',
+                 'entries', 'properties', 'classes', 'is_extern', 'deleted')
+
+    def __init__(self, name, base=None, start=0, end=0):
+        self.name = name
+        self.base = base
+        self.start = start
+        self.end = end
+        self.body_start = start
+        self.body_end = end
+        # 按出现顺序保存的子节点（RvmatProperty / RvmatClass）
+        self.entries = []
+        # 以小写名称为键的快速索引，配置语法不区分大小写
+        self.properties = {}
+        self.classes = {}
+        self.is_extern = False
+        self.deleted = []
+
+    def add(self, entry):
+        """添加子节点"""
+        self.entries.append(entry)
+        if isinstance(entry, RvmatClass):
+            self.classes[entry.name.lower()] = entry
+        else:
+            self.properties[entry.name.lower()] = entry
+
+    def get_class(self, name):
+        """按名称获取子类（不区分大小写）"""
+        return self.classes.get(name.lower())
+
+    def get_property(self, name):
+        """按名称获取属性（不区分大小写）"""
+        return self.properties.get(name.lower())
+
+    def find_class(self, path):
+        """按路径获取嵌套类，例如 "Stage3/uvTransform" """
+        node = self
+        for part in _split_path(path):
+            node = node.get_class(part)
+            if node is None:
+                return None
+        return node
+
+    def find_property(self, path):
+        """按路径获取属性，例如 "Stage3/texture" """
+        parts = _split_path(path)
+        if not parts:
+            return None
+        node = self.find_class('/'.join(parts[:-1])) if len(parts) > 1 else self
+        if node is None:
+            return None
+        return node.get_property(parts[-1])
+
+    def iter_properties(self, name=None, prefix=""):
+        """
+        递归产出所有属性 (路径, RvmatProperty)，路径形如 "Stage3/texture"
+
+        Args:
+            name: 只产出该名称的属性（不区分大小写），None 表示全部
+        """
+        key = name.lower() if name is not None else None
+        for entry in self.entries:
+            if isinstance(entry, RvmatClass):
+                yield from entry.iter_properties(name, f"{prefix}{entry.name}/")
+            elif key is None or entry.name.lower() == key:
+                yield f"{prefix}{entry.name}", entry
+
+    def __repr__(self):
+        return f"RvmatClass({self.name!r}, {len(self.entries)} entries, {self.start}, {self.end})"
+
+
+def _split_path(path):
+    return [part for part in re.split(r'[/.]', path) if part]
+
+
+class _Parser:
+    """递归下降解析器"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _scan(text)
+        self.pos = 0
+
+    def error(self, message, token):
+        return RvmatParseError(message, token[START])
+
+    def expect(self, value):
+        token = self.tokens[self.pos]
+        if token[VALUE] != value:
+            found = token[VALUE] if token[KIND] != 'eof' else "文件结尾"
+            raise self.error(f"期望 '{value}'，实际为 '{found}'", token)
+        self.pos += 1
+        return token
+
+    def parse(self):
+        root = RvmatClass('', start=0, end=len(self.text))
+        root.body_start = 0
+        root.body_end = len(self.text)
+        self.parse_entries(root, top_level=True)
+        return root
+
+    def parse_entries(self, owner, top_level=False):
+        tokens = self.tokens
+        while True:
+            token = tokens[self.pos]
+            kind = token[KIND]
+            value = token[VALUE]
+            if kind == 'ident':
+                next_token = tokens[self.pos + 1]
+                if value == 'class' and next_token[KIND] == 'ident':
+                    owner.add(self.parse_class())
+                elif value == 'delete' and next_token[KIND] == 'ident':
+                    owner.deleted.append(next_token[VALUE])
+                    self.pos += 2
+                    self.expect(';')
+                else:
+                    owner.add(self.parse_property())
+            elif value == ';':
+                # 空语句
+                self.pos += 1
+            elif value == '}':
+                if top_level:
+                    raise self.error("多余的 '}'", token)
+                return
+            elif value == '#':
+                self.skip_directive(token)
+            elif kind == 'eof':
+                if not top_level:
+                    raise self.error(f"类 {owner.name} 缺少 '}}'", token)
+                return
+            else:
+                raise self.error(f"意外的符号 '{value}'", token)
+
+    def skip_directive(self, token):
+        """跳过预处理指令（#include、#define 等），支持反斜杠续行"""
+        text = self.text
+        line_end = text.find('\n', token[START])
+        while line_end != -1 and text[line_end - 2:line_end].rstrip('\r').endswith('\\'):
+            line_end = text.find('\n', line_end + 1)
+        if line_end == -1:
+            line_end = len(text)
+
+        tokens = self.tokens
+        while tokens[self.pos][KIND] != 'eof' and tokens[self.pos][START] < line_end:
+            self.pos += 1
+
+    def parse_class(self):
+        tokens = self.tokens
+        start = tokens[self.pos][START]
+        name = tokens[self.pos + 1][VALUE]
+        self.pos += 2
+        base = None
+        if tokens[self.pos][VALUE] == ':':
+            base_token = tokens[self.pos + 1]
+            if base_token[KIND] != 'ident':
+                raise self.error(f"无效的父类名 '{base_token[VALUE]}'", base_token)
+            base = base_token[VALUE]
+            self.pos += 2
+
+        node = RvmatClass(name, base, start)
+        token = tokens[self.pos]
+        if token[VALUE] == ';':
+            # 外部声明 class Foo;
+            self.pos += 1
+            node.is_extern = True
+            node.end = node.body_start = node.body_end = token[END]
+            return node
+
+        node.body_start = self.expect('{')[END]
+        self.parse_entries(node)
+        closing = self.expect('}')
+        node.body_end = closing[START]
+        node.end = closing[END]
+        if tokens[self.pos][VALUE] == ';':
+            node.end = tokens[self.pos][END]
+            self.pos += 1
+        return node
+
+    def parse_property(self):
+        tokens = self.tokens
+        name_token = tokens[self.pos]
+        self.pos += 1
+        is_array = False
+        append = False
+        if tokens[self.pos][VALUE] == '[':
+            self.pos += 1
+            self.expect(']')
+            is_array = True
+
+        if is_array and tokens[self.pos][VALUE] == '+=':
+            self.pos += 1
+            append = True
+        else:
+            self.expect('=')
+
+        if is_array:
+            value_start = self.expect('{')[START]
+            value = self.parse_array_items()
+            value_end = tokens[self.pos - 1][END]
+        else:
+            value, value_start, value_end = self.parse_scalar((';', '}'))
+
+        end = value_end
+        if tokens[self.pos][VALUE] == ';':
+            end = tokens[self.pos][END]
+            self.pos += 1
+        return RvmatProperty(name_token[VALUE], value, is_array, append,
+                             name_token[START], end, value_start, value_end)
+
+    def parse_array_items(self):
+        tokens = self.tokens
+        items = []
+        if tokens[self.pos][VALUE] == '}':
+            self.pos += 1
+            return items
+        while True:
+            if tokens[self.pos][VALUE] == '{':
+                self.pos += 1
+                items.append(self.parse_array_items())
+            else:
+                items.append(self.parse_scalar((',', '}'))[0])
+            value = tokens[self.pos][VALUE]
+            if value == ',':
+                self.pos += 1
+                # 允许结尾多余的逗号
+                if tokens[self.pos][VALUE] == '}':
+                    self.pos += 1
+                    return items
+                continue
+            self.expect('}')
+            return items
+
+    def parse_scalar(self, terminators):
+        tokens = self.tokens
+        start_index = self.pos
+        first = tokens[start_index]
+
+        # 常见情况：单个字符串或数字后紧跟结束符（eof 之后没有符号，不能向后查看）
+        if first[KIND] in ('string', 'number') and tokens[start_index + 1][VALUE] in terminators:
+            self.pos += 1
+            if first[KIND] == 'string':
+                return unquote_string(first[VALUE]), first[START], first[END]
+            return _parse_number(first[VALUE]), first[START], first[END]
+
+        while True:
+            token = tokens[self.pos]
+            value = token[VALUE]
+            if value in terminators or token[KIND] == 'eof':
+                break
+            if value == '{' or value == '}':
+                raise self.error(f"意外的符号 '{value}'", token)
+            self.pos += 1
+
+        if self.pos == start_index:
+            raise self.error("缺少属性值", first)
+        # 未加引号的字符串，保留原文
+        value_start = first[START]
+        value_end = tokens[self.pos - 1][END]
+        return self.text[value_start:value_end], value_start, value_end
+
+
+def _parse_number(literal):
+    try:
+        return int(literal)
+    except ValueError:
+        return float(literal)
+
+
+def parse_rvmat(text):
+    """解析 RVMAT 文本，返回根类节点"""
+    return _Parser(text).parse()
+
+
+def decode_rvmat_text(data):
+    """将文本格式 RVMAT 的字节按 UTF-8 解码，无法解码时抛出 RvmatParseError"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise RvmatParseError(f"无法按 UTF-8 解码: {e.reason}", e.start) from None
@@ -4,17 +4,58 @@ RVMAT 文件处理器模块
 """
 
 import os
+import sys
+
+from .rvmat_parser import parse_rvmat, decode_rvmat_text
+from .rvmat_rapify import is_rapified, read_rapified
+from .variant_rules import default_rules
+from .run_metrics import (RunMetrics, STAGE_READ, STAGE_TRANSFORM, STAGE_WRITE, STAGE_SYNC, COUNTER_FILES_READ,
+                          COUNTER_FILES_WRITTEN, COUNTER_BYTES_READ, COUNTER_BYTES_WRITTEN, COUNTER_ERRORS)
 
 
 class RvmatProcessor:
     """RVMAT 文件处理器"""
     
-    def __init__(self):
-        self.texture_mappings = {
-            '_worn': r'dz\characters\data\generic_worn_mc.paa',
-            '_damage': r'dz\characters\data\generic_damage_mc.paa',
-            '_destruct': r'dz\characters\data\generic_destruct_mc.paa'
-        }
+    def __init__(self, write_if_changed=False, rules=None, binarize=False):
+        """
+        初始化处理器
+        
+        Args:
+            write_if_changed: 为 True 时内容未变化的变体文件不会被重写，保留其修改时间
+            rules: VariantRules 变体规则集，None 表示内置的 _worn/_damage/_destruct 规则
+            binarize: 为 True 时变体以 rapified 二进制格式输出，不需要再单独二进制化
+        """
+        self.rules = rules if rules is not None else default_rules()
+        self.write_if_changed = write_if_changed
+        self.binarize = binarize
+        self.metrics = RunMetrics()
+        # 写入过变体、尚未 fsync 的目录
+        self.written_directories = set()
+        # 提供 add(路径, 字节块) 方法的输出对象（例如 PboWriter），设置后变体写入其中而不是磁盘
+        self.output_sink = None
+        self.reset_stats()
+    
+    def __getstate__(self):
+        # 输出对象留在主进程中，不随处理器传给工作进程
+        state = self.__dict__.copy()
+        state["output_sink"] = None
+        return state
+    
+    def copy(self):
+        """返回配置相同（规则、binarize、write_if_changed）但统计、指标与输出对象独立的新处理器"""
+        return RvmatProcessor(write_if_changed=self.write_if_changed, rules=self.rules, binarize=self.binarize)
+    
+    def reset_stats(self):
+        """重置写入统计与运行指标"""
+        self.stats = {"writes": 0, "writes_skipped": 0}
+        self.metrics.reset()
+    
+    def merge_stats(self, stats, metrics=None):
+        """合并其他处理器（例如工作进程中）的写入统计与运行指标"""
+        for key, value in stats.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+        if metrics:
+            self.metrics.merge(metrics)
     
     def is_rvmat_file(self, file_path):
         """检查文件是否为 .rvmat 文件"""
@@ -23,64 +64,248 @@ class RvmatProcessor:
     def process_rvmat_file(self, input_file):
         """处理 RVMAT 文件并生成三种变体"""
         if not self.is_rvmat_file(input_file):
-            print(f"错误: {input_file} 不是有效的 .rvmat 文件")
+            print(f"错误: {input_file} 不是有效的 .rvmat 文件", file=sys.stderr)
             return False
         
+        metrics = self.metrics
         try:
             # 读取原文件内容
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with metrics.stage(STAGE_READ):
+                content, size = read_source(input_file)
+            self.record_read(size)
             
-            # 获取文件名（不含扩展名）
-            base_name = os.path.splitext(input_file)[0]
+            # 解析一次，按变体规则拼接出所有变体
+            with metrics.stage(STAGE_TRANSFORM):
+                variants = self.emit_variants(content)
             
-            # 为每种纹理生成文件
-            for suffix, texture_path in self.texture_mappings.items():
-                self._generate_variant(content, base_name, suffix, texture_path, input_file)
+            with metrics.stage(STAGE_WRITE):
+                for suffix, chunks in variants:
+                    self._write_variant(self.variant_path(input_file, suffix), chunks)
+            # 变体内容在重命名前 fsync，目录在 sync_written_directories 中按组 fsync
             
             return True
             
         except Exception as e:
-            print(f"处理文件时出错: {str(e)}")
+            self.record_error(e)
             return False
     
-    def _generate_variant(self, content, base_name, suffix, texture_path, input_file):
-        """生成特定变体的文件"""
-        # 替换 Stage3 中的 texture 参数
-        modified_content = self._replace_stage3_texture(content, texture_path)
+    def record_read(self, size):
+        """记录一次源文件读取"""
+        self.metrics.count(COUNTER_FILES_READ)
+        self.metrics.count(COUNTER_BYTES_READ, size)
+    
+    def record_write(self, output_file, written, chunks):
+        """
+        记录一次变体写入
         
-        # 生成新文件名
-        output_file = f"{base_name}{suffix}.rvmat"
+        Args:
+            output_file: 写入的文件路径，写入输出对象而不是磁盘时为 None
+            written: False 表示内容未变化而跳过
+        """
+        if not written:
+            self.stats["writes_skipped"] += 1
+            return
+        if output_file is not None:
+            self.written_directories.add(os.path.dirname(os.path.abspath(output_file)))
+        self.stats["writes"] += 1
+        self.metrics.count(COUNTER_FILES_WRITTEN)
+        self.metrics.count(COUNTER_BYTES_WRITTEN, sum(len(chunk) for chunk in chunks))
+    
+    def record_error(self, error):
+        """记录一个处理错误"""
+        self.metrics.count(COUNTER_ERRORS)
+        print(f"处理文件时出错: {str(error)}", file=sys.stderr)
+    
+    def variant_path(self, input_file, suffix):
+        """获取变体文件路径"""
+        base_name = os.path.splitext(input_file)[0]
+        return f"{base_name}{suffix}.rvmat"
+    
+    def variant_paths(self, input_file):
+        """获取源文件对应的所有变体文件路径"""
+        return [self.variant_path(input_file, suffix) for suffix in self.rules.suffixes]
+    
+    def variant_suffixes(self):
+        """所有变体的文件名后缀"""
+        return self.rules.suffixes
+    
+    def config_fingerprint(self):
+        """影响输出内容的配置，用于增量构建判断配置是否变化"""
+        fingerprint = {"variant_rules": self.rules.to_dict()}
+        # 只在启用时记录，已有的文本输出清单保持有效
+        if self.binarize:
+            fingerprint["binarize"] = True
+        return fingerprint
+    
+    def emit_variants(self, content):
+        """
+        生成所有变体的输出数据
         
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
-    
-    def _replace_stage3_texture(self, content, new_texture_path):
-        """替换 Stage3 中的 texture 参数"""
-        lines = content.split('\n')
-        in_stage3 = False
-        modified_lines = []
+        所有规则编译为一个改写计划，源文件只解析一次；未修改的原文片段编码一次后在所有变体间共享，
+        每个变体只需编码新的属性值。启用 binarize 时每个变体从同一棵类树编码为 rapified 数据。
         
-        for line in lines:
-            # 检查是否进入 Stage3 块
-            if 'class Stage3' in line:
-                in_stage3 = True
-                modified_lines.append(line)
-                continue
+        Args:
+            content: 源文件内容
             
-            # 检查是否离开 Stage3 块
-            if in_stage3 and line.strip().startswith('};'):
-                in_stage3 = False
-                modified_lines.append(line)
-                continue
+        Returns:
+            list: (后缀, 字节块元组) 列表，按顺序写入字节块即得到变体文件
+        """
+        if self.binarize:
+            return self.rules.rapify_variants(content)
+        return self.rules.compile_plan(content).emit(encode_text)
+    
+    def _write_variant(self, output_file, chunks):
+        """写入变体文件，设置了输出对象时写入输出对象"""
+        if self.output_sink is not None:
+            self.output_sink.add(output_file, chunks)
+            self.record_write(None, True, chunks)
+            return
+        self.record_write(output_file, write_chunks(output_file, chunks, self.write_if_changed), chunks)
+    
+    def sync_written_directories(self):
+        """
+        对写入过变体的目录各执行一次 fsync，使本组文件的重命名持久化（文件内容在重命名前已 fsync）
+        
+        批处理在每组文件（一次运行或一个进程池分块）结束时调用一次，而不是每个文件同步一次
+        
+        Returns:
+            int: 同步的目录数
+        """
+        if not self.written_directories:
+            return 0
+        directories = self.written_directories
+        self.written_directories = set()
+        with self.metrics.stage(STAGE_SYNC):
+            return sync_directories(directories)
+    
+    def texture_references(self, content):
+        """
+        返回内容中所有 texture 引用的 (类路径, 值) 列表，例如 ("Stage1/texture", "a\\b_nohq.paa")
+        
+        content 可以是文本，也可以是从文件读取的字节（rapified 二进制或 UTF-8 文本）
+        
+        Raises:
+            RvmatParseError: 内容无法解析或无法解码
+        """
+        if isinstance(content, bytes):
+            root = read_rapified(content) if is_rapified(content) else parse_rvmat(decode_rvmat_text(content))
+        else:
+            root = parse_rvmat(content)
+        return [(path, prop.value) for path, prop in root.iter_properties('texture')
+                if not prop.is_array and isinstance(prop.value, str)]
+    
+    def describe_textures(self, content, texture_index):
+        """
+        通过纹理索引检查并描述内容中引用的纹理，不访问文件系统
+        
+        Args:
+            content: RVMAT 文本或文件字节，参见 texture_references
+            texture_index: TextureIndex 实例
             
-            # 如果在 Stage3 块中，查找并替换 texture 参数
-            if in_stage3 and 'texture=' in line:
-                # 替换 texture 路径
-                modified_line = line.split('texture=')[0] + f'texture="{new_texture_path}";'
-                modified_lines.append(modified_line)
+        Returns:
+            list: (类路径, texture 值, 描述) 列表，纹理不存在时描述为 None，程序纹理 #(...) 原样说明
+        """
+        result = []
+        for path, texture in self.texture_references(content):
+            if texture.startswith('#'):
+                description = "程序纹理"
             else:
-                modified_lines.append(line)
-        
-        return '\n'.join(modified_lines)
\ No newline at end of file
+                description = texture_index.describe(texture)
+            result.append((path, texture, description))
+        return result
+
+
+def read_source(file_path):
+    """
+    读取源文件，可在 I/O 线程中调用
+
+    Returns:
+        tuple: (内容, 文件字节数)
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read(), os.fstat(f.fileno()).st_size
+
+
+def write_chunks(output_file, chunks, write_if_changed=False):
+    """
+    写入变体文件的字节块，可在 I/O 线程中调用
+
+    Returns:
+        bool: 写入时为 True，write_if_changed 且内容未变化而跳过时为 False
+    """
+    if write_if_changed and _file_matches(output_file, chunks):
+        return False
+    atomic_write(output_file, chunks)
+    return True
+
+
+# 只需持久化数据与文件大小，fdatasync 可以省去不必要的元数据写入（Windows 与 macOS 上没有）
+_sync_file = getattr(os, 'fdatasync', os.fsync)
+
+
+def atomic_write(output_file, chunks):
+    """
+    先写入同目录下的临时文件并 fsync，再重命名替换目标文件
+
+    写入中途出错、取消、进程崩溃或断电都不会留下只写了一半的目标文件：
+    重命名之前内容已落盘，目标文件要么是旧内容要么是完整的新内容。
+    重命名本身在 sync_directories 中按组持久化
+    """
+    temp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.writelines(chunks)
+            f.flush()
+            _sync_file(f.fileno())
+        os.replace(temp_file, output_file)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+
+
+def sync_directories(directories):
+    """
+    对目录执行 fsync，使其中的重命名在断电后也能保留
+
+    Windows 不能打开目录句柄，直接跳过
+
+    Returns:
+        int: 成功同步的目录数
+    """
+    if os.name == 'nt':
+        return 0
+    synced = 0
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+            synced += 1
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return synced
+
+
+def _file_matches(file_path, chunks):
+    """判断已有文件内容是否与待写入的字节块相同（先比较大小，再比较内容）"""
+    try:
+        if os.path.getsize(file_path) != sum(len(chunk) for chunk in chunks):
+            return False
+        with open(file_path, 'rb') as f:
+            return f.read() == b''.join(chunks)
+    except OSError:
+        return False
+
+
+def encode_text(text):
+    """按文本模式写入的规则编码（换行符转换为系统换行符）"""
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode('utf-8')
@@ -0,0 +1,287 @@
+"""
+RVMAT 二进制化模块
+把解析得到的类树编码为引擎直接加载的 rapified 二进制配置格式，并提供读取器用于校验
+
+格式:
+    文件头：b"\\0raP"、u32 0、u32 8、u32 枚举表偏移量
+    类体：父类名 asciiz、条目数（压缩整数）、条目
+    条目（首字节为类型）:
+        0 类：名称 asciiz + u32 类体偏移量
+        1 值：子类型（0 字符串 / 1 浮点数 / 2 整数）+ 名称 asciiz + 值
+        2 数组：名称 asciiz + 元素数（压缩整数）+ 元素（类型字节 + 值，3 表示嵌套数组）
+        3 外部类声明：名称 asciiz
+        4 删除类：名称 asciiz
+        5 数组追加（+=）：u32 标志 1 + 名称 asciiz + 数组
+    枚举表：u32 枚举数，RVMAT 中没有枚举，总为 0
+压缩整数为小端 7 位分组的变长整数（最高位表示后面还有字节）
+"""
+
+import struct
+
+from .rvmat_parser import RvmatClass, RvmatProperty, RvmatParseError, parse_rvmat
+
+
+RAP_SIGNATURE = b"\0raP"
+
+ENTRY_CLASS = 0
+ENTRY_VALUE = 1
+ENTRY_ARRAY = 2
+ENTRY_EXTERN = 3
+ENTRY_DELETE = 4
+ENTRY_ARRAY_APPEND = 5
+
+VALUE_STRING = 0
+VALUE_FLOAT = 1
+VALUE_INT = 2
+VALUE_ARRAY = 3
+
+_U32 = struct.Struct('<I')
+_I32 = struct.Struct('<i')
+_F32 = struct.Struct('<f')
+_HEADER = struct.Struct('<4sIII')
+
+_INT_MIN = -2 ** 31
+_INT_MAX = 2 ** 31 - 1
+
+
+def is_rapified(data):
+    """数据是否为 rapified 格式"""
+    return data[:4] == RAP_SIGNATURE
+
+
+def encode_compressed_int(value):
+    """编码压缩整数"""
+    if value < 0:
+        raise ValueError(f"压缩整数不能为负数: {value}")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _asciiz(text):
+    data = text.encode('utf-8')
+    if b'\0' in data:
+        raise ValueError(f"字符串中不能包含空字符: {text!r}")
+    return data + b'\0'
+
+
+def _scalar(value):
+    """返回标量的 (子类型, 编码后的值)；超出 32 位范围的整数按浮点数保存，其他值按字符串保存"""
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        if _INT_MIN <= value <= _INT_MAX:
+            return VALUE_INT, _I32.pack(value)
+        return VALUE_FLOAT, _F32.pack(float(value))
+    if isinstance(value, float):
+        return VALUE_FLOAT, _F32.pack(value)
+    return VALUE_STRING, _asciiz(str(value))
+
+
+def _encode_array(items, out):
+    out += encode_compressed_int(len(items))
+    for item in items:
+        if isinstance(item, (list, tuple)):
+            out.append(VALUE_ARRAY)
+            _encode_array(item, out)
+        else:
+            subtype, data = _scalar(item)
+            out.append(subtype)
+            out += data
+
+
+class _Encoder:
+    """按深度优先顺序写出类体：先写完一个类的全部条目，再依次写出子类的类体并回填偏移量"""
+
+    def __init__(self, overrides):
+        # id(RvmatProperty) -> 新值
+        self.overrides = overrides or {}
+        self.out = bytearray(_HEADER.size)
+
+    def write_body(self, node):
+        out = self.out
+        out += _asciiz(node.base or "")
+        out += encode_compressed_int(len(node.entries) + len(node.deleted))
+
+        children = []
+        for entry in node.entries:
+            if isinstance(entry, RvmatClass):
+                if entry.is_extern:
+                    out.append(ENTRY_EXTERN)
+                    out += _asciiz(entry.name)
+                else:
+                    out.append(ENTRY_CLASS)
+                    out += _asciiz(entry.name)
+                    children.append((len(out), entry))
+                    out += b'\0\0\0\0'
+                continue
+
+            value = self.overrides.get(id(entry), entry.value)
+            if entry.is_array:
+                if entry.append:
+                    out.append(ENTRY_ARRAY_APPEND)
+                    out += _U32.pack(1)
+                else:
+                    out.append(ENTRY_ARRAY)
+                out += _asciiz(entry.name)
+                _encode_array(value if isinstance(value, (list, tuple)) else [value], out)
+            else:
+                subtype, data = _scalar(value)
+                out.append(ENTRY_VALUE)
+                out.append(subtype)
+                out += _asciiz(entry.name)
+                out += data
+
+        for name in node.deleted:
+            out.append(ENTRY_DELETE)
+            out += _asciiz(name)
+
+        for position, child in children:
+            _U32.pack_into(out, position, len(out))
+            self.write_body(child)
+
+    def encode(self, root):
+        self.write_body(root)
+        out = self.out
+        enum_offset = len(out)
+        out += _U32.pack(0)
+        _HEADER.pack_into(out, 0, RAP_SIGNATURE, 0, 8, enum_offset)
+        return bytes(out)
+
+
+def rapify(root, overrides=None):
+    """
+    把类树编码为 rapified 二进制数据
+
+    Args:
+        root: parse_rvmat 返回的根类节点
+        overrides: id(RvmatProperty) -> 新值，用于在不修改类树的情况下生成变体
+
+    Returns:
+        bytes: rapified 数据
+
+    Raises:
+        ValueError: 值无法编码（例如字符串中包含空字符）
+    """
+    return _Encoder(overrides).encode(root)
+
+
+def rapify_text(content):
+    """解析 RVMAT 文本并编码为 rapified 二进制数据"""
+    return rapify(parse_rvmat(content))
+
+
+class _Decoder:
+    """rapified 数据读取器，生成与 parse_rvmat 相同结构的类树（偏移量均为 0）"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def error(self, message, offset):
+        return RvmatParseError(message, offset)
+
+    def asciiz(self, offset):
+        end = self.data.find(b'\0', offset)
+        if end < 0:
+            raise self.error("字符串被截断", offset)
+        return self.data[offset:end].decode('utf-8', errors='replace'), end + 1
+
+    def compressed_int(self, offset):
+        value = 0
+        shift = 0
+        while True:
+            if offset >= len(self.data):
+                raise self.error("压缩整数被截断", offset)
+            byte = self.data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value, offset
+            shift += 7
+
+    def scalar(self, subtype, offset):
+        if subtype == VALUE_STRING:
+            return self.asciiz(offset)
+        if subtype == VALUE_FLOAT:
+            return _F32.unpack_from(self.data, offset)[0], offset + 4
+        if subtype == VALUE_INT:
+            return _I32.unpack_from(self.data, offset)[0], offset + 4
+        raise self.error(f"未知的值类型 {subtype}", offset)
+
+    def array(self, offset):
+        count, offset = self.compressed_int(offset)
+        items = []
+        for _ in range(count):
+            subtype = self.data[offset]
+            offset += 1
+            if subtype == VALUE_ARRAY:
+                item, offset = self.array(offset)
+            else:
+                item, offset = self.scalar(subtype, offset)
+            items.append(item)
+        return items, offset
+
+    def body(self, node, offset):
+        base, offset = self.asciiz(offset)
+        node.base = base or None
+        count, offset = self.compressed_int(offset)
+        for _ in range(count):
+            kind = self.data[offset]
+            offset += 1
+            if kind == ENTRY_CLASS:
+                name, offset = self.asciiz(offset)
+                body_offset = _U32.unpack_from(self.data, offset)[0]
+                offset += 4
+                child = RvmatClass(name)
+                self.body(child, body_offset)
+                node.add(child)
+            elif kind == ENTRY_VALUE:
+                subtype = self.data[offset]
+                name, offset = self.asciiz(offset + 1)
+                value, offset = self.scalar(subtype, offset)
+                node.add(RvmatProperty(name, value, False, False, 0, 0, 0, 0))
+            elif kind in (ENTRY_ARRAY, ENTRY_ARRAY_APPEND):
+                append = False
+                if kind == ENTRY_ARRAY_APPEND:
+                    append = _U32.unpack_from(self.data, offset)[0] == 1
+                    offset += 4
+                name, offset = self.asciiz(offset)
+                value, offset = self.array(offset)
+                node.add(RvmatProperty(name, value, True, append, 0, 0, 0, 0))
+            elif kind == ENTRY_EXTERN:
+                name, offset = self.asciiz(offset)
+                child = RvmatClass(name)
+                child.is_extern = True
+                node.add(child)
+            elif kind == ENTRY_DELETE:
+                name, offset = self.asciiz(offset)
+                node.deleted.append(name)
+            else:
+                raise self.error(f"未知的条目类型 {kind}", offset - 1)
+        return offset
+
+
+def read_rapified(data):
+    """
+    读取 rapified 数据
+
+    Returns:
+        RvmatClass: 根类节点
+
+    Raises:
+        RvmatParseError: 数据不是有效的 rapified 格式
+    """
+    if len(data) < _HEADER.size or not is_rapified(data):
+        raise RvmatParseError("不是 rapified 格式的数据")
+    root = RvmatClass("")
+    try:
+        _Decoder(data).body(root, _HEADER.size)
+    except (struct.error, IndexError):
+        raise RvmatParseError("rapified 数据被截断") from None
+    return root
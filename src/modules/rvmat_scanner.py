@@ -0,0 +1,144 @@
+"""
+RVMAT 目录扫描模块
+基于 os.scandir 的流式扫描器，按规则剪枝目录，并在线程池中并行读取子目录，产出顺序固定
+"""
+
+import os
+import fnmatch
+
+
+# 损坏材质变体文件名中的关键词
+VARIANT_KEYWORDS = ('_worn', '_damage', '_destruct')
+
+# 默认跳过的目录（版本控制与缓存目录）
+DEFAULT_PRUNE_PATTERNS = ('.git', '.svn', '.hg', '__pycache__')
+
+class RvmatScanner:
+    """RVMAT 文件扫描器"""
+
+    def __init__(self, exclude_variants=True, prune_patterns=DEFAULT_PRUNE_PATTERNS, max_workers=8,
+                 extension='.rvmat', variant_keywords=VARIANT_KEYWORDS):
+        """
+        初始化扫描器
+
+        Args:
+            exclude_variants: 是否排除文件名包含 _worn/_damage/_destruct 的文件
+            prune_patterns: 要跳过的目录名通配符（不区分大小写）
+            max_workers: 遍历子目录的线程数，小于等于 1 时在调用线程中顺序遍历
+            extension: 要匹配的文件扩展名
+            variant_keywords: 变体文件名中的关键词，使用自定义变体规则时传入规则中的后缀
+        """
+        self.exclude_variants = exclude_variants
+        self.prune_patterns = tuple(pattern.lower() for pattern in (prune_patterns or ()))
+        self.max_workers = max_workers
+        self.extension = extension.lower()
+        self.variant_keywords = tuple(keyword.lower() for keyword in variant_keywords)
+        self.found_count = 0
+        self.excluded_count = 0
+
+    def is_pruned(self, dir_name):
+        """目录是否应被跳过"""
+        name = dir_name.lower()
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.prune_patterns)
+
+    def is_excluded(self, file_name):
+        """文件是否为应排除的损坏材质变体"""
+        if not self.exclude_variants:
+            return False
+        name = file_name.lower()
+        return any(keyword in name for keyword in self.variant_keywords)
+
+    def scan(self, directory):
+        """
+        扫描目录，边遍历边产出匹配的文件路径
+
+        Args:
+            directory: 根目录
+
+        Yields:
+            str: 匹配的文件路径
+        """
+        self.found_count = 0
+        self.excluded_count = 0
+        if not os.path.isdir(directory):
+            return
+
+        if self.max_workers is None or self.max_workers <= 1:
+            yield from self._scan_serial(directory)
+        else:
+            yield from self._scan_parallel(directory)
+
+    def _scan_dir(self, path):
+        """扫描单个目录，返回 (匹配文件, 排除数量, 子目录)"""
+        matches = []
+        excluded = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.is_pruned(entry.name):
+                                subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+
+                    if not entry.name.lower().endswith(self.extension):
+                        continue
+                    if self.is_excluded(entry.name):
+                        excluded += 1
+                    else:
+                        matches.append(entry.path)
+        except OSError:
+            # 与 os.walk 一样忽略无法访问的目录
+            pass
+        # scandir 的顺序取决于文件系统，排序后每次扫描的顺序一致
+        matches.sort()
+        subdirs.sort()
+        return matches, excluded, subdirs
+
+    def _scan_serial(self, directory):
+        """在调用线程中深度优先遍历"""
+        stack = [directory]
+        while stack:
+            matches, excluded, subdirs = self._scan_dir(stack.pop())
+            self.excluded_count += excluded
+            self.found_count += len(matches)
+            yield from matches
+            stack.extend(reversed(subdirs))
+
+    def _scan_parallel(self, directory):
+        """
+        在线程池中并行读取目录，调用线程按深度优先顺序产出结果
+
+        工作线程读完一个目录后立即提交其全部子目录，整棵树的读取不必等待调用线程；
+        产出顺序与顺序遍历相同，不随线程调度变化。
+        扫描是并行的，但调用方（批处理、文件选择）在扫描结束后才开始处理
+        """
+        # 延迟导入，界面启动时不加载 concurrent.futures
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rvmat-scan")
+
+        def visit(path):
+            matches, excluded, subdirs = self._scan_dir(path)
+            children = []
+            for subdir in subdirs:
+                try:
+                    children.append(executor.submit(visit, subdir))
+                except RuntimeError:
+                    # 调用方已停止迭代，线程池已关闭
+                    break
+            return matches, excluded, children
+
+        try:
+            stack = [executor.submit(visit, directory)]
+            while stack:
+                matches, excluded, children = stack.pop().result()
+                stack.extend(reversed(children))
+                self.excluded_count += excluded
+                self.found_count += len(matches)
+                yield from matches
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,277 @@
+"""
+RVMAT 模板模块
+提供一键生成 RVMAT 所用的默认模板与 texture 路径替换，不依赖 tkinter
+
+模板只编译一次：texture 位置被拆分为文字片段与命名插槽，渲染时只需拼接字符串。
+编译结果按模板文本缓存，模板文件按修改时间缓存。
+"""
+
+import os
+import re
+import sys
+from functools import lru_cache
+
+
+# 找不到模板文件时使用的内置默认模板
+DEFAULT_TEMPLATE = r"""ambient[]={1,1,1,1};
+diffuse[]={1,1,1,1};
+forcedDiffuse[]={0,0,0,0};
+emmisive[]={0,0,0,1};
+specular[]={1.5,1.5,1.7,1};
+specularPower=300;
+PixelShaderID="Super";
+VertexShaderID="Super";
+class Stage1
+{
+	texture="path\to\your\texture_nohq.paa";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={1,0,0};
+		up[]={0,1,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};
+class Stage2
+{
+	texture="#(argb,8,8,3)color(0.5,0.5,0.5,1,DT)";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={8,2,0};
+		up[]={-2,8,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};
+class Stage3
+{
+	texture="#(argb,8,8,3)color(0,0,0,0,MC)";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={1,0,0};
+		up[]={0,1,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};
+class Stage4
+{
+	texture="path\to\your\texture_as.paa";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={1,0,0};
+		up[]={0,1,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};
+class Stage5
+{
+	texture="path\to\your\texture_smdi.paa";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={1,0,0};
+		up[]={0,1,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};
+class Stage6
+{
+	texture="#(ai,64,64,1)fresnel(2.34,0.12)";
+	uvSource="none";
+};
+class Stage7
+{
+	texture="dz\data\data\env_land_co.paa";
+	uvSource="tex";
+	class uvTransform
+	{
+		aside[]={1,0,0};
+		up[]={0,1,0};
+		dir[]={0,0,0};
+		pos[]={0,0,0};
+	};
+};"""
+
+
+# 需要替换 texture 的 Stage：(类名, 插槽名, 文件名后缀)
+TEXTURE_SLOTS = (
+    ("Stage1", "nohq", "_nohq.paa"),
+    ("Stage4", "as", "_as.paa"),
+    ("Stage5", "smdi", "_smdi.paa")
+)
+
+# 编译时用于标记插槽位置的占位符
+_SLOT_MARKER = "\0{}\0"
+_SLOT_MARKER_PATTERN = re.compile(r"\0(\w+)\0")
+
+# 模板文件缓存：路径 -> ((修改时间, 大小), 模板内容)
+_template_file_cache = {}
+
+
+class CompiledTemplate:
+    """编译后的模板，由文字片段与插槽交替组成"""
+    
+    __slots__ = ('literals', 'slots')
+    
+    def __init__(self, literals, slots):
+        """
+        Args:
+            literals: 文字片段列表，比插槽多一个
+            slots: 插槽名列表
+        """
+        self.literals = literals
+        self.slots = slots
+    
+    def render(self, values):
+        """
+        渲染模板
+        
+        Args:
+            values: 插槽名 -> 替换文本
+        """
+        literals = self.literals
+        parts = [literals[0]]
+        for i, slot in enumerate(self.slots, 1):
+            parts.append(values[slot])
+            parts.append(literals[i])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def compile_template(content):
+    """
+    将模板编译为文字片段与 texture 插槽，结果按模板文本缓存
+    
+    用原有的替换规则把插槽标记代入模板，再按标记拆分，
+    因此渲染结果与逐个正则替换完全一致。
+    """
+    for stage, slot, _ in TEXTURE_SLOTS:
+        pattern = r'(class\s+' + stage + r'\s*\{[^}]*texture\s*=\s*"[^"]*"(;))'
+        replacement = 'class ' + stage + '\n{\n\ttexture="' + _SLOT_MARKER.format(slot) + '";'
+        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    
+    pieces = _SLOT_MARKER_PATTERN.split(content)
+    return CompiledTemplate(pieces[0::2], pieces[1::2])
+
+
+@lru_cache(maxsize=256)
+def _texture_root(folder_path):
+    """texture 路径前缀：移除盘符，反斜杠替换为正斜杠"""
+    # 移除盘符路径，只保留相对路径
+    # 例如: D:\Python Project\Rvmat-Creator -> Python Project\Rvmat-Creator
+    relative_path = folder_path
+    if ":" in folder_path:
+        # 移除盘符和第一个反斜杠
+        relative_path = folder_path.split(":", 1)[1]
+    
+    # 将反斜杠替换为正斜杠，符合RVMAT文件格式要求
+    return relative_path.replace("\\", "/")
+
+
+def texture_paths(folder_path, filename):
+    """
+    构造各插槽的 texture 路径 (相对路径 + 文件名 + 后缀)
+    
+    Returns:
+        dict: 插槽名 -> texture 路径
+    """
+    relative_path = _texture_root(folder_path)
+    # 获取不带扩展名的文件名
+    basename = os.path.splitext(filename)[0]
+    
+    paths = {}
+    for _, slot, suffix in TEXTURE_SLOTS:
+        path = f"{relative_path}/{basename}{suffix}"
+        # 确保路径开头没有斜杠
+        if path.startswith("/"):
+            path = path[1:]
+        paths[slot] = path
+    return paths
+
+
+def get_app_dir():
+    """获取程序所在目录（打包环境为 exe 所在目录，开发环境为项目根目录）"""
+    if getattr(sys, 'frozen', False):
+        # 打包环境
+        return os.path.dirname(sys.executable)
+    # 开发环境
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def find_default_template_path(app_dir=None):
+    """
+    查找默认模板文件，优先 @default.rvmat，其次 default.rvmat
+    
+    Returns:
+        str: 模板文件路径，不存在时返回 None
+    """
+    if app_dir is None:
+        app_dir = get_app_dir()
+    for name in ("@default.rvmat", "default.rvmat"):
+        template_path = os.path.join(app_dir, name)
+        if os.path.exists(template_path):
+            return template_path
+    return None
+
+
+def load_template_file(template_path):
+    """读取模板文件，文件修改时间与大小未变化时直接返回缓存内容"""
+    stat = os.stat(template_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _template_file_cache.get(template_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    with open(template_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    _template_file_cache[template_path] = (signature, content)
+    return content
+
+
+def load_default_template(app_dir=None):
+    """读取默认模板内容，模板文件不存在时返回内置模板"""
+    template_path = find_default_template_path(app_dir)
+    if template_path is None:
+        return DEFAULT_TEMPLATE
+    return load_template_file(template_path)
+
+
+def normalize_rvmat_filename(folder_path, filename=""):
+    """获取输出文件名，未指定时使用文件夹名称，并确保以 .rvmat 结尾"""
+    if not filename:
+        filename = os.path.basename(os.path.normpath(folder_path))
+    if not filename.endswith(".rvmat"):
+        filename += ".rvmat"
+    return filename
+
+
+def process_template_content(content, folder_path, filename):
+    """处理模板内容，替换texture路径"""
+    return compile_template(content).render(texture_paths(folder_path, filename))
+
+
+def generate_quick_rvmat(content, folder_path, filename=""):
+    """
+    根据模板在文件夹中生成 RVMAT 文件
+    
+    Args:
+        content: 模板内容
+        folder_path: 输出文件夹（也用于构造 texture 路径）
+        filename: RVMAT 文件名，为空时使用文件夹名称
+        
+    Returns:
+        str: 生成的文件路径
+    """
+    filename = normalize_rvmat_filename(folder_path, filename)
+    processed_content = process_template_content(content, folder_path, filename)
+    output_path = os.path.join(folder_path, filename)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(processed_content)
+    return output_path
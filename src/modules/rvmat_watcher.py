@@ -0,0 +1,252 @@
+"""
+RVMAT 目录监视模块
+监视目录中的源 RVMAT 文件，保存后自动重新生成损坏材质变体
+Linux 下使用 inotify，其他平台使用基于修改时间的轮询
+"""
+
+import os
+import sys
+import time
+import struct
+import select
+import threading
+
+from .rvmat_scanner import RvmatScanner
+
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingBackend:
+    """基于修改时间轮询的监视后端"""
+
+    name = "polling"
+
+    def __init__(self, directories, scanner, interval=1.0):
+        self.directories = list(directories)
+        self.scanner = scanner
+        self.interval = interval
+        self.snapshot = self._take_snapshot()
+        self.next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for directory in self.directories:
+            for file_path in self.scanner.scan(directory):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        """等待最多 timeout 秒，返回发生变化的文件路径列表"""
+        delay = self.next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        if delay > 0:
+            time.sleep(delay)
+        self.next_poll = time.monotonic() + self.interval
+
+        snapshot = self._take_snapshot()
+        changed = [path for path, signature in snapshot.items() if self.snapshot.get(path) != signature]
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """基于 Linux inotify 的监视后端"""
+
+    name = "inotify"
+
+    def __init__(self, directories, scanner):
+        import ctypes
+        import ctypes.util
+
+        self.scanner = scanner
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches = {}
+        for directory in directories:
+            self._watch_tree(directory)
+
+    def _watch_tree(self, directory):
+        """为目录及其所有未被剪枝的子目录添加监视"""
+        stack = [directory]
+        while stack:
+            path = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                continue
+            self.watches[wd] = path
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and not self.scanner.is_pruned(entry.name):
+                            stack.append(entry.path)
+            except OSError:
+                pass
+
+    def poll(self, timeout):
+        """等待最多 timeout 秒，返回发生变化的文件路径列表"""
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                print("inotify 事件队列溢出，部分修改可能被遗漏", file=sys.stderr)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                # 新建的子目录需要补充监视，其中已有的文件视为变化
+                if mask & (IN_CREATE | IN_MOVED_TO) and not self.scanner.is_pruned(os.path.basename(path)):
+                    self._watch_tree(path)
+                    changed.extend(self.scanner.scan(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_backend(directories, scanner, use_inotify=True, poll_interval=1.0):
+    """创建监视后端，inotify 不可用时回退到轮询"""
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyBackend(directories, scanner)
+        except (OSError, AttributeError) as e:
+            print(f"inotify 不可用，改用轮询: {e}", file=sys.stderr)
+    return PollingBackend(directories, scanner, poll_interval)
+
+
+class RvmatWatcher:
+    """RVMAT 目录监视器"""
+
+    def __init__(self, processor, directories, on_event=None, debounce=0.1, poll_interval=1.0,
+                 use_inotify=True):
+        """
+        初始化监视器
+
+        Args:
+            processor: RvmatProcessor 实例
+            directories: 要监视的目录列表
+            on_event: 处理完成回调 on_event(文件路径, 是否成功)，在监视线程中调用
+            debounce: 同一文件的事件合并窗口（秒）
+            poll_interval: 轮询后端的扫描间隔（秒）
+            use_inotify: 是否优先使用 inotify
+        """
+        self.processor = processor
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.on_event = on_event
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        # 只关注源文件，生成的变体文件不会再次触发处理
+        self.scanner = RvmatScanner(exclude_variants=True, max_workers=1,
+                                    variant_keywords=processor.variant_suffixes())
+        self.backend = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.pending = {}
+
+    def is_running(self):
+        """监视器是否正在运行"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """在后台线程中开始监视"""
+        if self.is_running():
+            return
+        self.stop_event.clear()
+        self.backend = create_backend(self.directories, self.scanner, self.use_inotify, self.poll_interval)
+        self.thread = threading.Thread(target=self.run, name="rvmat-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """停止监视"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def run(self):
+        """监视循环，也可在当前线程中直接调用（直到 stop 被调用）"""
+        if self.backend is None:
+            self.backend = create_backend(self.directories, self.scanner, self.use_inotify, self.poll_interval)
+        try:
+            while not self.stop_event.is_set():
+                timeout = self._next_timeout()
+                for path in self.backend.poll(timeout):
+                    self._queue(path)
+                self._process_due()
+        finally:
+            self.backend.close()
+            self.backend = None
+
+    def _queue(self, path):
+        """记录变化，同一文件的连续事件合并为一次处理"""
+        name = os.path.basename(path)
+        if not self.processor.is_rvmat_file(name) or self.scanner.is_excluded(name):
+            return
+        self.pending[path] = time.monotonic() + self.debounce
+
+    def _next_timeout(self):
+        if not self.pending:
+            return 0.5
+        return max(0.0, min(self.pending.values()) - time.monotonic())
+
+    def _process_due(self):
+        now = time.monotonic()
+        due = [path for path, deadline in self.pending.items() if deadline <= now]
+        for path in due:
+            del self.pending[path]
+            if not os.path.isfile(path):
+                continue
+            success = self.processor.process_rvmat_file(path)
+            if self.on_event:
+                self.on_event(path, success)
+        if due:
+            self.processor.sync_written_directories()
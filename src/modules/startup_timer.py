@@ -0,0 +1,59 @@
+"""
+启动计时模块
+记录程序启动各阶段耗时，通过环境变量 RVMAT_CREATOR_STARTUP_TIMING=1 或 --startup-timing 参数启用
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+
+ENV_VAR = "RVMAT_CREATOR_STARTUP_TIMING"
+CLI_FLAG = "--startup-timing"
+
+
+def startup_timing_requested(argv=None):
+    """是否请求了启动计时报告"""
+    if argv is None:
+        argv = sys.argv
+    return os.environ.get(ENV_VAR, "") not in ("", "0") or CLI_FLAG in argv
+
+
+class StartupTimer:
+    """启动阶段计时器，未启用时所有操作都是空操作"""
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []
+
+    def mark(self, phase):
+        """记录到当前为止完成的阶段"""
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter()))
+
+    def format_report(self):
+        """生成文本报告，每行包含阶段耗时与累计耗时（毫秒）"""
+        lines = ["启动阶段耗时 (ms):"]
+        previous = self.start
+        for phase, timestamp in self.phases:
+            lines.append(f"  {phase:<24} {(timestamp - previous) * 1000:9.1f} {(timestamp - self.start) * 1000:9.1f}")
+            previous = timestamp
+        return "\n".join(lines)
+
+    def report(self, report_file=None):
+        """输出报告到标准输出；打包后的窗口程序没有控制台，因此同时写入文件"""
+        if not self.enabled:
+            return None
+        text = self.format_report()
+        print(text)
+        if report_file is None:
+            report_file = Path.home() / ".rvmat_creator" / "startup_timing.txt"
+        try:
+            Path(report_file).parent.mkdir(parents=True, exist_ok=True)
+            with open(report_file, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except OSError as e:
+            print(f"写入启动计时报告失败: {e}")
+        return text
@@ -0,0 +1,356 @@
+"""
+PAA 纹理索引模块
+遍历项目根目录一次，记录所有 .paa 文件及其头信息（格式、尺寸、mipmap 数量），
+以不区分大小写、按目录前缀压缩的结构保存，查找为 O(1)，并可持久化后按修改时间增量刷新
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+from pathlib import Path
+
+from .rvmat_scanner import RvmatScanner
+
+
+INDEX_VERSION = 1
+
+# PAA 类型标记（文件开头的 u16，小端）
+PAA_TYPES = {
+    0xFF01: "DXT1",
+    0xFF02: "DXT2",
+    0xFF03: "DXT3",
+    0xFF04: "DXT4",
+    0xFF05: "DXT5",
+    0x4444: "ARGB4444",
+    0x1555: "ARGB1555",
+    0x8080: "AI88",
+    0x8888: "ARGB8888"
+}
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_TAG_HEADER = struct.Struct('<4s4sI')
+_MIP_HEADER = struct.Struct('<HH')
+
+# 单个纹理最多 16 级 mipmap（OFFS 标签中的偏移量个数）
+_MAX_MIPS = 16
+
+
+class PaaInfo:
+    """PAA 文件头信息"""
+
+    __slots__ = ('type_tag', 'width', 'height', 'mip_count', 'size', 'mtime_ns')
+
+    def __init__(self, type_tag=0, width=0, height=0, mip_count=0, size=0, mtime_ns=0):
+        self.type_tag = type_tag
+        self.width = width
+        self.height = height
+        self.mip_count = mip_count
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @property
+    def type_name(self):
+        """格式名称，无法识别时为 "unknown" """
+        return PAA_TYPES.get(self.type_tag, "unknown")
+
+    @property
+    def is_valid(self):
+        return self.type_tag in PAA_TYPES and self.width > 0 and self.height > 0
+
+    def describe(self):
+        """简短描述，例如 "DXT5 2048x2048, 12 mips" """
+        if not self.is_valid:
+            return f"无效的 PAA 文件 ({self.size} 字节)"
+        return f"{self.type_name} {self.width}x{self.height}, {self.mip_count} mips"
+
+    def to_list(self):
+        return [self.type_tag, self.width, self.height, self.mip_count, self.size, self.mtime_ns]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(*values)
+
+    def __repr__(self):
+        return f"PaaInfo({self.describe()!r})"
+
+
+def read_paa_header(file_path):
+    """
+    通过 mmap 读取 PAA 文件头，不加载像素数据
+
+    Returns:
+        PaaInfo: 头信息；文件为空或格式无法识别时 is_valid 为 False
+    """
+    stat = os.stat(file_path)
+    info = PaaInfo(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    if stat.st_size < 2:
+        return info
+
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                _parse_paa_header(data, info)
+            except struct.error:
+                # 文件被截断
+                pass
+    return info
+
+
+def _parse_paa_header(data, info):
+    """解析类型标记、TAGG 标签、调色板与 mipmap 头"""
+    info.type_tag = _U16.unpack_from(data, 0)[0]
+    if info.type_tag not in PAA_TYPES:
+        return
+
+    offset = 2
+    mip_offsets = None
+    # TAGG 标签："GGAT" + 反序的 4 字符名称 + u32 长度 + 数据
+    while data[offset:offset + 4] == b'GGAT':
+        _, name, length = _TAG_HEADER.unpack_from(data, offset)
+        offset += _TAG_HEADER.size
+        if name == b'SFFO':
+            count = min(length // 4, _MAX_MIPS)
+            mip_offsets = [value for value in struct.unpack_from(f'<{count}I', data, offset) if value]
+        offset += length
+
+    # 调色板：u16 颜色数 + 每个颜色 3 字节
+    palette_count = _U16.unpack_from(data, offset)[0]
+    offset += 2 + palette_count * 3
+
+    if mip_offsets:
+        # OFFS 标签直接给出每级 mipmap 的位置
+        info.mip_count = len(mip_offsets)
+        offset = mip_offsets[0]
+        width, height = _MIP_HEADER.unpack_from(data, offset)
+        info.width = width & 0x7FFF
+        info.height = height
+        return
+
+    # 没有 OFFS 标签时逐个跳过 mipmap：u16 宽 + u16 高 + u24 数据长度 + 数据，宽高为 0 时结束
+    size = len(data)
+    while offset + 7 <= size and info.mip_count < _MAX_MIPS:
+        width, height = _MIP_HEADER.unpack_from(data, offset)
+        if width == 0 or height == 0:
+            break
+        length = int.from_bytes(data[offset + 4:offset + 7], 'little')
+        if info.mip_count == 0:
+            # 最高位表示 LZO 压缩
+            info.width = width & 0x7FFF
+            info.height = height
+        info.mip_count += 1
+        offset += 7 + length
+
+
+def normalize_reference(reference):
+    """
+    将 texture 引用规范化为 (目录键, 文件名键)
+
+    反斜杠替换为正斜杠，去掉开头的斜杠，并统一为小写，
+    例如 "DZ\\Characters\\data\\a.paa" -> ("dz/characters/data", "a.paa")
+    """
+    path = reference.replace('\\', '/').strip().lstrip('/').casefold()
+    directory, _, name = path.rpartition('/')
+    return directory, name
+
+
+def default_index_file(root_dir):
+    """根目录对应的默认索引文件（~/.rvmat_creator/texture_index/<hash>.json）"""
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(root_dir)).encode('utf-8')).hexdigest()[:16]
+    return Path.home() / ".rvmat_creator" / "texture_index" / f"{digest}.json"
+
+
+class TextureIndex:
+    """
+    PAA 纹理索引
+
+    目录表保存每个目录的原始路径（相对根目录，只存一次），
+    每个目录下再以小写文件名为键保存 (原始文件名, PaaInfo)。
+    查找时先按目录键、再按文件名键各做一次字典查找。
+    """
+
+    def __init__(self, root_dir, index_file=None):
+        """
+        初始化纹理索引
+
+        Args:
+            root_dir: 项目根目录（texture 引用相对于该目录，例如 P: 盘）
+            index_file: 持久化文件路径，None 表示使用默认位置
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_file = Path(index_file) if index_file else default_index_file(self.root_dir)
+        self.reset()
+
+    def reset(self):
+        """清空索引"""
+        # 目录键 -> 目录编号
+        self.directory_ids = {}
+        # 目录编号 -> 原始相对目录
+        self.directories = []
+        # 目录编号 -> {文件名键: (原始文件名, PaaInfo)}
+        self.entries = []
+        self.file_count = 0
+
+    def __len__(self):
+        return self.file_count
+
+    def _directory_id(self, relative_dir, create=False):
+        key = relative_dir.casefold()
+        dir_id = self.directory_ids.get(key)
+        if dir_id is None and create:
+            dir_id = self.directory_ids[key] = len(self.directories)
+            self.directories.append(relative_dir)
+            self.entries.append({})
+        return dir_id
+
+    def _add(self, relative_dir, name, info):
+        files = self.entries[self._directory_id(relative_dir, create=True)]
+        key = name.casefold()
+        if key not in files:
+            self.file_count += 1
+        files[key] = (name, info)
+
+    def lookup(self, reference):
+        """按 texture 引用查找（不区分大小写），返回 PaaInfo 或 None"""
+        entry = self._lookup_entry(reference)
+        return entry[1] if entry else None
+
+    def contains(self, reference):
+        """纹理是否存在"""
+        return self._lookup_entry(reference) is not None
+
+    def resolve(self, reference):
+        """返回引用对应的实际文件路径（保留磁盘上的大小写），不存在时返回 None"""
+        directory, name = normalize_reference(reference)
+        dir_id = self.directory_ids.get(directory)
+        if dir_id is None:
+            return None
+        entry = self.entries[dir_id].get(name)
+        if entry is None:
+            return None
+        relative_dir = self.directories[dir_id]
+        return os.path.join(self.root_dir, *relative_dir.split('/'), entry[0]) if relative_dir \
+            else os.path.join(self.root_dir, entry[0])
+
+    def relative_path(self, reference):
+        """返回引用在磁盘上的实际相对路径（正斜杠分隔），不存在时返回 None"""
+        directory, name = normalize_reference(reference)
+        dir_id = self.directory_ids.get(directory)
+        if dir_id is None:
+            return None
+        entry = self.entries[dir_id].get(name)
+        if entry is None:
+            return None
+        relative_dir = self.directories[dir_id]
+        return f"{relative_dir}/{entry[0]}" if relative_dir else entry[0]
+
+    def describe(self, reference):
+        """描述引用的纹理，不存在时返回 None"""
+        info = self.lookup(reference)
+        return info.describe() if info else None
+
+    def _lookup_entry(self, reference):
+        directory, name = normalize_reference(reference)
+        dir_id = self.directory_ids.get(directory)
+        if dir_id is None:
+            return None
+        return self.entries[dir_id].get(name)
+
+    def iter_files(self):
+        """按目录顺序产出 (相对路径, PaaInfo)"""
+        for relative_dir, files in zip(self.directories, self.entries):
+            for name, info in files.values():
+                yield (f"{relative_dir}/{name}" if relative_dir else name), info
+
+    def refresh(self, max_workers=8):
+        """
+        遍历根目录更新索引，修改时间与大小未变化的文件不重新读取文件头
+
+        Returns:
+            dict: {"added", "updated", "removed", "unchanged"} 计数
+        """
+        old_entries = {}
+        for relative_dir, files in zip(self.directories, self.entries):
+            for key, entry in files.items():
+                old_entries[(relative_dir.casefold(), key)] = entry
+
+        self.reset()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        scanner = RvmatScanner(exclude_variants=False, max_workers=max_workers, extension='.paa')
+        root = self.root_dir
+        for file_path in scanner.scan(root):
+            relative = os.path.relpath(file_path, root).replace(os.sep, '/')
+            relative_dir, _, name = relative.rpartition('/')
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            old = old_entries.pop((relative_dir.casefold(), name.casefold()), None)
+            if old is not None and old[1].mtime_ns == stat.st_mtime_ns and old[1].size == stat.st_size:
+                info = old[1]
+                counts["unchanged"] += 1
+            else:
+                try:
+                    info = read_paa_header(file_path)
+                except (OSError, ValueError):
+                    info = PaaInfo(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                counts["updated" if old is not None else "added"] += 1
+            self._add(relative_dir, name, info)
+
+        counts["removed"] = len(old_entries)
+        return counts
+
+    def load(self):
+        """读取持久化的索引，文件不存在、版本或根目录不匹配时返回 False"""
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root_dir:
+            return False
+
+        self.reset()
+        for directory in data.get("directories", []):
+            relative_dir = directory["path"]
+            for name, *values in directory["files"]:
+                self._add(relative_dir, name, PaaInfo.from_list(values))
+        return True
+
+    def save(self):
+        """保存索引（先写临时文件再替换）"""
+        directories = []
+        for relative_dir, files in zip(self.directories, self.entries):
+            if files:
+                directories.append({
+                    "path": relative_dir,
+                    "files": [[name] + info.to_list() for name, info in files.values()]
+                })
+        data = {"version": INDEX_VERSION, "root": self.root_dir, "directories": directories}
+
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_file, self.index_file)
+
+    def update(self, max_workers=8):
+        """读取已保存的索引，增量刷新后保存，返回 refresh 的计数"""
+        self.load()
+        counts = self.refresh(max_workers)
+        try:
+            self.save()
+        except OSError as e:
+            print(f"保存纹理索引失败: {e}", file=sys.stderr)
+        return counts
+
+
+def open_texture_index(root_dir, index_file=None, max_workers=8):
+    """加载并增量刷新根目录的纹理索引"""
+    index = TextureIndex(root_dir, index_file)
+    index.update(max_workers)
+    return index
@@ -0,0 +1,320 @@
+"""
+纹理引用校验模块
+提取目录树中所有 RVMAT 的 texture 引用，通过纹理索引批量解析，
+报告缺失、大小写不一致与程序纹理 #(...) 引用
+"""
+
+import re
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch_processor import ENGINE_SERIAL, ENGINE_PROCESS
+from .rvmat_parser import parse_rvmat, decode_rvmat_text, RvmatParseError
+from .rvmat_rapify import is_rapified, read_rapified
+from .rvmat_scanner import RvmatScanner
+from .texture_index import TextureIndex
+
+
+# 引用状态
+STATUS_OK = "ok"
+STATUS_MISSING = "missing"
+STATUS_CASE_MISMATCH = "case_mismatch"
+STATUS_PROCEDURAL = "procedural"
+STATUS_EMPTY = "empty"
+
+# 需要在报告中列出的状态
+REPORTED_STATUSES = (STATUS_MISSING, STATUS_CASE_MISMATCH, STATUS_PROCEDURAL, STATUS_EMPTY)
+
+# texture 属性：带引号的字符串或未加引号的值（不匹配 textureHQ、texture[] 等），仅在文件无法解析时使用
+_TEXTURE_PATTERN = re.compile(r'\btexture\s*=\s*(?:"((?:[^"]|"")*)"|([^;"}\n]*))', re.IGNORECASE)
+# 字符串或注释，用于在正则匹配前去掉注释
+_COMMENT_PATTERN = re.compile(r'"(?:[^"]|"")*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+def _strip_comment(match):
+    text = match.group(0)
+    if text.startswith('"'):
+        return text
+    # 保留换行，行号不变
+    return '\n' * text.count('\n')
+
+
+def _extract_with_pattern(content):
+    """正则匹配去掉注释后的内容，返回 (行号, texture 值) 列表"""
+    content = _COMMENT_PATTERN.sub(_strip_comment, content)
+    references = []
+    line = 1
+    last = 0
+    for match in _TEXTURE_PATTERN.finditer(content):
+        start = match.start()
+        line += content.count('\n', last, start)
+        last = start
+        value = match.group(1)
+        if value is None:
+            value = match.group(2).strip()
+        else:
+            value = value.replace('""', '"')
+        references.append((line, value))
+    return references
+
+
+def extract_texture_references(content):
+    """
+    提取内容中所有 texture 引用
+
+    使用 RVMAT 解析器，注释中的引用与 texture[] 数组不会被报告；
+    文件无法解析时退回到去掉注释后的正则匹配，语法错误附近的引用仍会被报告
+
+    Returns:
+        list: (行号, texture 值) 列表
+    """
+    try:
+        root = parse_rvmat(content)
+    except RvmatParseError:
+        return _extract_with_pattern(content)
+
+    references = []
+    line = 1
+    last = 0
+    for _, prop in root.iter_properties('texture'):
+        if prop.is_array:
+            continue
+        start = prop.start
+        line += content.count('\n', last, start)
+        last = start
+        value = prop.value
+        if not isinstance(value, str):
+            # 数字等未加引号的值按原文报告
+            value = content[prop.value_start:prop.value_end]
+        references.append((line, value))
+    return references
+
+
+def extract_rapified_references(data):
+    """
+    提取 rapified 数据中所有 texture 引用，二进制文件没有行号
+
+    Returns:
+        list: (None, texture 值) 列表
+
+    Raises:
+        RvmatParseError: 数据不是有效的 rapified 格式
+    """
+    references = []
+    for _, prop in read_rapified(data).iter_properties('texture'):
+        if prop.is_array:
+            continue
+        value = prop.value
+        references.append((None, value if isinstance(value, str) else str(value)))
+    return references
+
+
+def _extract_file(file_path):
+    """
+    读取并提取单个文件的引用，返回 (文件路径, 引用列表, 错误信息)
+
+    rapified 文件按二进制格式读取；无法按 UTF-8 解码的文本文件与损坏的 rapified 文件作为解析错误报告
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return file_path, [], str(e)
+    try:
+        if is_rapified(data):
+            return file_path, extract_rapified_references(data), None
+        return file_path, extract_texture_references(decode_rvmat_text(data)), None
+    except RvmatParseError as e:
+        return file_path, [], f"解析失败: {e}"
+
+
+def _extract_chunk(chunk):
+    """在工作进程中提取一组文件的引用"""
+    return [_extract_file(file_path) for file_path in chunk]
+
+
+def classify_reference(reference, texture_index):
+    """
+    判断单个引用的状态
+
+    Returns:
+        tuple: (状态, 磁盘上的实际相对路径或 None)
+    """
+    if not reference:
+        return STATUS_EMPTY, None
+    if reference.startswith('#'):
+        return STATUS_PROCEDURAL, None
+    actual = texture_index.relative_path(reference)
+    if actual is None:
+        return STATUS_MISSING, None
+    expected = reference.replace('\\', '/').strip().lstrip('/')
+    if actual != expected:
+        return STATUS_CASE_MISMATCH, actual
+    return STATUS_OK, actual
+
+
+class TextureValidationReport:
+    """校验报告"""
+
+    def __init__(self, project_root):
+        self.project_root = project_root
+        self.file_count = 0
+        self.reference_count = 0
+        self.unique_references = 0
+        # 状态 -> 引用数量
+        self.counts = {}
+        # (状态, 文件路径, 行号（rapified 文件为 None）, texture 值, 实际路径)
+        self.issues = []
+        # (文件路径, 错误信息)
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def has_problems(self):
+        """是否存在缺失或大小写不一致的引用"""
+        return bool(self.counts.get(STATUS_MISSING) or self.counts.get(STATUS_CASE_MISMATCH) or self.errors)
+
+    def issues_with_status(self, status):
+        return [issue for issue in self.issues if issue[0] == status]
+
+    def to_dict(self):
+        return {
+            "project_root": self.project_root,
+            "files": self.file_count,
+            "references": self.reference_count,
+            "unique_references": self.unique_references,
+            "counts": dict(self.counts),
+            "elapsed_seconds": round(self.elapsed, 6),
+            "issues": [
+                {"status": status, "file": file_path, "line": line, "texture": texture, "actual": actual}
+                for status, file_path, line, texture, actual in self.issues
+            ],
+            "errors": [{"file": file_path, "error": error} for file_path, error in self.errors]
+        }
+
+    def format_text(self):
+        """生成文本报告，按状态分组"""
+        lines = [
+            f"项目根目录: {self.project_root}",
+            f"检查了 {self.file_count} 个文件中的 {self.reference_count} 个纹理引用"
+            f"（{self.unique_references} 个不同的引用），耗时 {self.elapsed:.2f} 秒",
+            f"缺失: {self.counts.get(STATUS_MISSING, 0)}  大小写不一致: {self.counts.get(STATUS_CASE_MISMATCH, 0)}  "
+            f"程序纹理: {self.counts.get(STATUS_PROCEDURAL, 0)}  空引用: {self.counts.get(STATUS_EMPTY, 0)}"
+        ]
+        titles = {
+            STATUS_MISSING: "缺失的纹理",
+            STATUS_CASE_MISMATCH: "大小写不一致的纹理",
+            STATUS_PROCEDURAL: "程序纹理",
+            STATUS_EMPTY: "空的 texture 引用"
+        }
+        for status in REPORTED_STATUSES:
+            issues = self.issues_with_status(status)
+            if not issues:
+                continue
+            lines.append("")
+            lines.append(f"{titles[status]} ({len(issues)}):")
+            for _, file_path, line, texture, actual in issues:
+                suffix = f" -> {actual}" if actual else ""
+                location = file_path if line is None else f"{file_path}:{line}"
+                lines.append(f"  {location}: {texture}{suffix}")
+        if self.errors:
+            lines.append("")
+            lines.append(f"无法读取或解析的文件 ({len(self.errors)}):")
+            for file_path, error in self.errors:
+                lines.append(f"  {file_path}: {error}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_file):
+        """写入报告，.json 扩展名写 JSON，其他写文本"""
+        with open(report_file, "w", encoding="utf-8") as f:
+            if str(report_file).lower().endswith(".json"):
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+                f.write("\n")
+            else:
+                f.write(self.format_text())
+
+
+class TextureValidator:
+    """纹理引用校验器"""
+
+    def __init__(self, project_root, texture_index=None, engine=ENGINE_PROCESS, max_workers=None,
+                 chunk_size=256, include_procedural=True):
+        """
+        初始化校验器
+
+        Args:
+            project_root: 项目根目录，texture 引用相对于该目录
+            texture_index: 已建立的 TextureIndex，None 表示加载并增量刷新默认索引
+            engine: 提取引用的引擎，"serial" 或 "process"
+            max_workers: 进程池大小，None 表示使用 CPU 核心数
+            chunk_size: 每个进程池任务包含的文件数
+            include_procedural: 报告中是否列出每个程序纹理引用
+        """
+        if engine not in (ENGINE_SERIAL, ENGINE_PROCESS):
+            raise ValueError(f"未知的处理引擎: {engine}")
+        self.project_root = project_root
+        self.texture_index = texture_index
+        self.engine = engine
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+        self.include_procedural = include_procedural
+
+    def _iter_extracted(self, file_list):
+        """按输入顺序产出 (文件路径, 引用列表, 错误信息)"""
+        if self.engine == ENGINE_SERIAL or len(file_list) <= self.chunk_size:
+            for file_path in file_list:
+                yield _extract_file(file_path)
+            return
+
+        chunk_size = self.chunk_size
+        chunks = [file_list[start:start + chunk_size] for start in range(0, len(file_list), chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for results in executor.map(_extract_chunk, chunks):
+                yield from results
+
+    def validate(self, directories):
+        """
+        校验目录中所有 RVMAT 文件的 texture 引用
+
+        Args:
+            directories: 目录或目录列表
+
+        Returns:
+            TextureValidationReport: 校验报告
+        """
+        if isinstance(directories, str):
+            directories = [directories]
+        start = time.perf_counter()
+
+        if self.texture_index is None:
+            self.texture_index = TextureIndex(self.project_root)
+            self.texture_index.update()
+
+        file_list = []
+        for directory in directories:
+            file_list.extend(RvmatScanner(exclude_variants=False).scan(directory))
+
+        report = TextureValidationReport(self.project_root)
+        report.file_count = len(file_list)
+        # 相同的引用只解析一次
+        resolved = {}
+        index = self.texture_index
+        counts = report.counts
+        for file_path, references, error in self._iter_extracted(file_list):
+            if error is not None:
+                report.errors.append((file_path, error))
+                continue
+            for line, texture in references:
+                result = resolved.get(texture)
+                if result is None:
+                    result = resolved[texture] = classify_reference(texture, index)
+                status, actual = result
+                counts[status] = counts.get(status, 0) + 1
+                if status != STATUS_OK and (status != STATUS_PROCEDURAL or self.include_procedural):
+                    report.issues.append((status, file_path, line, texture, actual))
+            report.reference_count += len(references)
+
+        report.unique_references = len(resolved)
+        report.elapsed = time.perf_counter() - start
+        return report
@@ -0,0 +1,289 @@
+"""
+变体规则模块
+从 JSON 或 TOML 规则文件定义任意数量的变体，每个变体可以修改多个类中的多个属性。
+所有规则编译为一个改写计划：每个源文件只解析一次，按偏移量切分后所有变体共享未修改的片段
+
+规则文件示例（JSON）:
+    {
+      "variants": [
+        {"suffix": "_worn", "set": {"Stage3/texture": "dz\\\\characters\\\\data\\\\generic_worn_mc.paa"}},
+        {"suffix": "_wet", "set": {"specularPower": 120, "Stage7/texture": "dz\\\\data\\\\data\\\\env_wet_co.paa"}}
+      ]
+    }
+
+规则文件示例（TOML，需要 Python 3.11+ 的 tomllib）:
+    [[variants]]
+    suffix = "_snow"
+    [variants.set]
+    "Stage3/texture" = "mymod\\\\data\\\\snow_mc.paa"
+    "Stage1/texture" = "mymod\\\\data\\\\snow_nohq.paa"
+"""
+
+import os
+import json
+
+from .rvmat_parser import parse_rvmat, quote_string
+from .rvmat_rapify import rapify
+
+
+RULES_VERSION = 1
+
+# 内置的损坏材质变体（原 RvmatProcessor.texture_mappings），默认规则集
+DEFAULT_TEXTURE_MAPPINGS = {
+    '_worn': r'dz\characters\data\generic_worn_mc.paa',
+    '_damage': r'dz\characters\data\generic_damage_mc.paa',
+    '_destruct': r'dz\characters\data\generic_destruct_mc.paa'
+}
+
+
+def format_value(value):
+    """将规则中的值转换为 RVMAT 字面量：字符串加引号，数字原样，列表转换为 {...}"""
+    if isinstance(value, str):
+        return quote_string(value)
+    if isinstance(value, bool):
+        raise ValueError(f"不支持布尔值: {value!r}")
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(format_value(item) for item in value) + "}"
+    raise ValueError(f"不支持的值类型: {value!r}")
+
+
+def _edit_applies(prop, value):
+    """数组属性只接受列表值，普通属性只接受非列表值"""
+    return prop.is_array == isinstance(value, (list, tuple))
+
+
+class VariantRule:
+    """单个变体：文件名后缀与要修改的属性"""
+
+    __slots__ = ('suffix', 'edits')
+
+    def __init__(self, suffix, edits):
+        """
+        Args:
+            suffix: 变体文件名后缀，例如 "_worn"
+            edits: 属性路径 -> 新值，例如 {"Stage3/texture": "a.paa", "specularPower": 40}
+        """
+        self.suffix = suffix
+        # (属性路径, 值, 编码后的字面量)，字面量在加载时生成一次
+        self.edits = [(path, value, format_value(value)) for path, value in edits.items()]
+
+    def to_dict(self):
+        return {"suffix": self.suffix, "set": {path: value for path, value, _ in self.edits}}
+
+    def __repr__(self):
+        return f"VariantRule({self.suffix!r}, {[path for path, _, _ in self.edits]})"
+
+
+class VariantRules:
+    """变体规则集"""
+
+    def __init__(self, rules, source=None):
+        """
+        Args:
+            rules: VariantRule 列表，按输出顺序
+            source: 规则文件路径，内置规则为 None
+
+        Raises:
+            ValueError: 没有变体或后缀无效、重复
+        """
+        if not rules:
+            raise ValueError("规则集中没有任何变体")
+        seen = set()
+        for rule in rules:
+            suffix = rule.suffix
+            if not suffix or '/' in suffix or '\\' in suffix or suffix.strip() != suffix:
+                raise ValueError(f"无效的变体后缀: {suffix!r}")
+            if suffix.lower() in seen:
+                raise ValueError(f"重复的变体后缀: {suffix}")
+            seen.add(suffix.lower())
+        self.rules = list(rules)
+        self.source = source
+        # 所有规则涉及的属性路径（去重，保持顺序），改写时每个路径只查找一次
+        self.paths = list(dict.fromkeys(path for rule in self.rules for path, _, _ in rule.edits))
+
+    @property
+    def suffixes(self):
+        return [rule.suffix for rule in self.rules]
+
+    def to_dict(self):
+        """转换为规则文件格式，也用作增量构建的配置指纹"""
+        return {"version": RULES_VERSION, "variants": [rule.to_dict() for rule in self.rules]}
+
+    def compile_plan(self, content):
+        """
+        为源文件内容生成改写计划
+
+        解析一次，定位所有规则涉及的属性值，得到按偏移量排序的若干位置；
+        位置之间的原文片段只编码一次并在所有变体间共享。
+        源文件中不存在的属性不会被添加，对应的变体在该位置保留原文；
+        数组属性只接受列表值，普通属性只接受非列表值，类型不符的修改同样被忽略。
+
+        Args:
+            content: 源文件内容
+
+        Returns:
+            RewritePlan: 改写计划
+        """
+        root = parse_rvmat(content)
+        # 值起始偏移量 -> (起始, 结束, 是否数组)，不同写法的路径可能指向同一属性
+        spans = {}
+        path_spans = {}
+        for path in self.paths:
+            prop = root.find_property(path)
+            if prop is None:
+                continue
+            spans[prop.value_start] = (prop.value_start, prop.value_end, prop.is_array)
+            path_spans[path] = prop.value_start
+        ordered = sorted(spans.values())
+
+        literals = []
+        originals = []
+        position = 0
+        for start, end, _ in ordered:
+            literals.append(content[position:start])
+            originals.append(content[start:end])
+            position = end
+        literals.append(content[position:])
+
+        slot_of = {start: index for index, (start, _, _) in enumerate(ordered)}
+        variants = []
+        for rule in self.rules:
+            values = list(originals)
+            for path, value, literal in rule.edits:
+                start = path_spans.get(path)
+                if start is None:
+                    continue
+                index = slot_of[start]
+                if ordered[index][2] != isinstance(value, (list, tuple)):
+                    continue
+                values[index] = literal
+            variants.append((rule.suffix, values))
+        return RewritePlan(literals, variants)
+
+    def rapify_variants(self, content):
+        """
+        生成所有变体的 rapified 二进制数据
+
+        源文件只解析一次，每个变体以覆盖值的方式从同一棵类树编码，不修改类树；
+        不存在或类型不符的属性与 compile_plan 一样被忽略
+
+        Returns:
+            list: (后缀, 字节块元组)
+        """
+        root = parse_rvmat(content)
+        props = {}
+        for path in self.paths:
+            prop = root.find_property(path)
+            if prop is not None:
+                props[path] = prop
+
+        variants = []
+        for rule in self.rules:
+            overrides = {}
+            for path, value, _ in rule.edits:
+                prop = props.get(path)
+                if prop is not None and _edit_applies(prop, value):
+                    overrides[id(prop)] = value
+            variants.append((rule.suffix, (rapify(root, overrides),)))
+        return variants
+
+    def __repr__(self):
+        return f"VariantRules({self.suffixes}, source={self.source!r})"
+
+
+class RewritePlan:
+    """一个源文件的改写计划：共享的原文片段与每个变体在各位置的新值"""
+
+    __slots__ = ('literals', 'variants')
+
+    def __init__(self, literals, variants):
+        # len(literals) == 位置数 + 1
+        self.literals = literals
+        # (后缀, 各位置的值文本)
+        self.variants = variants
+
+    def emit(self, encode):
+        """
+        生成所有变体的字节块
+
+        Args:
+            encode: 文本编码函数，例如按系统换行符编码为 UTF-8
+
+        Returns:
+            list: (后缀, 字节块元组)，按顺序写入字节块即得到变体文件
+        """
+        literals = [encode(text) for text in self.literals]
+        cache = {}
+        result = []
+        for suffix, values in self.variants:
+            chunks = [literals[0]]
+            for value, literal in zip(values, literals[1:]):
+                encoded = cache.get(value)
+                if encoded is None:
+                    encoded = cache[value] = encode(value)
+                chunks.append(encoded)
+                chunks.append(literal)
+            result.append((suffix, tuple(chunks)))
+        return result
+
+
+def default_rules():
+    """内置规则：每个损坏等级替换 Stage3 的 texture"""
+    return VariantRules([VariantRule(suffix, {"Stage3/texture": texture})
+                         for suffix, texture in DEFAULT_TEXTURE_MAPPINGS.items()])
+
+
+def rules_from_dict(data, source=None):
+    """
+    从规则文件的数据构建规则集
+
+    Raises:
+        ValueError: 数据格式无效
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("variants"), list):
+        raise ValueError("规则文件必须包含 variants 列表")
+    version = data.get("version", RULES_VERSION)
+    if version != RULES_VERSION:
+        raise ValueError(f"不支持的规则文件版本: {version}")
+
+    rules = []
+    for index, entry in enumerate(data["variants"]):
+        if not isinstance(entry, dict) or not isinstance(entry.get("suffix"), str):
+            raise ValueError(f"第 {index + 1} 个变体缺少 suffix")
+        edits = entry.get("set", {})
+        if not isinstance(edits, dict) or not all(isinstance(path, str) and path for path in edits):
+            raise ValueError(f"变体 {entry['suffix']} 的 set 必须是 属性路径 -> 值 的表")
+        rules.append(VariantRule(entry["suffix"], edits))
+    return VariantRules(rules, source)
+
+
+def load_variant_rules(file_path):
+    """
+    读取规则文件，扩展名为 .toml 时按 TOML 解析，否则按 JSON 解析
+
+    Raises:
+        OSError: 无法读取文件
+        ValueError: 格式无效，或当前 Python 没有 tomllib（3.11 以下）
+    """
+    file_path = os.fspath(file_path)
+    if file_path.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("读取 TOML 规则文件需要 Python 3.11 或更高版本，请改用 JSON 格式") from None
+        with open(file_path, 'rb') as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"无效的 TOML 规则文件: {e}") from None
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"无效的 JSON 规则文件: {e}") from None
+    return rules_from_dict(data, file_path)
@@ -0,0 +1,111 @@
+"""
+后台批处理任务模块
+在工作线程中运行批量处理，通过队列把进度事件交给 Tk 主线程
+"""
+
+import queue
+import threading
+
+
+class BatchJobRunner:
+    """后台批处理任务运行器"""
+
+    def __init__(self, root, batch_processor, poll_interval=50, run_function=None):
+        """
+        初始化任务运行器
+
+        Args:
+            root: Tk 根窗口，用于 after 轮询
+            batch_processor: BatchProcessor 实例，或其他提供 cancelled 属性的处理对象
+            poll_interval: 队列轮询间隔（毫秒）
+            run_function: 任务函数 run(列表, progress_callback, cancel_event)，返回 (成功数, 失败数)，
+                默认为 batch_processor.process_files
+        """
+        self.root = root
+        self.batch_processor = batch_processor
+        self.run_function = run_function or batch_processor.process_files
+        self.poll_interval = poll_interval
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.on_progress = None
+        self.on_done = None
+        self.on_error = None
+
+    def is_running(self):
+        """任务是否正在运行"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, file_list, on_progress=None, on_done=None, on_error=None):
+        """
+        启动后台任务
+
+        回调均在 Tk 主线程中执行：
+            on_progress(已完成数, 总数, 文件路径, 是否成功)
+            on_done(成功数, 失败数, 是否已取消)
+            on_error(异常)
+
+        Returns:
+            bool: 已有任务在运行时返回 False
+        """
+        if self.is_running():
+            return False
+
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancel_event.clear()
+        self.events = queue.Queue()
+
+        # 传入副本，处理期间界面可以继续修改文件列表
+        self.thread = threading.Thread(target=self._run, args=(file_list.copy(),), daemon=True)
+        self.thread.start()
+        self.root.after(self.poll_interval, self._poll)
+        return True
+
+    def cancel(self):
+        """请求取消，任务会在文件之间停止"""
+        self.cancel_event.set()
+
+    def _run(self, file_list):
+        """工作线程入口"""
+        events = self.events
+
+        def report(done, total, file_path, success):
+            events.put(("progress", (done, total, file_path, success)))
+
+        try:
+            success_count, fail_count = self.run_function(
+                file_list, progress_callback=report, cancel_event=self.cancel_event)
+            events.put(("done", (success_count, fail_count, self.batch_processor.cancelled)))
+        except Exception as e:
+            events.put(("error", e))
+
+    def _poll(self):
+        """在主线程中取出队列中的事件"""
+        progress = None
+        finished = None
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # 同一轮中只需要显示最新的进度
+                progress = payload
+            else:
+                finished = (kind, payload)
+
+        if progress is not None and self.on_progress:
+            self.on_progress(*progress)
+
+        if finished is None:
+            self.root.after(self.poll_interval, self._poll)
+            return
+
+        kind, payload = finished
+        if kind == "done":
+            if self.on_done:
+                self.on_done(*payload)
+        elif self.on_error:
+            self.on_error(payload)
@@ -0,0 +1,123 @@
+"""
+虚拟化文件列表模块
+按 FileSelection 中的稳定行 ID 显示文件；Treeview 只保存当前可见的几十行，
+每次变化只比较可见窗口的差异并增删对应行，操作耗时与列表总长度无关
+"""
+
+import os
+import tkinter as tk
+from tkinter import ttk
+
+
+# 删除列显示的符号
+REMOVE_SYMBOL = "❌"
+
+# 无法从样式中读取行高时使用的默认值（像素）
+_DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualFileList:
+    """
+    虚拟化的文件列表视图
+
+    Treeview 只包含可见窗口内的行，滚动条由本类根据模型长度自行计算。
+    模型变化后调用 refresh()，只会删除离开窗口的行、插入进入窗口的行。
+    """
+
+    def __init__(self, parent, model, height=12):
+        """
+        创建 Treeview 与滚动条，放在 parent 的第 0 行第 0、1 列
+
+        Args:
+            parent: 父控件
+            model: FileSelection 实例
+            height: 初始可见行数
+        """
+        self.model = model
+        self.first = 0
+        self.page_size = height
+
+        self.tree = ttk.Treeview(parent, columns=("filename", "remove"), show="", height=height)  # 隐藏表头
+        self.tree.column("#0", width=0, stretch=False)  # 隐藏tree列
+        self.tree.column("filename", width=400)
+        self.tree.column("remove", width=80, anchor="center")
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        # 滚轮：Windows/macOS 使用 MouseWheel，X11 使用 Button-4/5
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Configure>", self.on_configure)
+
+    def _row_height(self):
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight") or _DEFAULT_ROW_HEIGHT)
+        except (tk.TclError, ValueError):
+            return _DEFAULT_ROW_HEIGHT
+
+    def on_configure(self, event):
+        """控件大小变化时重新计算可见行数"""
+        page_size = max(1, event.height // self._row_height())
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.refresh()
+
+    def on_mouse_wheel(self, event):
+        # Windows 上每格为 120，macOS 上为较小的整数
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-3 * delta if delta else 0)
+        return "break"
+
+    def scroll(self, rows):
+        """按行滚动"""
+        self.set_first(self.first + rows)
+        return "break"
+
+    def yview(self, *args):
+        """滚动条回调：("moveto", 比例) 或 ("scroll", 数量, "units"/"pages")"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.set_first(int(float(args[1]) * len(self.model) + 0.5))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                amount *= self.page_size
+            self.set_first(self.first + amount)
+
+    def set_first(self, first):
+        """设置窗口第一行的位置"""
+        first = max(0, min(first, len(self.model) - self.page_size))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def refresh(self):
+        """按模型更新可见窗口，只增删差异行"""
+        model = self.model
+        total = len(model)
+        # 删除后列表变短时窗口跟着上移
+        self.first = max(0, min(self.first, total - self.page_size))
+
+        wanted = model.window(self.first, self.page_size)
+        wanted_set = set(wanted)
+        current = self.tree.get_children()
+        stale = [row_id for row_id in current if row_id not in wanted_set]
+        if stale:
+            self.tree.delete(*stale)
+        existing = set(current).difference(stale)
+
+        # 留下的行相对顺序不变，新行按位置插入即可保持顺序
+        for position, row_id in enumerate(wanted):
+            if row_id not in existing:
+                filename = os.path.basename(model.path_of(row_id))
+                self.tree.insert("", position, iid=row_id, values=(filename, REMOVE_SYMBOL))
+
+        if total > 0:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.page_size) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -6,12 +6,23 @@
 import tkinter as tk
 from tkinter import ttk
 
+from src.modules.log_sink import LogSink, LOG_INFO
+
 
 class LogWindow:
     """日志窗口类"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, sink=None):
+        """
+        Args:
+            parent: 父窗口
+            sink: 共享的 LogSink，None 表示创建独立的缓冲区
+        """
         self.parent = parent
+        if sink is None:
+            sink = LogSink()
+            sink.start(parent)
+        self.sink = sink
         self.window = None
         self.text_widget = None
         self.is_visible = False
@@ -54,18 +65,16 @@ class LogWindow:
         
         self.text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sink.attach(self.text_widget)
         
         # 添加关闭按钮
         close_btn = ttk.Button(self.window, text="Close", command=self.hide_window)
         close_btn.pack(pady=(0, 10))
     
-    def log(self, message):
-        """添加日志消息"""
-        if self.text_widget:
-            self.text_widget.insert(tk.END, message + "\n")
-            self.text_widget.see(tk.END)
+    def log(self, message, level=LOG_INFO):
+        """添加日志消息（可在任意线程中调用，定时批量显示）"""
+        self.sink.log(message, level)
     
     def clear_log(self):
         """清空日志"""
-        if self.text_widget:
-            self.text_widget.delete(1.0, tk.END)
\ No newline at end of file
+        self.sink.clear()
\ No newline at end of file
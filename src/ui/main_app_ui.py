@@ -1,18 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import sys
-import gettext
-import locale
-import re
+import queue
 
 from .base_ui import BaseUI
 from .log_window import LogWindow
 from .drag_drop import DragDropMixin
+from .batch_job import BatchJobRunner
+from .file_list_view import VirtualFileList
 from src.modules.rvmat_processor import RvmatProcessor
-from src.modules.batch_processor import BatchProcessor
 from src.modules.file_selector import FileSelector
+from src.modules.file_selection import FileSelection
 from src.modules.config_manager import ConfigManager
+from src.modules.log_sink import LogSink, LOG_INFO, LOG_WARNING
+from src.modules.rvmat_template import load_default_template, normalize_rvmat_filename, process_template_content
 
 
 class MainAppUI(BaseUI, DragDropMixin):
@@ -25,12 +26,34 @@ class MainAppUI(BaseUI, DragDropMixin):
         # 初始化翻译器
         self.setup_translations()
         
+        # 保存当前的处理配置，并在主线程中处理一键生成；
+        # 批量处理、批量生成和目录监视各自使用它的副本，统计与输出对象互不干扰
         self.processor = RvmatProcessor()
-        self.batch_processor = BatchProcessor(self.processor)
-        self.log_window = LogWindow(root)
-        
-        # 存储选择的文件列表
-        self.selected_files = []
+        # 批处理、批量生成、监视与增量构建的模块在首次使用时才导入（其中批处理会加载 multiprocessing），
+        # 对应的对象也在首次运行时创建
+        self.batch_processor = None
+        self.batch_job = None
+        self.manifest = None
+        self.bulk_job = None
+        self.bulk_generator = None
+        
+        # 目录监视器及其事件队列
+        self.watcher = None
+        self.watch_events = queue.Queue()
+        # 所有日志先进入有界缓冲区，再定时批量写入日志控件
+        self.log_sink = LogSink()
+        self.log_sink.start(root)
+        self.log_window = LogWindow(root, self.log_sink)
+        self.load_variant_rules()
+        # 配置项 binarize_variants 为 true 时变体以 rapified 二进制格式输出
+        self.processor.binarize = bool(self.config_manager.get("binarize_variants", False))
+        
+        # 存储选择的文件列表，按规范化路径去重，每个文件有稳定的行 ID
+        self.selected_files = FileSelection()
+        
+        # 日志选项卡在首次显示时才创建，之前的日志保存在 log_sink 中
+        self.log_text_widget = None
+        self.panel_builders = {}
         
         # 拖拽视觉反馈相关变量
         self.drag_frame = None
@@ -42,7 +65,7 @@ class MainAppUI(BaseUI, DragDropMixin):
         super().__init__(root)
         
         # 初始化文件选择器
-        self.file_selector = FileSelector(self.log_window.log)
+        self.file_selector = FileSelector(self._log, variant_keywords=self.processor.variant_suffixes())
     
     def setup_translations(self):
         """设置翻译"""
@@ -62,6 +85,7 @@ class MainAppUI(BaseUI, DragDropMixin):
                 "confirm_message": f"确定要处理 {{}} 个文件吗?",
                 "warning": "警告",
                 "no_files_selected": "请先选择要处理的文件",
+                "duplicates_skipped": "跳过了 {} 个已在列表中的文件",
                 "processing_complete": "批量处理完成!",
                 "success": "成功",
                 "failure": "失败",
@@ -87,7 +111,30 @@ class MainAppUI(BaseUI, DragDropMixin):
                 "success_quick_process": "成功对 {} 进行快速损坏处理",
                 "success_rvmat_generated": "RVMAT文件已生成并完成快速损坏处理:\n{}",
                 "error_quick_process": "对 {} 进行快速损坏处理失败",
-                "error_processing_file": "处理 {} 时发生错误: {}"
+                "error_processing_file": "处理 {} 时发生错误: {}",
+                "cancel": "取消",
+                "processing_progress": "正在处理 {}/{}: {}",
+                "processing_cancelled": "批量处理已取消",
+                "incremental_build": "增量构建（跳过未变化的文件）",
+                "skipped": "跳过",
+                "write_if_changed": "仅写入内容有变化的文件",
+                "writes_avoided": "避免写入",
+                "watch_directory": "监视目录",
+                "stop_watching": "停止监视",
+                "watch_started": "开始监视目录: {}",
+                "watch_stopped": "已停止监视目录",
+                "watch_regenerated": "已重新生成变体: {}",
+                "watch_failed": "重新生成变体失败: {}",
+                "run_metrics": "运行指标",
+                "export_metrics": "导出 OpenMetrics 指标文件",
+                "metrics_exported": "指标已导出到: {}",
+                "metrics_export_failed": "导出指标失败: {}",
+                "scan_metrics": "目录扫描耗时: {:.1f} ms",
+                "bulk_generate": "批量生成（扫描子目录中的纹理组）",
+                "bulk_progress": "批量生成进度: {}/{} {}",
+                "bulk_complete": "批量生成完成: 找到 {} 个纹理组，新生成 {} 个RVMAT，保留 {} 个已有RVMAT，成功 {} 失败 {}",
+                "bulk_incomplete": "跳过纹理不完整的组: {} (缺少 {})",
+                "bulk_no_sets": "未找到 *_nohq.paa / *_as.paa / *_smdi.paa 齐全的纹理组"
             },
             "en": {
                 "title": "Rvmat-Creator - DayZ Material File Processor",
@@ -103,6 +150,7 @@ class MainAppUI(BaseUI, DragDropMixin):
                 "confirm_message": f"Are you sure you want to process {{}} files?",
                 "warning": "Warning",
                 "no_files_selected": "Please select files to process first",
+                "duplicates_skipped": "Skipped {} files already in the list",
                 "processing_complete": "Batch processing completed!",
                 "success": "Success",
                 "failure": "Failure",
@@ -128,7 +176,30 @@ class MainAppUI(BaseUI, DragDropMixin):
                 "success_quick_process": "Successfully processed quick damage for {}",
                 "success_rvmat_generated": "RVMAT file generated and quick damage processing completed:\n{}",
                 "error_quick_process": "Failed to process quick damage for {}",
-                "error_processing_file": "Error processing {}: {}"
+                "error_processing_file": "Error processing {}: {}",
+                "cancel": "Cancel",
+                "processing_progress": "Processing {}/{}: {}",
+                "processing_cancelled": "Batch processing cancelled",
+                "incremental_build": "Incremental build (skip unchanged files)",
+                "skipped": "Skipped",
+                "write_if_changed": "Only write files whose content changed",
+                "writes_avoided": "Writes avoided",
+                "watch_directory": "Watch Directory",
+                "stop_watching": "Stop Watching",
+                "watch_started": "Watching directory: {}",
+                "watch_stopped": "Stopped watching directory",
+                "watch_regenerated": "Regenerated variants: {}",
+                "watch_failed": "Failed to regenerate variants: {}",
+                "run_metrics": "Run metrics",
+                "export_metrics": "Export OpenMetrics file",
+                "metrics_exported": "Metrics exported to: {}",
+                "metrics_export_failed": "Failed to export metrics: {}",
+                "scan_metrics": "Directory scan took {:.1f} ms",
+                "bulk_generate": "Bulk Generate (scan subfolders for texture sets)",
+                "bulk_progress": "Bulk generate: {}/{} {}",
+                "bulk_complete": "Bulk generate finished: {} texture sets found, {} RVMAT generated, {} existing RVMAT kept, succeeded {} failed {}",
+                "bulk_incomplete": "Skipped incomplete texture set: {} (missing {})",
+                "bulk_no_sets": "No complete *_nohq.paa / *_as.paa / *_smdi.paa texture sets found"
             }
         }
     
@@ -159,6 +230,9 @@ class MainAppUI(BaseUI, DragDropMixin):
     
     def toggle_language(self, event=None):
         """切换语言快捷键 (Ctrl+L)"""
+        # 语言选项位于设置面板中
+        self.ensure_panel_built(self.settings_frame)
+        
         # 获取当前语言列表
         languages = list(self.language_map.keys())
         current_index = languages.index(self.language_var.get())
@@ -220,14 +294,23 @@ class MainAppUI(BaseUI, DragDropMixin):
         # 创建主处理区域
         self.create_main_processing_area()
         
-        # 创建一键生成RVMAT区域
-        self.create_quick_rvmat_area()
-        
-        # 创建设置区域
-        self.create_settings_area()
-        
-        # 创建日志区域
-        self.create_log_area()
+        # 其他选项卡在首次显示时再创建，加快启动
+        self.panel_builders = {
+            str(self.quick_rvmat_frame): self.create_quick_rvmat_area,
+            str(self.settings_frame): self.create_settings_area,
+            str(self.log_frame): self.create_log_area
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+    
+    def on_tab_changed(self, event=None):
+        """切换选项卡时创建尚未创建的面板"""
+        self.ensure_panel_built(self.notebook.select())
+    
+    def ensure_panel_built(self, frame):
+        """确保指定选项卡的面板已创建"""
+        builder = self.panel_builders.pop(str(frame), None)
+        if builder:
+            builder()
     
     def create_main_processing_area(self):
         """创建主处理区域"""
@@ -268,22 +351,13 @@ class MainAppUI(BaseUI, DragDropMixin):
         list_frame.columnconfigure(0, weight=1)
         list_frame.rowconfigure(0, weight=1)
         
-        # 创建Treeview和滚动条
-        self.file_tree = ttk.Treeview(list_frame, columns=("filename", "remove"), show="", height=12)  # 隐藏表头
-        self.file_tree.column("#0", width=0, stretch=False)  # 隐藏tree列
-        self.file_tree.column("filename", width=400)  # 增加宽度
-        self.file_tree.column("remove", width=80, anchor="center")
+        # 创建Treeview和滚动条，Treeview中只保存可见的行
+        self.file_list_view = VirtualFileList(list_frame, self.selected_files, height=12)
+        self.file_tree = self.file_list_view.tree
         
         # 设置拖拽功能 - 在drag_frame创建后初始化
         self.setup_drag_drop(self.drag_frame)
         
-        # 创建滚动条
-        list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.file_tree.yview)
-        self.file_tree.configure(yscrollcommand=list_scrollbar.set)
-        
-        self.file_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        list_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        
         # 绑定删除按钮事件
         self.file_tree.bind("<Button-1>", self.on_tree_click)
         
@@ -318,26 +392,74 @@ class MainAppUI(BaseUI, DragDropMixin):
                                       style="Process.TButton")
         batch_process_btn.grid(row=0, column=2)
         
+        # 取消按钮，仅在后台任务运行时可用
+        cancel_text = self._("cancel")
+        cancel_btn = ttk.Button(button_frame, text="⏹ " + cancel_text, command=self.cancel_batch_files,
+                                state="disabled")
+        cancel_btn.grid(row=0, column=3, padx=(10, 0))
+        
+        # 监视目录按钮
+        watch_btn = ttk.Button(button_frame, text="👁 " + self._("watch_directory"), command=self.toggle_watch)
+        watch_btn.grid(row=0, column=4, padx=(10, 0))
+        
+        # 增量构建开关
+        self.incremental_var = tk.BooleanVar(value=bool(self.config_manager.get("incremental_build", False)))
+        incremental_check = ttk.Checkbutton(button_frame, text=self._("incremental_build"),
+                                            variable=self.incremental_var, command=self.toggle_incremental_build)
+        incremental_check.grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=(10, 0))
+        self.incremental_check = incremental_check
+        self.toggle_incremental_build(save=False)
+        
+        # 仅写入有变化的文件开关
+        self.write_if_changed_var = tk.BooleanVar(value=bool(self.config_manager.get("write_if_changed", False)))
+        write_if_changed_check = ttk.Checkbutton(button_frame, text=self._("write_if_changed"),
+                                                 variable=self.write_if_changed_var,
+                                                 command=self.toggle_write_if_changed)
+        write_if_changed_check.grid(row=2, column=0, columnspan=4, sticky=tk.W)
+        self.write_if_changed_check = write_if_changed_check
+        self.processor.write_if_changed = self.write_if_changed_var.get()
+        
+        # 导出运行指标开关
+        self.export_metrics_var = tk.BooleanVar(value=bool(self.config_manager.get("export_metrics", False)))
+        export_metrics_check = ttk.Checkbutton(button_frame, text=self._("export_metrics"),
+                                               variable=self.export_metrics_var,
+                                               command=self.toggle_export_metrics)
+        export_metrics_check.grid(row=3, column=0, columnspan=4, sticky=tk.W)
+        self.export_metrics_check = export_metrics_check
+        
+        # 进度条和进度文本
+        progress_frame = ttk.Frame(batch_frame)
+        progress_frame.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        progress_frame.columnconfigure(0, weight=1)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate")
+        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.progress_label = ttk.Label(progress_frame, text="", foreground="gray")
+        self.progress_label.grid(row=1, column=0, sticky=tk.W)
+        
         # 保存按钮引用以便后续更新
         self.select_file_btn = select_file_btn
         self.select_dir_btn = select_dir_btn
         self.batch_process_btn = batch_process_btn
+        self.cancel_btn = cancel_btn
+        self.watch_btn = watch_btn
     
     def select_files_via_dialog(self):
         """通过文件对话框选择文件"""
         files = self.file_selector.select_files_dialog(self.root)
         if files:
-            self.selected_files.extend(files)
-            self.update_file_list_display()
+            self.add_selected_files(files)
     
     def select_directory_via_dialog(self):
         """通过目录对话框选择文件"""
         directory = self.file_selector.select_directory_dialog(self.root)
         if directory:
+            metrics = self.file_selector.metrics
+            metrics.reset()
             files = self.file_selector.get_rvmat_files_from_directory(directory)
+            self._log(self._("scan_metrics").format(metrics.stage_seconds("scan") * 1000))
             if files:
-                self.selected_files.extend(files)
-                self.update_file_list_display()
+                self.add_selected_files(files)
     
     def create_settings_area(self):
         """创建设置区域"""
@@ -390,26 +512,14 @@ class MainAppUI(BaseUI, DragDropMixin):
         text_frame = ttk.Frame(self.log_frame)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # 获取日志文本框
-        self.log_text_widget = self.log_window.text_widget if self.log_window.text_widget else None
-        
-        # 如果日志窗口已经创建，将其内容复制到新的文本框
         if self.log_text_widget:
-            # 保存现有日志内容
-            log_content = self.log_text_widget.get(1.0, tk.END)
-            
-            # 创建新的文本框
-            self.log_text_widget = tk.Text(text_frame, wrap=tk.WORD)
-            scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.log_text_widget.yview)
-            self.log_text_widget.configure(yscrollcommand=scrollbar.set)
-            
-            # 恢复日志内容
-            self.log_text_widget.insert(1.0, log_content)
-        else:
-            # 创建新的文本框
-            self.log_text_widget = tk.Text(text_frame, wrap=tk.WORD)
-            scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.log_text_widget.yview)
-            self.log_text_widget.configure(yscrollcommand=scrollbar.set)
+            self.log_sink.detach(self.log_text_widget)
+        
+        # 创建新的文本框，缓冲区中已有的日志在附加时写入
+        self.log_text_widget = tk.Text(text_frame, wrap=tk.WORD)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.log_text_widget.yview)
+        self.log_text_widget.configure(yscrollcommand=scrollbar.set)
+        self.log_sink.attach(self.log_text_widget)
         
         self.log_text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -424,10 +534,8 @@ class MainAppUI(BaseUI, DragDropMixin):
         
     def clear_logs(self):
         """清空日志"""
-        if self.log_text_widget:
-            self.log_text_widget.delete(1.0, tk.END)
-        # 同时清空LogWindow中的日志
-        self.log_window.clear_log()
+        # 同时清空日志选项卡与LogWindow中的日志
+        self.log_sink.clear()
         
     def create_quick_rvmat_area(self):
         """创建一键生成RVMAT区域"""
@@ -497,6 +605,12 @@ class MainAppUI(BaseUI, DragDropMixin):
         # 开始处理按钮
         process_btn = ttk.Button(main_frame, text=self._("start_process"), command=self.process_quick_rvmat, style="Process.TButton")
         process_btn.pack(pady=10)
+        
+        # 批量生成按钮：扫描文件夹及其子目录中的所有纹理组
+        self.bulk_generate_btn = ttk.Button(main_frame, text=self._("bulk_generate"), command=self.process_bulk_quick_rvmat)
+        self.bulk_generate_btn.pack()
+        self.bulk_progress_label = ttk.Label(main_frame, text="", foreground="gray")
+        self.bulk_progress_label.pack(pady=(5, 0))
     
     def browse_folder(self):
         """浏览文件夹"""
@@ -527,119 +641,12 @@ class MainAppUI(BaseUI, DragDropMixin):
     def load_default_template(self):
         """加载默认模板"""
         try:
-            # 优先查找软件同级目录下的@default.rvmat或default.rvmat文件
-            # 在开发环境中，这通常是项目根目录
-            # 在打包环境中，这是exe文件所在目录
-            if getattr(sys, 'frozen', False):
-                # 打包环境
-                app_dir = os.path.dirname(sys.executable)
-            else:
-                # 开发环境
-                app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            
-            # 优先查找@default.rvmat文件
-            template_path = os.path.join(app_dir, "@default.rvmat")
-            if not os.path.exists(template_path):
-                # 如果@default.rvmat不存在，则查找default.rvmat
-                template_path = os.path.join(app_dir, "default.rvmat")
-            
-            # 读取模板文件
-            if os.path.exists(template_path):
-                with open(template_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    self.template_text.delete(1.0, tk.END)
-                    self.template_text.insert(1.0, content)
-            else:
-                # 如果文件不存在，插入默认内容
-                default_content = """ambient[]={1,1,1,1};
-diffuse[]={1,1,1,1};
-forcedDiffuse[]={0,0,0,0};
-emmisive[]={0,0,0,1};
-specular[]={1.5,1.5,1.7,1};
-specularPower=300;
-PixelShaderID=\"Super\";
-VertexShaderID=\"Super\";
-class Stage1
-{
-	texture=\"path\\to\\your\\texture_nohq.paa\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={1,0,0};
-		up[]={0,1,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};
-class Stage2
-{
-	texture=\"#(argb,8,8,3)color(0.5,0.5,0.5,1,DT)\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={8,2,0};
-		up[]={-2,8,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};
-class Stage3
-{
-	texture=\"#(argb,8,8,3)color(0,0,0,0,MC)\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={1,0,0};
-		up[]={0,1,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};
-class Stage4
-{
-	texture=\"path\\to\\your\\texture_as.paa\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={1,0,0};
-		up[]={0,1,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};
-class Stage5
-{
-	texture=\"path\\to\\your\\texture_smdi.paa\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={1,0,0};
-		up[]={0,1,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};
-class Stage6
-{
-	texture=\"#(ai,64,64,1)fresnel(2.34,0.12)\";
-	uvSource="none";
-};
-class Stage7
-{
-	texture=\"dz\data\data\env_land_co.paa\";
-	uvSource=\"tex\";
-	class uvTransform
-	{
-		aside[]={1,0,0};
-		up[]={0,1,0};
-		dir[]={0,0,0};
-		pos[]={0,0,0};
-	};
-};"""
-                self.template_text.delete(1.0, tk.END)
-                self.template_text.insert(1.0, default_content)
+            # 优先查找软件同级目录下的@default.rvmat或default.rvmat文件，不存在时使用内置模板
+            content = load_default_template()
+            self.template_text.delete(1.0, tk.END)
+            self.template_text.insert(1.0, content)
         except Exception as e:
-            self.log_window.log(f"加载默认模板失败: {str(e)}")
+            self._log(f"加载默认模板失败: {str(e)}", LOG_WARNING)
             
     def process_quick_rvmat(self):
         """处理一键生成RVMAT"""
@@ -666,16 +673,8 @@ class Stage7
             messagebox.showwarning(self._("warning"), self._("warning_template_empty"))
             return
             
-        # 如果没有输入文件名，则使用文件夹名称作为基础名称
-        if not filename:
-            filename = os.path.basename(os.path.normpath(folder_path))
-            # 确保文件名以.rvmat结尾
-            if not filename.endswith(".rvmat"):
-                filename += ".rvmat"
-            
-        # 确保文件名以.rvmat结尾
-        if not filename.endswith(".rvmat"):
-            filename += ".rvmat"
+        # 如果没有输入文件名，则使用文件夹名称作为基础名称，并确保文件名以.rvmat结尾
+        filename = normalize_rvmat_filename(folder_path, filename)
         
         try:
             # 处理模板内容，替换texture路径
@@ -690,95 +689,107 @@ class Stage7
             
             # 记录日志
             success_msg = self._("success_generate_rvmat").format(output_path)
-            self.log_window.log(success_msg)
-            if self.log_text_widget:
-                self.log_text_widget.insert(tk.END, success_msg + "\n")
-                self.log_text_widget.see(tk.END)
+            self._log(success_msg)
                 
             # 对生成的文件进行快速损坏处理
             self.process_single_rvmat_file(output_path)
             
         except Exception as e:
             error_msg = self._("error_generate_rvmat").format(str(e))
-            self.log_window.log(error_msg)
-            if self.log_text_widget:
-                self.log_text_widget.insert(tk.END, error_msg + "\n")
-                self.log_text_widget.see(tk.END)
+            self._log(error_msg)
             messagebox.showerror(self._("error"), error_msg)
             
+    def process_bulk_quick_rvmat(self):
+        """扫描文件夹中的所有纹理组，批量生成 RVMAT 及其损坏版本（在后台线程中运行）"""
+        folder_path = self.path_var.get().strip() if hasattr(self, 'path_var') and self.path_var else ""
+        if not folder_path and hasattr(self, 'path_entry'):
+            folder_path = self.path_entry.get().strip()
+        template_content = self.template_text.get(1.0, tk.END).strip() if hasattr(self, 'template_text') and self.template_text else ""
+        
+        if not folder_path:
+            messagebox.showwarning(self._("warning"), self._("warning_enter_folder_path"))
+            return
+        if not template_content:
+            messagebox.showwarning(self._("warning"), self._("warning_template_empty"))
+            return
+        if self.bulk_job is not None and self.bulk_job.is_running():
+            return
+        
+        from src.modules.batch_processor import BatchProcessor, ENGINE_PROCESS, ENGINE_SERIAL
+        from src.modules.bulk_generator import BulkQuickGenerator
+        
+        # 变体生成在进程池中并行进行，单核机器上直接在工作线程中处理
+        engine = ENGINE_PROCESS if (os.cpu_count() or 1) > 1 else ENGINE_SERIAL
+        batch_processor = BatchProcessor(self.processor.copy(), engine=engine)
+        self.bulk_generator = BulkQuickGenerator(batch_processor, template_content)
+        self.bulk_job = BatchJobRunner(self.root, self.bulk_generator,
+                                       run_function=self.bulk_generator.generate_directories)
+        self.bulk_generate_btn.configure(state="disabled")
+        self.bulk_progress_label.configure(text="")
+        self.bulk_job.start(
+            [folder_path],
+            on_progress=self.on_bulk_progress,
+            on_done=self.on_bulk_done,
+            on_error=self.on_bulk_error
+        )
+    
+    def on_bulk_progress(self, done, total, file_path, success):
+        """更新批量生成进度"""
+        self.bulk_progress_label.configure(
+            text=self._("bulk_progress").format(done, total, os.path.basename(file_path)))
+    
+    def on_bulk_done(self, success_count, fail_count, cancelled):
+        """批量生成结束"""
+        self.bulk_generate_btn.configure(state="normal")
+        generator = self.bulk_generator
+        for texture_set in generator.incomplete_sets:
+            self._log(self._("bulk_incomplete").format(
+                os.path.join(texture_set.directory, texture_set.basename), ", ".join(texture_set.missing_slots)))
+        if not generator.texture_sets:
+            self.bulk_progress_label.configure(text="")
+            messagebox.showwarning(self._("warning"), self._("bulk_no_sets"))
+            return
+        
+        result_msg = self._("bulk_complete").format(
+            len(generator.texture_sets), len(generator.generated_files), len(generator.existing_files),
+            success_count, fail_count)
+        self.bulk_progress_label.configure(text=result_msg)
+        self._log(result_msg)
+        for file_path in generator.failed_files:
+            self._log(self._("error_quick_process").format(file_path))
+        self._log(f"{self._('run_metrics')}:\n{generator.batch_processor.metrics.format_summary()}")
+    
+    def on_bulk_error(self, error):
+        """批量生成出错"""
+        self.bulk_generate_btn.configure(state="normal")
+        error_msg = self._("error_generate_rvmat").format(str(error))
+        self._log(error_msg)
+        messagebox.showerror(self._("error"), error_msg)
+    
     def process_single_rvmat_file(self, file_path):
         """处理单个RVMAT文件，生成损坏版本"""
         try:
             # 使用现有的处理器处理单个文件
             success = self.processor.process_rvmat_file(file_path)
+            self.processor.sync_written_directories()
             
             if success:
                 success_msg = self._("success_quick_process").format(file_path)
-                self.log_window.log(success_msg)
-                if self.log_text_widget:
-                    self.log_text_widget.insert(tk.END, success_msg + "\n")
-                    self.log_text_widget.see(tk.END)
+                self._log(success_msg)
                 messagebox.showinfo(self._("success"), self._("success_rvmat_generated").format(file_path))
             else:
                 error_msg = self._("error_quick_process").format(file_path)
-                self.log_window.log(error_msg)
-                if self.log_text_widget:
-                    self.log_text_widget.insert(tk.END, error_msg + "\n")
-                    self.log_text_widget.see(tk.END)
+                self._log(error_msg)
                 messagebox.showerror(self._("error"), error_msg)
                 
         except Exception as e:
             error_msg = self._("error_processing_file").format(file_path, str(e))
-            self.log_window.log(error_msg)
-            if self.log_text_widget:
-                self.log_text_widget.insert(tk.END, error_msg + "\n")
-                self.log_text_widget.see(tk.END)
+            self._log(error_msg)
             messagebox.showerror(self._("error"), error_msg)
             
     def process_template_content(self, content, folder_path, filename):
         """处理模板内容，替换texture路径"""
-        # 移除盘符路径，只保留相对路径
-        # 例如: D:\Python Project\Rvmat-Creator -> Python Project\Rvmat-Creator
-        relative_path = folder_path
-        if ":" in folder_path:
-            # 移除盘符和第一个反斜杠
-            relative_path = folder_path.split(":", 1)[1].lstrip("")
-        
-        # 将反斜杠替换为正斜杠，符合RVMAT文件格式要求
-        relative_path = relative_path.replace("\\", "/")
-        
-        # 获取不带扩展名的文件名
-        basename = os.path.splitext(filename)[0]
-        
-        # 构造完整的texture路径 (相对路径 + 文件名 + 后缀)
-        nohq_path = f"{relative_path}/{basename}_nohq.paa"
-        as_path = f"{relative_path}/{basename}_as.paa"
-        smdi_path = f"{relative_path}/{basename}_smdi.paa"
-        
-        # 确保路径开头没有斜杠
-        if nohq_path.startswith("/"):
-            nohq_path = nohq_path[1:]
-        if as_path.startswith("/"):
-            as_path = as_path[1:]
-        if smdi_path.startswith("/"):
-            smdi_path = smdi_path[1:]
-        
-        # 替换Stage1的texture路径
-        pattern1 = r'(class\s+Stage1\s*\{[^}]*texture\s*=\s*"[^"]*"(;))'
-        replacement1 = 'class Stage1\n{\n\ttexture="' + nohq_path + '";'
-        content = re.sub(pattern1, replacement1, content, flags=re.DOTALL)
-        
-        # 替换Stage4的texture路径
-        pattern4 = r'(class\s+Stage4\s*\{[^}]*texture\s*=\s*"[^"]*"(;))'
-        replacement4 = 'class Stage4\n{\n\ttexture="' + as_path + '";'
-        content = re.sub(pattern4, replacement4, content, flags=re.DOTALL)
-        
-        # 替换Stage5的texture路径
-        pattern5 = r'(class\s+Stage5\s*\{[^}]*texture\s*=\s*"[^"]*"(;))'
-        replacement5 = 'class Stage5\n{\n\ttexture="' + smdi_path + '";'
-        content = re.sub(pattern5, replacement5, content, flags=re.DOTALL)
-        
-        return content
+        return process_template_content(content, folder_path, filename)
     
     def change_language(self, event=None):
         """切换语言"""
@@ -847,6 +858,26 @@ class Stage7
             process_batch_text = self._("process_batch")
             self.batch_process_btn.configure(text="⚡ " + process_batch_text)
         
+        if hasattr(self, 'cancel_btn'):
+            cancel_text = self._("cancel")
+            self.cancel_btn.configure(text="⏹ " + cancel_text)
+        
+        if hasattr(self, 'watch_btn'):
+            watch_text = self._("stop_watching") if self.watcher else self._("watch_directory")
+            self.watch_btn.configure(text="👁 " + watch_text)
+        
+        if hasattr(self, 'incremental_check'):
+            self.incremental_check.configure(text=self._("incremental_build"))
+        
+        if hasattr(self, 'write_if_changed_check'):
+            self.write_if_changed_check.configure(text=self._("write_if_changed"))
+        
+        if hasattr(self, 'export_metrics_check'):
+            self.export_metrics_check.configure(text=self._("export_metrics"))
+        
+        if hasattr(self, 'bulk_generate_btn'):
+            self.bulk_generate_btn.configure(text=self._("bulk_generate"))
+        
         # 更新空列表提示
         if hasattr(self, 'empty_label'):
             empty_text = self._("empty_list")
@@ -924,15 +955,8 @@ class Stage7
             hint_label.grid(row=2, column=0, pady=(5, 10))
     
     def update_file_list_display(self):
-        """更新文件列表显示"""
-        # 清空Treeview
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
-        
-        # 添加文件到Treeview
-        for i, file_path in enumerate(self.selected_files):
-            filename = os.path.basename(file_path)
-            self.file_tree.insert("", "end", iid=i, values=(filename, "❌"))
+        """更新文件列表显示，只增删可见窗口中变化的行"""
+        self.file_list_view.refresh()
         
         # 根据文件列表是否为空来显示/隐藏提示标签
         if self.selected_files:
@@ -940,20 +964,22 @@ class Stage7
         else:
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
     
+    def add_selected_files(self, files):
+        """添加文件到待处理列表，已在列表中的文件会被跳过，返回实际添加的文件数"""
+        new_ids, skipped = self.selected_files.add(files)
+        self.update_file_list_display()
+        if skipped:
+            self._log(self._("duplicates_skipped").format(skipped))
+        return len(new_ids)
+    
     def handle_dropped_files(self, files):
         """处理拖拽的文件"""
         # 添加拖拽的文件到待处理列表
-        self.selected_files.extend(files)
-        self.update_file_list_display()
+        added = self.add_selected_files(files)
         
         # 记录日志
-        log_msg = f"通过拖拽添加了 {len(files)} 个文件" if self.language == "zh" else f"Added {len(files)} files via drag and drop"
-        self.log_window.log(log_msg)
-        
-        # 同时在新的日志文本框中显示日志
-        if self.log_text_widget:
-            self.log_text_widget.insert(tk.END, log_msg + "\n")
-            self.log_text_widget.see(tk.END)
+        log_msg = f"通过拖拽添加了 {added} 个文件" if self.language == "zh" else f"Added {added} files via drag and drop"
+        self._log(log_msg)
     
     def on_tree_click(self, event):
         """处理Treeview点击事件"""
@@ -963,54 +989,178 @@ class Stage7
         
         # 如果点击的是删除列并且是有效行
         if region == "cell" and column == "#2" and row:
-            self.remove_file(int(row))
+            self.remove_file(row)
     
     def on_list_frame_click(self, event):
         """处理列表框架的点击事件"""
         # 打开文件选择对话框
         self.select_files_via_dialog()
     
-    def remove_file(self, index):
-        """移除指定索引的文件"""
-        if 0 <= index < len(self.selected_files):
-            # 从文件列表中移除
-            removed_file = self.selected_files.pop(index)
+    def remove_file(self, row_id):
+        """移除指定行 ID 的文件"""
+        removed_file = self.selected_files.remove(row_id)
+        if removed_file is not None:
             # 更新显示
             self.update_file_list_display()
             # 记录日志
             log_msg = f"已移除文件: {os.path.basename(removed_file)}"
-            self.log_window.log(log_msg)
-            
-            # 同时在新的日志文本框中显示日志
-            if self.log_text_widget:
-                self.log_text_widget.insert(tk.END, log_msg + "\n")
-                self.log_text_widget.see(tk.END)
+            self._log(log_msg)
     
     def process_batch_files(self):
-        """批量处理文件"""
+        """批量处理文件（在后台线程中运行）"""
         if not self.selected_files:
             warning_title = self._("warning")
             warning_msg = self._("no_files_selected")
             messagebox.showwarning(warning_title, warning_msg)
             return
         
+        if self.batch_job is not None and self.batch_job.is_running():
+            return
+        
+        from src.modules.batch_processor import BatchProcessor
+        if self.incremental_var.get() and self.manifest is None:
+            from src.modules.build_manifest import BuildManifest
+            self.manifest = BuildManifest(self.config_manager.config_dir / "build_manifest.json")
+        
+        self.progress_bar.configure(maximum=len(self.selected_files), value=0)
+        self.progress_label.configure(text="")
+        self.batch_process_btn.configure(state="disabled")
+        self.cancel_btn.configure(state="normal")
+        
+        # 每次运行使用当前配置的新处理器
+        manifest = self.manifest if self.incremental_var.get() else None
+        self.batch_processor = BatchProcessor(self.processor.copy(), manifest=manifest)
+        self.batch_job = BatchJobRunner(self.root, self.batch_processor)
+        self.batch_job.start(
+            self.selected_files,
+            on_progress=self.on_batch_progress,
+            on_done=self.on_batch_done,
+            on_error=self.on_batch_error
+        )
+    
+    def load_variant_rules(self):
+        """按配置项 variant_rules_file 加载变体规则文件，未配置或加载失败时使用内置规则"""
+        rules_file = self.config_manager.get("variant_rules_file", "")
+        if not rules_file:
+            return
+        from src.modules.variant_rules import load_variant_rules
         try:
-            # 处理文件
-            success_count, fail_count = self.batch_processor.process_files(self.selected_files)
-            
-            # 显示结果
-            complete_msg = self._("processing_complete")
-            success_msg = self._("success")
-            failure_msg = self._("failure")
-            result_msg = f"{complete_msg}\n{success_msg}: {success_count} {failure_msg}: {fail_count}"
-            self.log_window.log(result_msg)
-            
-            # 同时在新的日志文本框中显示结果
-            if self.log_text_widget:
-                self.log_text_widget.insert(tk.END, result_msg + "\n")
-                self.log_text_widget.see(tk.END)
+            self.processor.rules = load_variant_rules(rules_file)
+            self._log(f"已加载变体规则: {rules_file} ({', '.join(self.processor.variant_suffixes())})")
+        except (OSError, ValueError) as e:
+            self._log(f"加载变体规则失败，使用内置规则: {e}", LOG_WARNING)
+    
+    def toggle_incremental_build(self, save=True):
+        """切换增量构建模式"""
+        enabled = self.incremental_var.get()
+        if not enabled:
+            # 清单在下一次启用增量构建的批处理开始时重新加载
+            self.manifest = None
+        if save:
+            self.config_manager.set("incremental_build", enabled)
+    
+    def toggle_write_if_changed(self):
+        """切换仅写入有变化的文件模式"""
+        enabled = self.write_if_changed_var.get()
+        self.processor.write_if_changed = enabled
+        self.config_manager.set("write_if_changed", enabled)
+    
+    def toggle_export_metrics(self):
+        """切换批量处理后导出 OpenMetrics 指标文件"""
+        self.config_manager.set("export_metrics", self.export_metrics_var.get())
+    
+    def toggle_watch(self):
+        """开始或停止监视目录"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_btn.configure(text="👁 " + self._("watch_directory"))
+            self._log(self._("watch_stopped"))
+            return
         
-        except Exception as e:
-            error_title = self._("error")
-            error_msg = self._("processing_error").format(str(e))
-            messagebox.showerror(error_title, error_msg)
\ No newline at end of file
+        directory = self.file_selector.select_directory_dialog(self.root)
+        if not directory:
+            return
+        
+        from src.modules.rvmat_watcher import RvmatWatcher
+        
+        events = self.watch_events
+        self.watcher = RvmatWatcher(self.processor.copy(), [directory],
+                                    on_event=lambda path, success: events.put((path, success)))
+        self.watcher.start()
+        self.watch_btn.configure(text="👁 " + self._("stop_watching"))
+        self._log(self._("watch_started").format(directory))
+        self.root.after(200, self._poll_watch_events)
+    
+    def _poll_watch_events(self):
+        """在主线程中显示监视器的处理结果"""
+        while True:
+            try:
+                path, success = self.watch_events.get_nowait()
+            except queue.Empty:
+                break
+            key = "watch_regenerated" if success else "watch_failed"
+            self._log(self._(key).format(path), LOG_INFO if success else LOG_WARNING)
+        
+        if self.watcher is not None:
+            self.root.after(200, self._poll_watch_events)
+    
+    def _log(self, message, level=LOG_INFO):
+        """写入日志缓冲区，定时刷新到日志窗口和日志选项卡"""
+        self.log_sink.log(message, level)
+    
+    def cancel_batch_files(self):
+        """取消正在运行的批量处理"""
+        if self.batch_job is not None and self.batch_job.is_running():
+            self.cancel_btn.configure(state="disabled")
+            self.batch_job.cancel()
+    
+    def on_batch_progress(self, done, total, file_path, success):
+        """更新批量处理进度"""
+        self.progress_bar.configure(maximum=total, value=done)
+        progress_text = self._("processing_progress").format(done, total, os.path.basename(file_path))
+        self.progress_label.configure(text=progress_text)
+    
+    def on_batch_done(self, success_count, fail_count, cancelled):
+        """批量处理结束"""
+        self._reset_batch_controls()
+        
+        # 显示结果
+        complete_msg = self._("processing_cancelled") if cancelled else self._("processing_complete")
+        success_msg = self._("success")
+        failure_msg = self._("failure")
+        result_msg = f"{complete_msg}\n{success_msg}: {success_count} {failure_msg}: {fail_count}"
+        if self.batch_processor.manifest is not None:
+            result_msg += f" {self._('skipped')}: {len(self.batch_processor.skipped_files)}"
+        processor = self.batch_processor.processor
+        if processor.write_if_changed:
+            result_msg += f" {self._('writes_avoided')}: {processor.stats['writes_skipped']}"
+        self.progress_label.configure(text=complete_msg)
+        self._log(result_msg)
+        self.show_run_metrics()
+    
+    def show_run_metrics(self):
+        """在日志中显示最近一次批量处理的运行指标，并按设置导出 OpenMetrics 文件"""
+        metrics = self.batch_processor.metrics
+        self._log(f"{self._('run_metrics')}:\n{metrics.format_summary()}")
+        
+        if not self.export_metrics_var.get():
+            return
+        metrics_file = self.config_manager.config_dir / "metrics.prom"
+        try:
+            metrics.write_openmetrics(metrics_file)
+            self._log(self._("metrics_exported").format(metrics_file))
+        except OSError as e:
+            self._log(self._("metrics_export_failed").format(e))
+    
+    def on_batch_error(self, error):
+        """批量处理出错"""
+        self._reset_batch_controls()
+        error_title = self._("error")
+        error_msg = self._("processing_error").format(str(error))
+        messagebox.showerror(error_title, error_msg)
+    
+    def _reset_batch_controls(self):
+        """恢复批量处理按钮状态"""
+        self.batch_process_btn.configure(state="normal")
+        self.cancel_btn.configure(state="disabled")